@@ -1,8 +1,12 @@
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from api.v1.schemas.item_schema import ItemSchema, ItemCreateSchema
+from api.v1.controllers.ndjson import NDJSON_MEDIA_TYPE, iter_ndjson
+from api.v1.controllers.responses import item_response, items_response
+from api.v1.schemas.item_schema import MAX_BATCH_GET, MAX_BULK_CREATE, ItemSchema, ItemCreateSchema
 from container import Container
+from repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
 from services.item_sync_service import SyncItemService
 
 router = APIRouter(prefix="/items", tags=["Items"])
@@ -10,8 +14,20 @@ router = APIRouter(prefix="/items", tags=["Items"])
 
 @router.get("/", response_model=list[ItemSchema])
 @inject
-def list_items(service: SyncItemService = Depends(Provide[Container.sync_item_service])):
-    return [ItemSchema.model_validate(entity.model_dump()) for entity in service.list()]
+def list_items(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+               cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+               service: SyncItemService = Depends(Provide[Container.sync_item_service])):
+    try:
+        page = service.list(limit, cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return items_response(page.items, headers={"X-Next-Cursor": page.next_cursor} if page.next_cursor else None)
+
+
+@router.get("/export", response_class=StreamingResponse)
+@inject
+def export_items(service: SyncItemService = Depends(Provide[Container.sync_item_service])):
+    return StreamingResponse(iter_ndjson(service.export()), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.get("/{item_id}", response_model=ItemSchema)
@@ -20,14 +36,29 @@ def get_item(item_id: str, service: SyncItemService = Depends(Provide[Container.
     entity = service.get(item_id)
     if not entity:
         raise HTTPException(status_code=404, detail="Item not found")
-    return ItemSchema.model_validate(entity.model_dump())
+    return item_response(entity)
 
 
 @router.post("/", response_model=ItemSchema, status_code=status.HTTP_201_CREATED)
 @inject
 def create_item(data: ItemCreateSchema, service: SyncItemService = Depends(Provide[Container.sync_item_service])):
     entity = service.create(data)
-    return ItemSchema.model_validate(entity.model_dump())
+    return item_response(entity, status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=list[ItemSchema], status_code=status.HTTP_201_CREATED)
+@inject
+def create_items(data: list[ItemCreateSchema] = Body(..., min_length=1, max_length=MAX_BULK_CREATE),
+                 service: SyncItemService = Depends(Provide[Container.sync_item_service])):
+    return items_response(service.create_many(data), status.HTTP_201_CREATED)
+
+
+@router.post("/batch-get", response_model=list[ItemSchema])
+@inject
+def get_items(ids: list[str] = Body(..., min_length=1, max_length=MAX_BATCH_GET),
+              service: SyncItemService = Depends(Provide[Container.sync_item_service])):
+    """The items found among ``ids``, in request order; unknown ids are left out"""
+    return items_response([item for item in service.get_many(ids) if item is not None])
 
 
 @router.put("/{item_id}", response_model=ItemSchema)
@@ -37,7 +68,7 @@ def update_item(item_id: str, data: ItemCreateSchema,
     entity = service.update(item_id, data)
     if not entity:
         raise HTTPException(status_code=404, detail="Item not found")
-    return ItemSchema.model_validate(entity.model_dump())
+    return item_response(entity)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,23 @@
+"""Newline-delimited JSON bodies for streaming item exports."""
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+
+from api.v1.controllers.responses import dump_item
+from models.item_model import ItemModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_chunk(items: Sequence[ItemModel]) -> bytes:
+    return b"".join(dump_item(item) + b"\n" for item in items)
+
+
+def iter_ndjson(chunks: Iterable[Sequence[ItemModel]]) -> Iterator[bytes]:
+    """Encode each chunk of items as it arrives."""
+    for chunk in chunks:
+        yield encode_chunk(chunk)
+
+
+async def aiter_ndjson(chunks: AsyncIterable[Sequence[ItemModel]]) -> AsyncIterator[bytes]:
+    """Encode each chunk of items as it arrives."""
+    async for chunk in chunks:
+        yield encode_chunk(chunk)
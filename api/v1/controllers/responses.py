@@ -0,0 +1,32 @@
+"""
+JSON responses serialized straight from repository results.
+
+Returning a Response skips FastAPI's response_model pass (validate every row
+again, ``jsonable_encoder``, ``json.dumps``); ``response_model`` is still declared
+on the routes for the OpenAPI schema. The adapters are built once and emit the
+body bytes in a single pydantic-core call.
+"""
+from typing import List, Mapping, Optional, Sequence
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+from models.item_model import ItemModel
+
+_item_adapter = TypeAdapter(ItemModel)
+_items_adapter = TypeAdapter(List[ItemModel])
+
+
+def dump_item(entity: ItemModel) -> bytes:
+    """JSON body of one item."""
+    return _item_adapter.dump_json(entity)
+
+
+def item_response(entity: ItemModel, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(dump_item(entity), status_code=status_code, media_type="application/json")
+
+
+def items_response(entities: Sequence[ItemModel], status_code: int = status.HTTP_200_OK,
+                   headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(_items_adapter.dump_json(list(entities)), status_code=status_code, headers=headers,
+                    media_type="application/json")
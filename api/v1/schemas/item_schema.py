@@ -2,6 +2,11 @@ from pydantic import Field, BaseModel
 
 from .base_schema import BaseSchema
 
+# Largest request body accepted by POST /items/bulk
+MAX_BULK_CREATE = 5000
+# Most ids accepted by POST /items/batch-get
+MAX_BATCH_GET = 1000
+
 
 class ItemSchema(BaseSchema):
     name: str = Field(..., description="Item name")
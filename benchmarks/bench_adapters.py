@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the per-call overhead of the adapter layer.
+
+Measures the execution strategies (``execute``), the cross-bridge transaction
+managers (``execute_with_transaction``) and the ``transactional`` wrappers of
+every transaction manager, each against its native counterpart:
+
+* a strategy against the same call on the session directly;
+* a bridge (``SyncToAsync*``, ``AsyncToSync*``) against the manager or session
+  it wraps, called from its own world (sync code, or a coroutine on a loop);
+* a ``transactional`` wrapper against ``execute_with_transaction`` of its manager.
+
+Every pair runs twice: on a fake session whose methods do nothing, which leaves
+the framework cost alone, and on an in-memory SQLite database, which adds the
+cost of SQLAlchemy and the driver for ``SELECT 1``. Async calls are timed in
+batches on the background event loop, so only the adapter pays for a hop.
+
+Usage:
+    python -m benchmarks.bench_adapters [--number N] [--repeat R] [--backends fake sqlite] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.background_loop import background_loop
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager, SyncTransactionManager
+
+BACKENDS = ("fake", "sqlite")
+
+# A timed batch: runs ``number`` calls
+Batch = Callable[[int], None]
+
+
+class _FakeSyncSession:
+    """Sync session whose methods do nothing."""
+
+    def __init__(self):
+        self.info = {}
+
+    def execute(self, stmt):
+        return None
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeAsyncSession:
+    """Async session whose methods do nothing."""
+
+    def __init__(self):
+        self.info = {}
+
+    async def execute(self, stmt):
+        return None
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def _best_of(batch: Batch, number: int, repeat: int) -> float:
+    """Best per-call time in microseconds."""
+    batch(number)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch(number)
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return min(timings)
+
+
+def _sync_batch(call: Callable[[], Any]) -> Batch:
+    def batch(number: int) -> None:
+        for _ in range(number):
+            call()
+
+    return batch
+
+
+def _async_batch(call: Callable[[], Any]) -> Batch:
+    """Awaits ``call()`` ``number`` times in one coroutine on the background loop."""
+    async def run(number: int) -> None:
+        for _ in range(number):
+            await call()
+
+    return lambda number: background_loop.call(run(number))
+
+
+def _loop_batch(loop: asyncio.AbstractEventLoop, call: Callable[[], Any]) -> Batch:
+    """Awaits ``call()`` ``number`` times in one coroutine on ``loop``, for the sync-to-async bridges."""
+    async def run(number: int) -> None:
+        for _ in range(number):
+            await call()
+
+    return lambda number: loop.run_until_complete(run(number))
+
+
+class _Backend:
+    """Session factories of one backend."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._engines = []
+        self._sessions = []
+        if name == "fake":
+            self.sync_factory: Callable[[], Any] = _FakeSyncSession
+            self.async_factory: Callable[[], Any] = _FakeAsyncSession
+            return
+        # One shared connection, so every thread sees the same in-memory database
+        sync_engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        # Async connections belong to the loop that opened them: the background loop
+        async_engine = background_loop.call(self._create_async_engine())
+        self._engines = [sync_engine, async_engine]
+        self.sync_factory = sessionmaker(bind=sync_engine, class_=SyncSession, expire_on_commit=False,
+                                         autoflush=False)
+        self.async_factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False,
+                                                autoflush=False)
+
+    @staticmethod
+    async def _create_async_engine():
+        return create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    def sync_session(self):
+        session = self.sync_factory()
+        self._sessions.append(session)
+        return session
+
+    def async_session(self):
+        session = self.async_factory()
+        self._sessions.append(session)
+        return session
+
+    def dispose(self) -> None:
+        for session in self._sessions:
+            if isinstance(session, (AsyncSession, _FakeAsyncSession)):
+                background_loop.call(session.close())
+            else:
+                session.close()
+        for engine in self._engines:
+            if hasattr(engine, "sync_engine"):
+                background_loop.call(engine.dispose())
+            else:
+                engine.dispose()
+
+
+def _strategy_pairs(backend: _Backend, loop: asyncio.AbstractEventLoop) -> List[Tuple[str, Batch, Batch]]:
+    stmt = select(literal(1))
+    sync_session = backend.sync_session()
+    async_session = backend.async_session()
+    sync_strategy, async_strategy = SyncExecutionStrategy(), AsyncExecutionStrategy()
+    sync_to_async, async_to_sync = SyncToAsyncExecutionStrategy(), AsyncToSyncExecutionStrategy()
+    native_sync = _sync_batch(lambda: sync_session.execute(stmt))
+    native_async = _async_batch(lambda: async_session.execute(stmt))
+    return [
+        ("SyncExecutionStrategy", _sync_batch(lambda: sync_strategy.execute(sync_session, stmt)), native_sync),
+        ("AsyncExecutionStrategy", _async_batch(lambda: async_strategy.execute(async_session, stmt)), native_async),
+        ("SyncToAsyncExecutionStrategy", _loop_batch(loop, lambda: sync_to_async.execute(sync_session, stmt)),
+         native_sync),
+        ("AsyncToSyncExecutionStrategy", _sync_batch(lambda: async_to_sync.execute(async_session, stmt)),
+         native_async),
+    ]
+
+
+def _manager_pairs(backend: _Backend, loop: asyncio.AbstractEventLoop) -> List[Tuple[str, Batch, Batch]]:
+    sync_manager = SyncTransactionManager(backend.sync_factory)
+    async_manager = AsyncTransactionManager(backend.async_factory)
+    sync_to_async = SyncToAsyncTransactionManager(sync_manager)
+    async_to_sync = AsyncToSyncTransactionManager(async_manager)
+
+    def operation(session):
+        return None
+
+    async def async_operation(session):
+        return None
+
+    native_sync = _sync_batch(lambda: sync_manager.execute_with_transaction(operation))
+    native_async = _async_batch(lambda: async_manager.execute_with_transaction(async_operation))
+    return [
+        ("SyncToAsyncTransactionManager",
+         _loop_batch(loop, lambda: sync_to_async.execute_with_transaction(async_operation)), native_sync),
+        ("AsyncToSyncTransactionManager",
+         _sync_batch(lambda: async_to_sync.execute_with_transaction(operation)), native_async),
+    ]
+
+
+def _transactional_pairs(backend: _Backend, loop: asyncio.AbstractEventLoop) -> List[Tuple[str, Batch, Batch]]:
+    sync_manager = SyncTransactionManager(backend.sync_factory)
+    async_manager = AsyncTransactionManager(backend.async_factory)
+
+    # The session parameter is found by its annotation, one function per session type
+    def get(session: SyncSession, item_id: str) -> str:
+        return item_id
+
+    def get_bridged(session: AsyncSession, item_id: str) -> str:
+        return item_id
+
+    async def aget(session: AsyncSession, item_id: str) -> str:
+        return item_id
+
+    async def aget_bridged(session: SyncSession, item_id: str) -> str:
+        return item_id
+
+    pairs = []
+    for manager, func, run in (
+            (sync_manager, get, _sync_batch),
+            (AsyncToSyncTransactionManager(async_manager), get_bridged, _sync_batch),
+            (async_manager, aget, _async_batch),
+            (SyncToAsyncTransactionManager(sync_manager), aget_bridged, lambda call: _loop_batch(loop, call))):
+        wrapped = manager.transactional()(func)
+        pairs.append((f"transactional({type(manager).__name__})", run(lambda w=wrapped: w("item")),
+                      run(lambda m=manager, f=func: m.execute_with_transaction(lambda session: f(session, "item")))))
+    return pairs
+
+
+def bench(backend_name: str, number: int, repeat: int) -> List[Dict[str, Any]]:
+    backend = _Backend(backend_name)
+    loop = asyncio.new_event_loop()
+    results = []
+    try:
+        for group, pairs in (("strategy", _strategy_pairs), ("bridge", _manager_pairs),
+                             ("transactional", _transactional_pairs)):
+            for name, adapted, native in pairs(backend, loop):
+                adapted_us = _best_of(adapted, number, repeat)
+                native_us = _best_of(native, number, repeat)
+                results.append({"group": group, "adapter": name, "backend": backend_name, "us_per_call": adapted_us,
+                                "native_us_per_call": native_us, "overhead_us": adapted_us - native_us})
+    finally:
+        loop.close()
+        backend.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats, best is reported")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--json", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    try:
+        for backend in args.backends:
+            results.extend(bench(backend, args.number, args.repeat))
+    finally:
+        background_loop.stop()
+
+    print(f"{'adapter':>52} {'backend':>7} {'us/call':>9} {'native':>9} {'overhead':>9}")
+    for r in results:
+        print(f"{r['adapter']:>52} {r['backend']:>7} {r['us_per_call']:9.2f} {r['native_us_per_call']:9.2f} "
+              f"{r['overhead_us']:9.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark DB round trips saved by batching concurrent item gets.
+
+For each fan-out N, issues N concurrent ``AsyncItemService.get`` calls for
+distinct items (as N requests resolving one item each would) against an
+aiosqlite database, once without and once with the batch loader, and counts
+the statements sent to the database and the pool checkouts. ``get_many`` of the
+same N ids is reported as the lower bound.
+
+Usage:
+    python -m benchmarks.bench_batch_get [--rows 2000] [--fanout 1 10 50 200 1000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_transaction import AsyncTransactionManager
+from infras.repositories.base_po import BasePO
+from infras.repositories.item_async_repository import AsyncItemRepository
+from infras.repositories.item_po import ItemPO
+from services.batch_loader import AsyncBatchLoader
+from services.item_async_service import AsyncItemService
+
+
+def seed(path: str, rows: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    BasePO.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ItemPO), [
+            {"id": f"{i:036d}", "name": f"item-{i}", "description": "benchmark item",
+             "quantity": i % 100, "price": float(i % 1000)}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+class Counter:
+    """Counts statements and pool checkouts of an engine."""
+
+    def __init__(self, engine):
+        self.statements = 0
+        self.checkouts = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine.pool, "checkout", self._checkout)
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _checkout(self, *args):
+        self.checkouts += 1
+
+    def reset(self) -> None:
+        self.statements = self.checkouts = 0
+
+
+async def _measure(counter: Counter, call) -> tuple:
+    counter.reset()
+    start = time.perf_counter()
+    await call()
+    return counter.statements, counter.checkouts, (time.perf_counter() - start) * 1e3
+
+
+async def run(path: str, rows: int, fanouts: list) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=20, max_overflow=0)
+    manager = AsyncTransactionManager(async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+    repo = AsyncItemRepository()
+    unbatched = AsyncItemService(transaction=manager, repo=repo)
+    batched = AsyncItemService(transaction=manager, repo=repo, loader=AsyncBatchLoader("item_loads"))
+    counter = Counter(engine.sync_engine)
+    await unbatched.get(f"{0:036d}")  # warm up
+
+    print(f"{'fan-out':>8} {'path':>9} {'queries':>8} {'checkouts':>10} {'ms':>8}")
+    try:
+        for fanout in fanouts:
+            ids = [f"{i % rows:036d}" for i in range(fanout)]
+            paths = (
+                ("get", lambda: asyncio.gather(*(unbatched.get(item_id) for item_id in ids))),
+                ("batched", lambda: asyncio.gather(*(batched.get(item_id) for item_id in ids))),
+                ("get_many", lambda: batched.get_many(ids)),
+            )
+            results = {}
+            for label, call in paths:
+                results[label] = statements, checkouts, ms = await _measure(counter, call)
+                print(f"{fanout:>8} {label:>9} {statements:>8} {checkouts:>10} {ms:>8.1f}")
+            saved = results["get"][0] - results["batched"][0]
+            print(f"{fanout:>8} {'saved':>9} {saved:>8} round trips ({saved / fanout:.0%})")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="items in the database")
+    parser.add_argument("--fanout", type=int, nargs="+", default=[1, 10, 50, 200, 1000],
+                        help="concurrent gets per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "batch.db")
+        seed(path, args.rows)
+        asyncio.run(run(path, args.rows, args.fanout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Core read path of read-only sessions against ORM reads.
+
+Reads one large page through SyncItemRepository.list twice per round: once in a
+plain session (ORM instances, identity map, ``from_attributes`` validation) and
+once in a session marked read-only (plain rows validated from a dict). Reports
+the median time per row and the peak traced memory per row, measured with
+tracemalloc in a separate pass so tracing does not skew the timings.
+
+Usage:
+    python -m benchmarks.bench_core_reads [--rows 50000] [--rounds 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from infras.repositories.base_po import BasePO
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import SyncItemRepository
+from infras.repositories.read_mode import mark_read_only
+from infras.repositories.sync_session import SyncSession
+
+
+def seed(engine, rows: int) -> None:
+    BasePO.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ItemPO), [
+            {"id": f"{i:036d}", "name": f"item-{i}", "description": "benchmark item",
+             "quantity": i % 100, "price": float(i % 1000)}
+            for i in range(rows)
+        ])
+
+
+def _read(repo: SyncItemRepository, session_factory, rows: int, core: bool) -> int:
+    with session_factory() as session:
+        if core:
+            mark_read_only(session)
+        return len(repo.list(session, limit=rows).items)
+
+
+def _median_us_per_row(repo: SyncItemRepository, session_factory, rows: int, core: bool, rounds: int) -> float:
+    _read(repo, session_factory, rows, core)  # warm up
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        assert _read(repo, session_factory, rows, core) == rows
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) / rows * 1e6
+
+
+def _peak_bytes_per_row(repo: SyncItemRepository, session_factory, rows: int, core: bool) -> float:
+    tracemalloc.start()
+    try:
+        _read(repo, session_factory, rows, core)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000, help="rows read per call")
+    parser.add_argument("--rounds", type=int, default=5, help="timed reads per path, median is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'reads.db')}")
+        seed(engine, args.rows)
+        session_factory = sessionmaker(bind=engine, class_=SyncSession, expire_on_commit=False)
+
+        repo = SyncItemRepository()
+        results = {}
+        for label, core in (("orm", False), ("core", True)):
+            per_row = _median_us_per_row(repo, session_factory, args.rows, core, args.rounds)
+            peak = _peak_bytes_per_row(repo, session_factory, args.rows, core)
+            results[label] = (per_row, peak)
+            print(f"{args.rows} rows {label:>4}: {per_row:6.2f} us/row, peak traced {peak:7.0f} B/row")
+        engine.dispose()
+
+    orm, core = results["orm"], results["core"]
+    print(f"core vs orm: {orm[0] / core[0]:.1f}x faster, {orm[1] / core[1]:.1f}x less peak memory per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmark the item API for every REPO_DRIVER and USE_ASYNC_ROUTER combination.
+
+Each of the 8 combinations runs the real FastAPI app (lifespan included) in its
+own subprocess, since the settings, the container and the router are fixed at
+import, against a fresh file-backed SQLite database. Requests go through an
+in-process ASGI transport, so no network or server is involved. For every
+operation (get, list, create, update, delete) and concurrency level, the
+throughput and the p50/p95/p99 latency are measured and written as JSON.
+
+With ``--baseline`` the results are compared against a stored run: a cell whose
+p95 latency grew, or whose throughput dropped, by more than ``--tolerance``
+fails the benchmark with exit status 1. ``--save-baseline`` stores the current
+run. Other settings (``ITEM_CACHE_SIZE``, ``COALESCE_READS``, ...) are taken from
+the environment as usual.
+
+SQLite takes one write lock for the whole database. A combination that
+interleaves transactions on asgiref's single thread (``uniform_sync_db`` on the
+async router without ``SYNC_SESSION_WORKERS``) stalls concurrent writes until
+SQLite's busy timeout, so a cell stops sending after ``--time-limit`` seconds
+and reports the requests it completed.
+
+Usage:
+    python -m benchmarks.bench_driver_matrix [--requests N] [--concurrency 1 8 32]
+        [--drivers ...] [--routers async sync] [--operations ...] [--time-limit S] [--output results.json]
+        [--baseline baseline.json [--tolerance 0.25]] [--save-baseline baseline.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+DRIVERS = ("async_db", "sync_db", "uniform_async_db", "uniform_sync_db")
+ROUTERS = ("async", "sync")
+OPERATIONS = ("get", "list", "create", "update", "delete")
+# Items in the database before the measured requests
+SEED_ITEMS = 1000
+LIST_LIMIT = 20
+# Requests sent before measuring an operation
+WARMUP_REQUESTS = 20
+
+Cell = Tuple[str, str, str, int]
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def _summary(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _item(prefix: str) -> Dict[str, Any]:
+    # Names are unique in the items table
+    return {"name": f"{prefix}-{uuid.uuid4().hex}", "description": "benchmark item", "quantity": 1, "price": 9.99}
+
+
+async def _seed(client, count: int) -> List[str]:
+    ids = []
+    for start in range(0, count, 500):
+        response = await client.post("/items/bulk", json=[_item("seed") for _ in range(min(500, count - start))])
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json())
+    return ids
+
+
+async def _measure(send: Callable[[int], Awaitable[Any]], requests: int, concurrency: int,
+                   time_limit: float) -> Dict[str, Any]:
+    """Send ``requests`` requests from ``concurrency`` concurrent clients, for at most ``time_limit`` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    deadline = time.perf_counter() + time_limit
+
+    async def client():
+        nonlocal errors
+        while (index := next(counter)) < requests and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await send(index)
+            latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return _summary(latencies, time.perf_counter() - start, errors)
+
+
+async def _run_operation(client, operation: str, ids: List[str], requests: int, concurrency: int,
+                         time_limit: float) -> Dict[str, Any]:
+    if operation == "get":
+        async def send(index):
+            return await client.get(f"/items/{ids[index % len(ids)]}")
+    elif operation == "list":
+        async def send(index):
+            return await client.get("/items/", params={"limit": LIST_LIMIT})
+    elif operation == "create":
+        async def send(index):
+            return await client.post("/items/", json=_item("create"))
+    elif operation == "update":
+        async def send(index):
+            return await client.put(f"/items/{ids[index % len(ids)]}", json=_item("update"))
+    elif operation == "delete":
+        # Every delete needs an item of its own, created before the clock starts
+        victims = await _seed(client, requests + WARMUP_REQUESTS)
+
+        async def send(index):
+            return await client.delete(f"/items/{victims[index]}")
+
+        for index in range(WARMUP_REQUESTS):
+            await send(requests + index)
+        return await _measure(send, requests, concurrency, time_limit)
+    else:
+        raise ValueError(f"unknown operation {operation}")
+
+    for index in range(WARMUP_REQUESTS):
+        await send(index)
+    return await _measure(send, requests, concurrency, time_limit)
+
+
+async def _worker(operations: List[str], requests: int, levels: List[int], time_limit: float,
+                  log_level: str) -> List[Dict[str, Any]]:
+    """Benchmark the app configured by the environment; runs in the subprocess."""
+    import httpx
+
+    import main
+
+    # The repositories log every statement at INFO, which would be measured too
+    logging.getLogger().setLevel(log_level)
+
+    results = []
+    async with main.lifespan(main.app):
+        # An unhandled error is a 500 for the client, counted as an error instead of ending the run
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ids = await _seed(client, SEED_ITEMS)
+            for operation in operations:
+                for concurrency in levels:
+                    summary = await _run_operation(client, operation, ids, requests, concurrency, time_limit)
+                    results.append({"operation": operation, "concurrency": concurrency, **summary})
+    return results
+
+
+def _run_combination(driver: str, router: str, args: argparse.Namespace, tmp: str) -> List[Dict[str, Any]]:
+    db_path = os.path.join(tmp, f"{driver}-{router}.db")
+    env = {
+        **os.environ,
+        "REPO_DRIVER": driver,
+        "USE_ASYNC_ROUTER": str(router == "async").lower(),
+        "USE_ASYNC_DB": str(driver in ("async_db", "uniform_async_db")).lower(),
+        "DB_URL_SYNC": f"sqlite:///{db_path}",
+        "DB_URL_ASYNC": f"sqlite+aiosqlite:///{db_path}",
+    }
+    command = [sys.executable, "-m", "benchmarks.bench_driver_matrix", "--worker",
+               "--requests", str(args.requests), "--time-limit", str(args.time_limit), "--log-level", args.log_level,
+               "--concurrency", *map(str, args.concurrency),
+               "--operations", *args.operations]
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True, check=True)
+    return [{"driver": driver, "router": router, **result} for result in json.loads(completed.stdout)]
+
+
+def _cell(result: Dict[str, Any]) -> Cell:
+    return result["driver"], result["router"], result["operation"], result["concurrency"]
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Regressions of ``results`` against ``baseline``, one message per cell."""
+    previous = {_cell(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(_cell(result))
+        if before is None:
+            continue
+        name = "{} / {} router / {} x{}".format(*_cell(result))
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors, baseline {before['errors']}")
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms, baseline {before['p95_ms']:.2f} ms")
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput']:.0f} req/s, baseline {before['throughput']:.0f} req/s")
+    return regressions
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    # On stderr, stdout may carry the JSON
+    print(f"{'driver':>16} {'router':>6} {'operation':>9} {'conc':>4} {'req/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}", file=sys.stderr)
+    for r in results:
+        print(f"{r['driver']:>16} {r['router']:>6} {r['operation']:>9} {r['concurrency']:>4} {r['throughput']:9.0f} "
+              f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['errors']:>6}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per operation and level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="concurrent clients")
+    parser.add_argument("--drivers", nargs="+", choices=DRIVERS, default=list(DRIVERS))
+    parser.add_argument("--routers", nargs="+", choices=ROUTERS, default=list(ROUTERS))
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--time-limit", type=float, default=30.0, help="seconds after which a cell stops sending")
+    parser.add_argument("--log-level", default="WARNING", help="log level of the benchmarked app")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="fail on regressions against the results stored in this file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative p95 growth or throughput drop tolerated against the baseline")
+    parser.add_argument("--save-baseline", help="store the results as a baseline in this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(asyncio.run(_worker(args.operations, args.requests, args.concurrency, args.time_limit,
+                                        args.log_level)), sys.stdout)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for driver, router in itertools.product(args.drivers, args.routers):
+            print(f"benchmarking {driver} with the {router} router", file=sys.stderr)
+            results.extend(_run_combination(driver, router, args, tmp))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+    if not args.output:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    _print_table(results)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regression against {args.baseline} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
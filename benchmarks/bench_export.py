@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of the streaming NDJSON export against a full list.
+
+Seeds file-backed SQLite databases of increasing size, then runs each mode in a
+fresh interpreter so its peak RSS is measured in isolation:
+
+- ``export-sync``: SyncItemService.export (``yield_per`` + ``stream_results``)
+- ``export-async``: AsyncItemService.export (``AsyncSession.stream``)
+- ``list``: the pre-streaming approach, every row loaded as ORM objects,
+  ItemModels and ItemSchemas before encoding
+
+Export memory should stay flat as the table grows; list memory grows with it.
+
+Usage:
+    python -m benchmarks.bench_export [--sizes 100000,1000000] [--list-max-rows 100000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+
+from infras.repositories.base_po import BasePO
+from infras.repositories.item_po import ItemPO
+
+SEED_BATCH = 50_000
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(db_path: str, rows: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    BasePO.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, SEED_BATCH):
+            conn.execute(insert(ItemPO), [
+                {"id": f"{i:036d}", "name": f"item-{i}", "description": "exported item",
+                 "quantity": i % 100, "price": float(i % 1000)}
+                for i in range(start, min(start + SEED_BATCH, rows))
+            ])
+    engine.dispose()
+
+
+def _run_export_sync(db_path: str) -> tuple[int, int]:
+    from sqlalchemy.orm import sessionmaker
+    from api.v1.controllers.ndjson import iter_ndjson
+    from infras.repositories.item_sync_repository import SyncItemRepository
+    from infras.repositories.sync_session import SyncSession
+    from infras.repositories.sync_transaction import SyncTransactionManager
+    from services.item_sync_service import SyncItemService
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    manager = SyncTransactionManager(sessionmaker(bind=engine, class_=SyncSession, expire_on_commit=False))
+    service = SyncItemService(transaction=manager, repo=SyncItemRepository())
+    lines = size = 0
+    for body in iter_ndjson(service.export()):
+        lines += body.count(b"\n")
+        size += len(body)
+    engine.dispose()
+    return lines, size
+
+
+def _run_export_async(db_path: str) -> tuple[int, int]:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from api.v1.controllers.ndjson import aiter_ndjson
+    from infras.repositories.async_session import AsyncSession
+    from infras.repositories.async_transaction import AsyncTransactionManager
+    from infras.repositories.item_async_repository import AsyncItemRepository
+    from services.item_async_service import AsyncItemService
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        manager = AsyncTransactionManager(async_sessionmaker(bind=engine, class_=AsyncSession,
+                                                             expire_on_commit=False))
+        service = AsyncItemService(transaction=manager, repo=AsyncItemRepository())
+        lines = size = 0
+        async for body in aiter_ndjson(service.export()):
+            lines += body.count(b"\n")
+            size += len(body)
+        await engine.dispose()
+        return lines, size
+
+    return asyncio.run(run())
+
+
+def _run_list(db_path: str) -> tuple[int, int]:
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from api.v1.schemas.item_schema import ItemSchema
+    from models.item_model import ItemModel
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        entities = [ItemModel.model_validate(i) for i in session.execute(select(ItemPO)).scalars().all()]
+        schemas = [ItemSchema.model_validate(e.model_dump()) for e in entities]
+        body = b"".join(s.model_dump_json().encode() + b"\n" for s in schemas)
+    engine.dispose()
+    return body.count(b"\n"), len(body)
+
+
+MODES = {"export-sync": _run_export_sync, "export-async": _run_export_async, "list": _run_list}
+
+
+def child(mode: str, db_path: str) -> None:
+    start = time.perf_counter()
+    lines, size = MODES[mode](db_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"rows": lines, "bytes": size, "seconds": elapsed,
+                      "peak_mb": _peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100000,1000000", help="comma separated table sizes")
+    parser.add_argument("--list-max-rows", type=int, default=100_000,
+                        help="skip the full-list mode above this size")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.db)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(s) for s in args.sizes.split(",")):
+            db_path = os.path.join(tmp, f"export_{rows}.db")
+            seed(db_path, rows)
+            for mode in MODES:
+                if mode == "list" and rows > args.list_max_rows:
+                    continue
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_export", "--child", mode, "--db", db_path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                stats = json.loads(out.strip().splitlines()[-1])
+                assert stats["rows"] == rows, stats
+                print(f"{rows:>9} rows {mode:>12}: peak RSS {stats['peak_mb']:7.1f} MB, "
+                      f"{rows / stats['seconds']:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
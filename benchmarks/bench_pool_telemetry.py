@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the per-checkout overhead of the pool telemetry.
+
+Checks a pooled SQLite connection out and back in: on a plain QueuePool, with
+the debug-log listeners the engine registry used to attach, and on a
+TimedQueuePool with a PoolTelemetry attached. Nothing is executed on the
+connection, so the differences are the cost of the listeners alone.
+
+Usage:
+    python -m benchmarks.bench_pool_telemetry [--number N] [--repeat R]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from infras.telemetry import PoolTelemetry, TimedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def _best_of(func: Callable[[], None], number: int, repeat: int) -> float:
+    """Best per-call time in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return min(timings)
+
+
+def _attach_debug_listeners(engine: Engine) -> None:
+    """The listeners replaced by the telemetry: the messages are formatted even with debug logging off."""
+    @event.listens_for(engine, "checkout")
+    def receive_checkout(dbapi_connection, connection_record, connection_proxy):
+        logger.debug(f"Connection checked out. Pool size: {engine.pool.size()}, Checked out: {engine.pool.checkedout()}")
+
+    @event.listens_for(engine, "checkin")
+    def receive_checkin(dbapi_connection, connection_record):
+        logger.debug(f"Connection checked in. Pool size: {engine.pool.size()}, Checked out: {engine.pool.checkedout()}")
+
+
+def _checkouts(engine: Engine, number: int) -> Callable[[], None]:
+    pool = engine.pool
+
+    def run():
+        for _ in range(number):
+            pool.connect().close()
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="checkouts per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats, best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        plain = create_engine(url, poolclass=QueuePool)
+        logged = create_engine(url, poolclass=QueuePool)
+        _attach_debug_listeners(logged)
+        timed = create_engine(url, poolclass=TimedQueuePool)
+        telemetry = PoolTelemetry(timed)
+        try:
+            results = [(name, _best_of(_checkouts(engine, args.number), args.number, args.repeat))
+                       for name, engine in (("plain QueuePool", plain), ("debug listeners", logged),
+                                            ("pool telemetry", timed))]
+        finally:
+            for engine in (plain, logged, timed):
+                engine.dispose()
+
+    baseline = results[0][1]
+    for name, per_checkout in results:
+        print(f"{name:>15}: {per_checkout:7.3f} us/checkout, overhead {per_checkout - baseline:7.3f} us/checkout")
+    print(f"telemetry recorded {telemetry.metrics.checkouts} checkouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark SyncToAsyncTransactionManager under concurrent requests (sync_db driver).
+
+Compares the shared-thread mode (every session call is a thread-sensitive hop)
+with dedicated session workers (one hop per unit of work, session pinned to a
+worker) by firing concurrent get/create calls at AsyncItemService against a
+file-backed SQLite database.
+
+Usage:
+    python -m benchmarks.bench_sync_to_async [--concurrency 200] [--workers 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from api.v1.schemas.item_schema import ItemCreateSchema
+from config import Settings
+from infras.executors.session_workers import SessionWorkerPool
+from infras.repositories.async_transaction import SyncToAsyncTransactionManager
+from infras.repositories.base_po import BasePO
+from infras.repositories.engine_registry import EngineRegistry
+from infras.repositories.item_async_repository import SyncToAsyncItemRepository
+from infras.repositories.sync_transaction import SyncTransactionManager
+from sqlalchemy.orm import sessionmaker
+from services.item_async_service import AsyncItemService
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def _run_wave(service: AsyncItemService, op: str, item_ids: list[str], concurrency: int) -> dict:
+    if op == "get":
+        coros = [service.get(item_ids[i % len(item_ids)]) for i in range(concurrency)]
+    else:
+        coros = [service.create(ItemCreateSchema(name=uuid.uuid4().hex[:32], description="bench",
+                                                 quantity=1, price=1.0))
+                 for _ in range(concurrency)]
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(c) for c in coros))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": concurrency / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+async def bench(mode: str, settings: Settings, concurrency: int, workers: int, rounds: int) -> dict:
+    engine = EngineRegistry().sync_engine(settings)
+    sync_manager = SyncTransactionManager(sessionmaker(bind=engine, expire_on_commit=False, autoflush=False))
+    session_workers = SessionWorkerPool(workers) if mode == "workers" else None
+    service = AsyncItemService(
+        transaction=SyncToAsyncTransactionManager(sync_manager, session_workers=session_workers),
+        repo=SyncToAsyncItemRepository(),
+    )
+
+    try:
+        item_ids = [(await service.create(ItemCreateSchema(name=uuid.uuid4().hex[:32], description="seed",
+                                                           quantity=1, price=1.0))).id
+                    for _ in range(20)]
+        results = {}
+        for op in ("get", "create"):
+            waves = [await _run_wave(service, op, item_ids, concurrency) for _ in range(rounds)]
+            results[op] = {key: statistics.median(w[key] for w in waves) for key in waves[0]}
+        return results
+    finally:
+        if session_workers is not None:
+            session_workers.shutdown()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent requests per wave")
+    parser.add_argument("--workers", type=int, default=20, help="session workers in workers mode")
+    parser.add_argument("--rounds", type=int, default=5, help="waves per operation, median is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("shared-thread", "workers"):
+            db_path = os.path.join(tmp, f"{mode}.db")
+            settings = Settings(DB_URL_SYNC=f"sqlite:///{db_path}", POOL_SIZE=20, MAX_OVERFLOW=10,
+                                POOL_TIMEOUT=30, POOL_RECYCLE=3600)
+            BasePO.metadata.create_all(bind=EngineRegistry().sync_engine(settings))
+            results = asyncio.run(bench(mode, settings, args.concurrency, args.workers, args.rounds))
+            for op, stats in results.items():
+                print(f"{mode:>13} {op:>6}: {stats['throughput']:8.1f} req/s, "
+                      f"p50 {stats['p50_ms']:7.1f} ms, p99 {stats['p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
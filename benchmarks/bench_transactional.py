@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the per-call overhead of ``transactional`` wrappers.
+
+The transaction manager used here hands a fake session straight to the
+operation, so the numbers only contain the cost of the decorator itself
+(session parameter lookup, argument placement and the call).
+
+Usage:
+    python -m benchmarks.bench_transactional [--number N] [--repeat R]
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable
+
+from infras.repositories.base_transaction import BaseTransactionManager
+from infras.repositories.sync_session import SyncSession
+
+
+class _FakeSession:
+    pass
+
+
+class _NoopSyncTransactionManager(BaseTransactionManager):
+    def __init__(self):
+        super().__init__(SyncSession)
+        self._session = _FakeSession()
+
+    def execute_with_session(self, operation):
+        return operation(self._session)
+
+    def execute_with_transaction(self, operation, savepoint=False):
+        return operation(self._session)
+
+
+class _NoopAsyncTransactionManager(BaseTransactionManager):
+    def __init__(self):
+        super().__init__(SyncSession)
+        self._session = _FakeSession()
+
+    async def execute_with_session(self, operation):
+        return await operation(self._session)
+
+    async def execute_with_transaction(self, operation, savepoint=False):
+        return await operation(self._session)
+
+
+class _Service:
+    def get(self, session: SyncSession, item_id: str) -> str:
+        return item_id
+
+    async def aget(self, session: SyncSession, item_id: str) -> str:
+        return item_id
+
+
+def _best_of(func: Callable[[], None], number: int, repeat: int) -> float:
+    """Best per-call time in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return min(timings)
+
+
+def bench_sync(number: int, repeat: int) -> tuple[float, float]:
+    service = _Service()
+    wrapped = _NoopSyncTransactionManager()._create_transactional_decorator(read_only=True)(service.get)
+    session = _FakeSession()
+
+    def direct():
+        for _ in range(number):
+            service.get(session, "item")
+
+    def decorated():
+        for _ in range(number):
+            wrapped("item")
+
+    return _best_of(direct, number, repeat), _best_of(decorated, number, repeat)
+
+
+def bench_async(number: int, repeat: int) -> tuple[float, float]:
+    service = _Service()
+    wrapped = _NoopAsyncTransactionManager()._create_transactional_decorator(read_only=True, is_async=True)(
+        service.aget)
+    session = _FakeSession()
+    loop = asyncio.new_event_loop()
+
+    async def direct_batch():
+        for _ in range(number):
+            await service.aget(session, "item")
+
+    async def decorated_batch():
+        for _ in range(number):
+            await wrapped("item")
+
+    try:
+        direct = _best_of(lambda: loop.run_until_complete(direct_batch()), number, repeat)
+        decorated = _best_of(lambda: loop.run_until_complete(decorated_batch()), number, repeat)
+    finally:
+        loop.close()
+    return direct, decorated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="calls per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats, best is reported")
+    args = parser.parse_args()
+
+    for name, bench in (("sync", bench_sync), ("async", bench_async)):
+        direct, decorated = bench(args.number, args.repeat)
+        print(f"{name:>5}: direct {direct:7.3f} us/call, "
+              f"transactional {decorated:7.3f} us/call, overhead {decorated - direct:7.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,14 +21,45 @@ class Settings(BaseSettings):
     # DB connection
     DB_URL_SYNC: Annotated[str, Field(description="SYNC DB URL")] = "sqlite:///./example.db"
     DB_URL_ASYNC: Annotated[str, Field(description="Async DB URL")] = "sqlite+aiosqlite:///./example.db"
+    DB_REPLICA_URLS_SYNC: Annotated[list[str], Field(description="Sync read replica URLs, a JSON list")] = []
+    DB_REPLICA_URLS_ASYNC: Annotated[list[str], Field(description="Async read replica URLs, a JSON list")] = []
+    REPLICA_SELECTION: Annotated[Literal["round_robin", "least_outstanding"], Field(description="How read-only transactions pick a replica")] = "round_robin"
+    REPLICA_RETRY_AFTER: Annotated[float, Field(description="Seconds a failed replica is skipped", ge=0)] = 5.0
+    READ_YOUR_WRITES_WINDOW: Annotated[float, Field(description="Seconds reads stay on the primary after a write of the same request", ge=0)] = 2.0
+    REQUEST_SCOPED_SESSION: Annotated[bool, Field(description="Share one session and transaction per database between the service calls of a request")] = False
 
 
     # SQLAlchemy
     ECHO: Annotated[bool, Field(description="SQL Echo")] = False
     POOL_SIZE: Annotated[int, Field(description='Connection pool size', ge=1)] = 20
     MAX_OVERFLOW: Annotated[int, Field(description='Maximum overflow connections', ge=0)] = 10
-    POOL_RECYCLE: Annotated[int, Field(description='Connection recycle time in seconds', ge=0)] = 10
+    POOL_RECYCLE: Annotated[int, Field(description='Maximum connection lifetime in seconds (0 = unlimited)', ge=0)] = 1800
+    POOL_RECYCLE_JITTER: Annotated[float, Field(description='Share of POOL_RECYCLE taken off each connection lifetime at random', ge=0, le=1)] = 0.2
+    POOL_IDLE_TIMEOUT: Annotated[int, Field(description='Seconds a connection may stay idle before it is closed (0 = never)', ge=0)] = 0
+    POOL_PING_AFTER: Annotated[float, Field(description='Seconds of idleness after which a checkout pings the connection first (0 = every reuse)', ge=0)] = 30.0
     POOL_TIMEOUT: Annotated[int, Field(description='Connection timeout in seconds', ge=0)] = 5
+    POOL_AUTOSIZE: Annotated[bool, Field(description='Resize the pools between POOL_SIZE_MIN and POOL_SIZE_MAX from their checkout wait and utilization')] = False
+    POOL_SIZE_MIN: Annotated[int, Field(description='Smallest pool size with POOL_AUTOSIZE', ge=1)] = 1
+    POOL_SIZE_MAX: Annotated[int, Field(description='Largest pool size with POOL_AUTOSIZE (0 = 2 * POOL_SIZE)', ge=0)] = 0
+    POOL_AUTOSIZE_INTERVAL: Annotated[float, Field(description='Seconds between two pool sizing decisions', gt=0)] = 5.0
+    POOL_GROW_WAIT: Annotated[float, Field(description='Mean checkout wait in seconds from which a pool grows', ge=0)] = 0.01
+    POOL_SHRINK_UTILIZATION: Annotated[float, Field(description='Utilization a pool shrinks towards', gt=0, le=1)] = 0.5
+    WARMUP_ON_STARTUP: Annotated[bool, Field(description='Pre-fill the pools and compile the repository statements before reporting ready')] = True
+    WARMUP_WRITES: Annotated[bool, Field(description='Also warm the write statements of the primary in a rolled-back transaction, which takes the write lock')] = False
+    WARMUP_CONNECTIONS: Annotated[int, Field(description='Connections opened per engine during warm-up (0 = POOL_SIZE)', ge=0)] = 0
+    WARMUP_RETRY_DELAY: Annotated[float, Field(description='Seconds before retrying a failed warm-up, doubled after every failure', gt=0)] = 1.0
+    WARMUP_RETRY_MAX_DELAY: Annotated[float, Field(description='Longest delay between two warm-up attempts', gt=0)] = 30.0
+
+    # Executors
+    EXECUTOR_MAX_WORKERS: Annotated[int, Field(description='Worker threads per executor (0 = POOL_SIZE + MAX_OVERFLOW)', ge=0)] = 0
+    EXECUTOR_QUEUE_SIZE: Annotated[int, Field(description='Tasks allowed to wait for a worker before rejecting (0 = unbounded)', ge=0)] = 100
+    SYNC_SESSION_WORKERS: Annotated[int, Field(description='Dedicated session worker threads for sync sessions on async routes (0 = shared thread)', ge=0)] = 0
+
+    # Cache
+    ITEM_CACHE_SIZE: Annotated[int, Field(description='Items kept in the in-process get_by_id cache (0 = disabled)', ge=0)] = 0
+    ITEM_CACHE_TTL: Annotated[float, Field(description='Seconds a cached item stays valid', gt=0)] = 5.0
+    COALESCE_READS: Annotated[bool, Field(description='Share one in-flight database read between concurrent identical item reads')] = False
+    BATCH_ITEM_LOADS: Annotated[bool, Field(description='Batch concurrent async item gets into one IN query per event-loop iteration')] = False
 
 
 @lru_cache
@@ -1,6 +1,7 @@
 from dependency_injector import containers, providers
 
 from config import get_settings
+from infras.executors.session_workers import create_session_worker_pool
 from infras.repositories.async_session_execution import SyncToAsyncExecutionStrategy, AsyncExecutionStrategy
 from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
 from infras.repositories.factory import sync_session_factory, async_session_factory, get_session_factory
@@ -9,15 +10,20 @@ from infras.repositories.item_async_repository import (
     SyncToAsyncItemRepository,
     UniformAsyncItemRepository
 )
+from infras.repositories.item_cached_repository import create_item_cache, with_item_cache
 from infras.repositories.item_sync_repository import (
     SyncItemRepository,
     AsyncToSyncItemRepository,
     UniformSyncItemRepository,
 )
+from infras.repositories.replicas import create_async_replicas, create_sync_replicas
 from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
 from infras.repositories.sync_transaction import SyncTransactionManager, AsyncToSyncTransactionManager
+from infras.repositories.unit_of_work import reads_are_private
+from services.batch_loader import create_item_loader
 from services.item_async_service import AsyncItemService
 from services.item_sync_service import SyncItemService
+from services.single_flight import create_async_read_flights, create_read_flights
 
 
 class Container(containers.DeclarativeContainer):
@@ -43,6 +49,38 @@ class Container(containers.DeclarativeContainer):
         get_session_factory,
         settings=settings,
     )
+    session_workers = providers.Singleton(
+        create_session_worker_pool,
+        settings=settings,
+    )
+    sync_replicas = providers.Singleton(
+        create_sync_replicas,
+        settings=settings,
+    )
+    async_replicas = providers.Singleton(
+        create_async_replicas,
+        settings=settings,
+    )
+    item_cache = providers.Singleton(
+        create_item_cache,
+        settings=settings,
+    )
+    # Reads shared between requests; private reads (see reads_are_private) skip them
+    read_flights = providers.Singleton(
+        create_read_flights,
+        settings=settings,
+        bypass=providers.Object(reads_are_private),
+    )
+    async_read_flights = providers.Singleton(
+        create_async_read_flights,
+        settings=settings,
+        bypass=providers.Object(reads_are_private),
+    )
+    item_loader = providers.Singleton(
+        create_item_loader,
+        settings=settings,
+        bypass=providers.Object(reads_are_private),
+    )
     # sync_transaction_manager = providers.Factory(
     #     SyncTransactionManager,
     #     session_factory=sync_session_factory.provided
@@ -84,22 +122,34 @@ class Container(containers.DeclarativeContainer):
                 AsyncToSyncTransactionManager,
                 async_transaction_manager=providers.Factory(
                     AsyncTransactionManager,
-                    session_factory=async_session_factory
+                    session_factory=async_session_factory,
+                    replicas=async_replicas,
                 )
             ),
             repo=providers.Factory(
-                AsyncToSyncItemRepository
+                with_item_cache,
+                repo=providers.Factory(
+                    AsyncToSyncItemRepository
+                ),
+                cache=item_cache,
             ),
+            flights=read_flights,
         ),
         sync_db=providers.Factory(
             SyncItemService,
             transaction=providers.Factory(
                 SyncTransactionManager,
-                session_factory=sync_session_factory
+                session_factory=sync_session_factory,
+                replicas=sync_replicas,
             ),
             repo=providers.Factory(
-                SyncItemRepository
+                with_item_cache,
+                repo=providers.Factory(
+                    SyncItemRepository
+                ),
+                cache=item_cache,
             ),
+            flights=read_flights,
         ),
         uniform_async_db=providers.Factory(
             SyncItemService,
@@ -107,28 +157,40 @@ class Container(containers.DeclarativeContainer):
                 AsyncToSyncTransactionManager,
                 async_transaction_manager=providers.Factory(
                     AsyncTransactionManager,
-                    session_factory=async_session_factory
+                    session_factory=async_session_factory,
+                    replicas=async_replicas,
                 )
             ),
             repo=providers.Factory(
-                UniformSyncItemRepository,
-                strategy=providers.Factory(
-                    AsyncToSyncExecutionStrategy,
+                with_item_cache,
+                repo=providers.Factory(
+                    UniformSyncItemRepository,
+                    strategy=providers.Factory(
+                        AsyncToSyncExecutionStrategy,
+                    ),
                 ),
+                cache=item_cache,
             ),
+            flights=read_flights,
         ),
         uniform_sync_db=providers.Factory(
             SyncItemService,
             transaction=providers.Factory(
                 SyncTransactionManager,
-                session_factory=sync_session_factory
+                session_factory=sync_session_factory,
+                replicas=sync_replicas,
             ),
             repo=providers.Factory(
-                UniformSyncItemRepository,
-                strategy=providers.Factory(
-                    SyncExecutionStrategy,
+                with_item_cache,
+                repo=providers.Factory(
+                    UniformSyncItemRepository,
+                    strategy=providers.Factory(
+                        SyncExecutionStrategy,
+                    ),
                 ),
+                cache=item_cache,
             ),
+            flights=read_flights,
         )
     )
 
@@ -138,11 +200,18 @@ class Container(containers.DeclarativeContainer):
             AsyncItemService,
             transaction=providers.Factory(
                 AsyncTransactionManager,
-                session_factory=async_session_factory
+                session_factory=async_session_factory,
+                replicas=async_replicas,
             ),
             repo=providers.Factory(
-                AsyncItemRepository
+                with_item_cache,
+                repo=providers.Factory(
+                    AsyncItemRepository
+                ),
+                cache=item_cache,
             ),
+            flights=async_read_flights,
+            loader=item_loader,
         ),
         sync_db=providers.Factory(
             AsyncItemService,
@@ -150,25 +219,40 @@ class Container(containers.DeclarativeContainer):
                 SyncToAsyncTransactionManager,
                 sync_transaction_manager=providers.Factory(
                     SyncTransactionManager,
-                    session_factory=sync_session_factory
-                )
+                    session_factory=sync_session_factory,
+                    replicas=sync_replicas,
+                ),
+                session_workers=session_workers,
             ),
             repo=providers.Factory(
-                SyncToAsyncItemRepository
+                with_item_cache,
+                repo=providers.Factory(
+                    SyncToAsyncItemRepository
+                ),
+                cache=item_cache,
             ),
+            flights=async_read_flights,
+            loader=item_loader,
         ),
         uniform_async_db=providers.Factory(
             AsyncItemService,
             transaction=providers.Factory(
                 AsyncTransactionManager,
-                session_factory=async_session_factory
+                session_factory=async_session_factory,
+                replicas=async_replicas,
             ),
             repo=providers.Factory(
-                UniformAsyncItemRepository,
-                strategy=providers.Factory(
-                    AsyncExecutionStrategy,
+                with_item_cache,
+                repo=providers.Factory(
+                    UniformAsyncItemRepository,
+                    strategy=providers.Factory(
+                        AsyncExecutionStrategy,
+                    ),
                 ),
+                cache=item_cache,
             ),
+            flights=async_read_flights,
+            loader=item_loader,
         ),
         uniform_sync_db=providers.Factory(
             AsyncItemService,
@@ -176,14 +260,22 @@ class Container(containers.DeclarativeContainer):
                 SyncToAsyncTransactionManager,
                 sync_transaction_manager=providers.Factory(
                     SyncTransactionManager,
-                    session_factory=sync_session_factory
-                )
+                    session_factory=sync_session_factory,
+                    replicas=sync_replicas,
+                ),
+                session_workers=session_workers,
             ),
             repo=providers.Factory(
-                UniformAsyncItemRepository,
-                strategy=providers.Factory(
-                    SyncToAsyncExecutionStrategy,
+                with_item_cache,
+                repo=providers.Factory(
+                    UniformAsyncItemRepository,
+                    strategy=providers.Factory(
+                        SyncToAsyncExecutionStrategy,
+                    ),
                 ),
+                cache=item_cache,
             ),
+            flights=async_read_flights,
+            loader=item_loader,
         )
     )
@@ -0,0 +1,15 @@
+from .commit_hooks import (
+    AFTER_COMMIT_KEY,
+    run_after_commit,
+)
+from .lru_cache import (
+    CacheMetrics,
+    LRUTTLCache,
+)
+
+__all__ = [
+    "AFTER_COMMIT_KEY",
+    "run_after_commit",
+    "CacheMetrics",
+    "LRUTTLCache",
+]
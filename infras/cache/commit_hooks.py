@@ -0,0 +1,49 @@
+"""
+Callbacks run once a session's transaction has committed.
+
+Callbacks are queued in ``Session.info`` and run from the session's
+``after_commit`` event, so work that must only follow a durable write (such as
+cache invalidation) never runs for a transaction that rolls back. Both sync
+sessions and the sync session behind an ``AsyncSession`` fire these events.
+"""
+import logging
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+logger = logging.getLogger(__name__)
+
+# Key under which pending callbacks are stored in ``Session.info``
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def run_after_commit(session: Any, callback: Callable[[], None]) -> None:
+    """
+    Run ``callback`` after the session's current transaction commits.
+
+    Callbacks are dropped if the transaction ends any other way. Sessions without
+    an ``info`` dict cannot be tracked and run the callback immediately.
+    """
+    info = getattr(session, "info", None)
+    if not isinstance(info, dict):
+        callback()
+        return
+    info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session) -> None:
+    for callback in session.info.pop(AFTER_COMMIT_KEY, ()):
+        try:
+            callback()
+        except Exception as e:
+            # The transaction is already committed, a failing callback must not undo that
+            logger.error(f"after-commit callback {callback!r} failed: {e}")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_callbacks(session: Session, transaction: SessionTransaction) -> None:
+    # Rolled back or closed without committing; commits already consumed their callbacks
+    if transaction.parent is None:
+        session.info.pop(AFTER_COMMIT_KEY, None)
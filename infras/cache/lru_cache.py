@@ -0,0 +1,225 @@
+"""
+Bounded in-process cache with LRU eviction and a TTL.
+
+Loads go through :meth:`LRUTTLCache.get_or_load` (or its async twin) so a value
+read before an invalidation is never stored after it: each load remembers the
+cache's invalidation clock when it started, and its result is dropped if the key
+was invalidated while the load was in flight.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheMetrics:
+    """Point-in-time metrics of a cache."""
+    name: str
+    max_size: int
+    ttl: float
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUTTLCache(Generic[K, V]):
+    """A thread-safe LRU cache whose entries also expire ``ttl`` seconds after they are stored."""
+
+    def __init__(self, name: str, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Cache name, used in logs and metrics
+            max_size: Maximum number of entries, the least recently used is evicted beyond it
+            ttl: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source, replaceable in tests
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, expires_at), least recently used first
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        # Loads in flight per key, and the invalidation clock value of the last
+        # invalidation that hit one of them
+        self._loading: Dict[K, int] = {}
+        self._invalidated_at: Dict[K, int] = {}
+        self._invalidation_clock = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        logger.info(f"Cache {name} initialized with {max_size} entries, ttl {ttl}s")
+
+    def get(self, key: K) -> Optional[V]:
+        """The cached value of ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key: K) -> None:
+        """Drop ``key`` and discard the result of any load of it still in flight."""
+        with self._lock:
+            self._invalidation_clock += 1
+            self._invalidations += 1
+            self._entries.pop(key, None)
+            if key in self._loading:
+                self._invalidated_at[key] = self._invalidation_clock
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidation_clock += 1
+            self._entries.clear()
+            for key in self._loading:
+                self._invalidated_at[key] = self._invalidation_clock
+
+    def get_or_load(self, key: K, load: Callable[[], Optional[V]]) -> Optional[V]:
+        """
+        The cached value of ``key``, or the result of ``load()`` stored on a miss.
+
+        None results are returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        token = self._begin_load(key)
+        value = None
+        try:
+            value = load()
+        finally:
+            self._end_load(key, token, value)
+        return value
+
+    async def aget_or_load(self, key: K, load: Callable[[], Awaitable[Optional[V]]]) -> Optional[V]:
+        """Async variant of :meth:`get_or_load`."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        token = self._begin_load(key)
+        value = None
+        try:
+            value = await load()
+        finally:
+            self._end_load(key, token, value)
+        return value
+
+    def get_many_or_load(self, keys: Sequence[K],
+                         load_many: Callable[[List[K]], Sequence[Optional[V]]]) -> List[Optional[V]]:
+        """
+        Cached values of ``keys``, with the misses loaded by one ``load_many(missing)`` call.
+
+        ``load_many`` returns one value (or None) per missing key, in order.
+        """
+        values, missing = self._get_many(keys)
+        if missing:
+            tokens = [self._begin_load(key) for key in missing]
+            loaded: Sequence[Optional[V]] = [None] * len(missing)
+            try:
+                loaded = load_many(missing)
+            finally:
+                self._end_loads(missing, tokens, loaded)
+            values.update(zip(missing, loaded))
+        return [values[key] for key in keys]
+
+    async def aget_many_or_load(self, keys: Sequence[K],
+                                load_many: Callable[[List[K]], Awaitable[Sequence[Optional[V]]]]) -> List[Optional[V]]:
+        """Async variant of :meth:`get_many_or_load`."""
+        values, missing = self._get_many(keys)
+        if missing:
+            tokens = [self._begin_load(key) for key in missing]
+            loaded: Sequence[Optional[V]] = [None] * len(missing)
+            try:
+                loaded = await load_many(missing)
+            finally:
+                self._end_loads(missing, tokens, loaded)
+            values.update(zip(missing, loaded))
+        return [values[key] for key in keys]
+
+    def _get_many(self, keys: Sequence[K]) -> Tuple[Dict[K, Optional[V]], List[K]]:
+        values: Dict[K, Optional[V]] = {}
+        missing: List[K] = []
+        for key in dict.fromkeys(keys):
+            value = values[key] = self.get(key)
+            if value is None:
+                missing.append(key)
+        return values, missing
+
+    def _end_loads(self, keys: List[K], tokens: List[int], values: Sequence[Optional[V]]) -> None:
+        for key, token, value in zip(keys, tokens, values):
+            self._end_load(key, token, value)
+
+    def _begin_load(self, key: K) -> int:
+        with self._lock:
+            self._loading[key] = self._loading.get(key, 0) + 1
+            return self._invalidation_clock
+
+    def _end_load(self, key: K, token: int, value: Optional[V]) -> None:
+        with self._lock:
+            stale = self._invalidated_at.get(key, 0) > token
+            remaining = self._loading[key] - 1
+            if remaining:
+                self._loading[key] = remaining
+            else:
+                del self._loading[key]
+                self._invalidated_at.pop(key, None)
+            if value is not None and not stale:
+                self._store(key, value)
+
+    def _store(self, key: K, value: V) -> None:
+        self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def metrics(self) -> CacheMetrics:
+        with self._lock:
+            return CacheMetrics(
+                name=self.name,
+                max_size=self.max_size,
+                ttl=self.ttl,
+                size=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+            )
@@ -1,15 +1,33 @@
 from .thread_pool import (
+    DEFAULT_EXECUTOR,
+    SYNC_DB_EXECUTOR,
+    ExecutorMetrics,
+    ExecutorRejectedError,
+    InstrumentedThreadPool,
     ThreadPoolManager,
     thread_pool_manager,
-    thread_pool,
     get_thread_pool,
+    get_engine_thread_pool,
     shutdown_thread_pool,
 )
+from .session_workers import (
+    SessionWorker,
+    SessionWorkerPool,
+    create_session_worker_pool,
+)
 
 __all__ = [
+    "DEFAULT_EXECUTOR",
+    "SYNC_DB_EXECUTOR",
+    "ExecutorMetrics",
+    "ExecutorRejectedError",
+    "InstrumentedThreadPool",
     "ThreadPoolManager",
     "thread_pool_manager",
-    "thread_pool",
     "get_thread_pool",
+    "get_engine_thread_pool",
     "shutdown_thread_pool",
+    "SessionWorker",
+    "SessionWorkerPool",
+    "create_session_worker_pool",
 ]
@@ -0,0 +1,131 @@
+"""
+Dedicated worker threads for sync sessions used from async code.
+
+A sync SQLAlchemy session must not hop between threads. Each unit of work is
+pinned to one worker of a sized pool, and everything that touches the session
+(open, begin, statements, commit, close) runs on that worker's thread.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Key under which the owning worker is stored in ``Session.info``
+SESSION_WORKER_KEY = "session_worker"
+
+_local = threading.local()
+
+
+class SessionWorker:
+    """A single thread that owns the sessions pinned to it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.outstanding = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=name,
+            initializer=self._init_thread,
+        )
+
+    def _init_thread(self) -> None:
+        _local.worker = self
+        # Private loop to drive coroutines that run entirely on this thread
+        _local.loop = asyncio.new_event_loop()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Submit ``fn`` to this worker, propagating the caller's context variables."""
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, fn, *args)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn`` on this worker, inline when already on its thread."""
+        if current_session_worker() is self:
+            return fn(*args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.submit(_close_thread_loop)
+        self._executor.shutdown(wait=wait)
+
+
+class SessionWorkerPool:
+    """Fixed-size pool of session workers, handing out the least loaded one."""
+
+    def __init__(self, size: int, thread_name_prefix: str = "db_adapter_session"):
+        if size < 1:
+            raise ValueError("SessionWorkerPool needs at least one worker")
+        self.size = size
+        self._workers = [SessionWorker(f"{thread_name_prefix}_{i}") for i in range(size)]
+        self._lock = threading.Lock()
+        logger.info(f"SessionWorkerPool initialized with {size} workers")
+
+    def acquire(self) -> SessionWorker:
+        """Reserve the least loaded worker; pair with :meth:`release`."""
+        current = current_session_worker()
+        with self._lock:
+            # A unit of work started from a worker must not wait on that same worker
+            candidates = [w for w in self._workers if w is not current]
+            if not candidates:
+                raise RuntimeError("Nested unit of work needs at least two session workers")
+            worker = min(candidates, key=lambda w: w.outstanding)
+            worker.outstanding += 1
+            return worker
+
+    def release(self, worker: SessionWorker) -> None:
+        with self._lock:
+            worker.outstanding -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn`` as one hop on a single worker."""
+        worker = self.acquire()
+        try:
+            return await worker.run(fn, *args)
+        finally:
+            self.release(worker)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for worker in self._workers:
+            worker.shutdown(wait=wait)
+        logger.info("SessionWorkerPool shutdown")
+
+
+def current_session_worker() -> Optional[SessionWorker]:
+    """The session worker owning the current thread, if any."""
+    return getattr(_local, "worker", None)
+
+
+def run_coroutine_on_worker(coro: Coroutine[Any, Any, T]) -> T:
+    """Drive ``coro`` to completion on the current session worker's loop."""
+    loop = getattr(_local, "loop", None)
+    if loop is None:
+        coro.close()
+        raise RuntimeError("run_coroutine_on_worker must be called from a session worker")
+    return loop.run_until_complete(coro)
+
+
+def pinned_session_worker(session: Any) -> Optional[SessionWorker]:
+    """The worker a sync session is pinned to, if it was opened by one."""
+    info = getattr(session, "info", None)
+    return info.get(SESSION_WORKER_KEY) if isinstance(info, dict) else None
+
+
+def create_session_worker_pool(settings: Any) -> Optional[SessionWorkerPool]:
+    """Build the session worker pool from settings, or None to keep the shared-thread mode."""
+    if not settings.SYNC_SESSION_WORKERS:
+        return None
+    return SessionWorkerPool(settings.SYNC_SESSION_WORKERS)
+
+
+def _close_thread_loop() -> None:
+    loop = getattr(_local, "loop", None)
+    if loop is not None:
+        loop.close()
+        _local.loop = None
+
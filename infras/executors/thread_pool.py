@@ -1,65 +1,252 @@
 """
-Thread pool executor for handling CPU-intensive tasks and sync operations in async context.
+Thread pool executors for handling CPU-intensive tasks and sync operations in async context.
+
+Pools are named per purpose, created on first use, sized from settings and
+instrumented. Sync repository calls get one pool per engine, so a slow replica or
+a second database cannot take the threads of the primary. Each pool has a bounded queue that
+rejects new work immediately once it is full, instead of letting requests pile up
+behind the connection pool timeout.
 """
-import os
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EXECUTOR = "default"
+# Runs sync repository calls against a sync engine from async routes, suffixed with the engine's URL
+SYNC_DB_EXECUTOR = "sync_db"
 
-class ThreadPoolManager:
-    """Manages thread pool executors for different use cases."""
-    
-    def __init__(self, max_workers: Optional[int] = None):
+
+class ExecutorRejectedError(RuntimeError):
+    """Raised when a task is submitted to an executor whose queue is full."""
+
+
+@dataclass(frozen=True)
+class ExecutorMetrics:
+    """Point-in-time metrics of an instrumented thread pool."""
+    name: str
+    max_workers: int
+    max_queue: int
+    active: int
+    queued: int
+    submitted: int
+    completed: int
+    rejected: int
+    wait_time_total: float
+    wait_time_max: float
+    run_time_total: float
+    run_time_max: float
+
+    @property
+    def wait_time_avg(self) -> float:
+        started = self.completed + self.active
+        return self.wait_time_total / started if started else 0.0
+
+    @property
+    def run_time_avg(self) -> float:
+        return self.run_time_total / self.completed if self.completed else 0.0
+
+
+class InstrumentedThreadPool(Executor):
+    """A ThreadPoolExecutor with a bounded queue and live metrics."""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
         """
-        Initialize thread pool manager.
-        
+        Initialize the pool.
+
         Args:
-            max_workers: Maximum number of worker threads. 
-                        If None, uses min(32, os.cpu_count() + 4)
+            name: Pool name, also used for the worker thread names
+            max_workers: Maximum number of worker threads
+            max_queue: Maximum number of tasks waiting for a worker, 0 for unbounded
         """
-        if max_workers is None:
-            # Default to min(32, os.cpu_count() + 4) as recommended by Python docs
-            max_workers = min(32, (os.cpu_count() or 1) + 4)
-        
+        self.name = name
         self.max_workers = max_workers
-        self._executor: Optional[ThreadPoolExecutor] = None
-        logger.info(f"ThreadPoolManager initialized with {max_workers} max workers")
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"db_adapter_{name}",
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._run_time_total = 0.0
+        self._run_time_max = 0.0
+        logger.info(f"Executor {name} initialized with {max_workers} max workers, queue size {max_queue or 'unbounded'}")
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorRejectedError(
+                    f"Executor {self.name} is saturated: {self._queued} tasks already waiting "
+                    f"for {self.max_workers} workers"
+                )
+            self._queued += 1
+            self._submitted += 1
+
+        try:
+            future = self._executor.submit(self._run, enqueued_at, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    def _release_cancelled(self, future: Future) -> None:
+        # A task cancelled before a worker picked it up never runs _run, which frees its queue slot
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _run(self, enqueued_at: float, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        started_at = time.perf_counter()
+        waited = started_at - enqueued_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            ran = time.perf_counter() - started_at
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._run_time_total += ran
+                self._run_time_max = max(self._run_time_max, ran)
 
     @property
-    def executor(self) -> ThreadPoolExecutor:
-        """Get or create the thread pool executor."""
-        if self._executor is None:
-            self._executor = ThreadPoolExecutor(
+    def metrics(self) -> ExecutorMetrics:
+        with self._lock:
+            return ExecutorMetrics(
+                name=self.name,
                 max_workers=self.max_workers,
-                thread_name_prefix="db_adapter_worker"
+                max_queue=self.max_queue,
+                active=self._active,
+                queued=self._queued,
+                submitted=self._submitted,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_time_total=self._wait_time_total,
+                wait_time_max=self._wait_time_max,
+                run_time_total=self._run_time_total,
+                run_time_max=self._run_time_max,
             )
-            logger.info("ThreadPoolExecutor created")
-        return self._executor
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        logger.info(f"Executor {self.name} shutdown")
+
+
+class ThreadPoolManager:
+    """Manages named, instrumented thread pools for different use cases."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        """
+        Initialize thread pool manager.
+
+        Args:
+            max_workers: Default worker count for new pools.
+                        If None, taken from settings on first use (see :meth:`configure`)
+            max_queue: Default queue bound for new pools, 0 for unbounded.
+                        If None, taken from settings on first use
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pools: Dict[str, InstrumentedThreadPool] = {}
+        # Pool name of each engine seen by for_engine
+        self._engine_names: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def configure(self, settings: Settings) -> None:
+        """
+        Size new pools from settings.
+
+        Pools default to the engine's connection budget (``POOL_SIZE + MAX_OVERFLOW``):
+        more threads than connections would only wait on the connection pool.
+        """
+        self.max_workers = settings.EXECUTOR_MAX_WORKERS or settings.POOL_SIZE + settings.MAX_OVERFLOW
+        self.max_queue = settings.EXECUTOR_QUEUE_SIZE
+
+    def get(self, name: str = DEFAULT_EXECUTOR, max_workers: Optional[int] = None,
+            max_queue: Optional[int] = None) -> InstrumentedThreadPool:
+        """
+        Get or create the named pool.
+
+        Args:
+            name: Pool name, one pool per engine or purpose
+            max_workers: Worker count if the pool is created, defaults to the configured size
+            max_queue: Queue bound if the pool is created, defaults to the configured bound
+        """
+        pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                if self.max_workers is None or self.max_queue is None:
+                    self.configure(get_settings())
+                pool = self._pools[name] = InstrumentedThreadPool(
+                    name,
+                    max_workers or self.max_workers,
+                    self.max_queue if max_queue is None else max_queue,
+                )
+            return pool
+
+    def for_engine(self, engine: Any) -> InstrumentedThreadPool:
+        """The :data:`SYNC_DB_EXECUTOR` pool of a sync ``engine``, one per engine."""
+        name = self._engine_names.get(engine)
+        if name is None:
+            name = self._engine_names[engine] = \
+                f"{SYNC_DB_EXECUTOR}[{engine.url.render_as_string(hide_password=True)}]"
+        return self.get(name)
+
+    def metrics(self) -> Dict[str, ExecutorMetrics]:
+        """Metrics of every pool created so far."""
+        with self._lock:
+            pools = list(self._pools.values())
+        return {pool.name: pool.metrics for pool in pools}
 
     def shutdown(self, wait: bool = True) -> None:
-        """Shutdown the thread pool executor."""
-        if self._executor is not None:
-            self._executor.shutdown(wait=wait)
-            self._executor = None
-            logger.info("ThreadPoolExecutor shutdown")
+        """Shutdown every pool; they are recreated on next use."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
 
+# Global thread pool manager instance, pools are created lazily
+thread_pool_manager = ThreadPoolManager()
 
-# Global thread pool manager instance
-# Use a reasonable default for database operations
-thread_pool_manager = ThreadPoolManager(max_workers=20)
 
-# Convenience access to the executor
-thread_pool = thread_pool_manager.executor
+def get_thread_pool(name: str = DEFAULT_EXECUTOR) -> InstrumentedThreadPool:
+    """Get the named global thread pool."""
+    return thread_pool_manager.get(name)
 
 
-def get_thread_pool() -> ThreadPoolExecutor:
-    """Get the global thread pool executor."""
-    return thread_pool
+def get_engine_thread_pool(engine: Any) -> InstrumentedThreadPool:
+    """Get the global thread pool running the sync repository calls of ``engine``."""
+    return thread_pool_manager.for_engine(engine)
 
 
 def shutdown_thread_pool(wait: bool = True) -> None:
-    """Shutdown the global thread pool executor."""
-    thread_pool_manager.shutdown(wait=wait) 
\ No newline at end of file
+    """Shutdown all global thread pools."""
+    thread_pool_manager.shutdown(wait=wait)
@@ -1,8 +1,9 @@
 import logging
-from typing import Any
+from typing import Any, AsyncIterator, Sequence
 
 from asgiref.sync import sync_to_async
 
+from infras.executors.session_workers import pinned_session_worker
 from ports.async_session_execution import IAsyncExecutionStrategy
 from .async_session import AsyncSession
 from .sync_session import SyncSession
@@ -39,24 +40,38 @@ class AsyncExecutionStrategy(IAsyncExecutionStrategy):
         logger.info(f"merge async instance")
         return await session.merge(instance)
 
+    async def stream_scalars(self, session: AsyncSession, stmt: Any, chunk_size: int) -> AsyncIterator[Sequence[Any]]:
+        logger.info(f"stream async stmt: {stmt}")
+        result = await session.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield partition
+
 
 class SyncToAsyncExecutionStrategy(IAsyncExecutionStrategy):
+    @staticmethod
+    async def _run(session: SyncSession, fn, *args) -> Any:
+        # Sessions opened by a session worker stay on that worker's thread
+        worker = pinned_session_worker(session)
+        if worker is not None:
+            return await worker.run(fn, *args)
+        return await sync_to_async(fn, thread_sensitive=True)(*args)
+
     async def execute(self, session: SyncSession, stmt) -> Any:
         logger.info(f"execute sync to async stmt: {stmt}")
 
-        return await sync_to_async(session.execute, thread_sensitive=True)(stmt)
+        return await self._run(session, session.execute, stmt)
 
     async def flush(self, session: SyncSession) -> None:
         logger.info(f"flush sync to async session")
-        await sync_to_async(session.flush, thread_sensitive=True)()
+        await self._run(session, session.flush)
 
     async def refresh(self, session: SyncSession, instance: Any) -> None:
         logger.info(f"refresh sync to async instance")
-        await sync_to_async(session.refresh, thread_sensitive=True)(instance)
+        await self._run(session, session.refresh, instance)
 
     async def delete(self, session: SyncSession, instance: Any) -> None:
         logger.info(f"delete sync to async instance")
-        await sync_to_async(session.delete, thread_sensitive=True)(instance)
+        await self._run(session, session.delete, instance)
 
     def add(self, session: SyncSession, instance: Any) -> None:
         logger.info(f"add sync to async instance")
@@ -68,4 +83,12 @@ class SyncToAsyncExecutionStrategy(IAsyncExecutionStrategy):
 
     async def merge(self, session: SyncSession, instance: Any) -> Any:
         logger.info(f"merge sync to async instance")
-        return await sync_to_async(session.merge, thread_sensitive=True)(instance)
+        return await self._run(session, session.merge, instance)
+
+    async def stream_scalars(self, session: SyncSession, stmt: Any, chunk_size: int) -> AsyncIterator[Sequence[Any]]:
+        logger.info(f"stream sync to async stmt: {stmt}")
+        stmt = stmt.execution_options(stream_results=True, yield_per=chunk_size)
+        partitions = (await self._run(session, session.scalars, stmt)).partitions()
+        # One hop per chunk; the cursor stays open on the session's connection in between
+        while (partition := await self._run(session, next, partitions, None)) is not None:
+            yield partition
@@ -1,20 +1,32 @@
 from contextlib import asynccontextmanager
-from typing import Callable, AsyncGenerator
+from typing import Any, Callable, AsyncGenerator, Optional
 
 from asgiref.sync import sync_to_async
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from infras.executors.session_workers import (
+    SESSION_WORKER_KEY,
+    SessionWorker,
+    SessionWorkerPool,
+    current_session_worker,
+    pinned_session_worker,
+    run_coroutine_on_worker,
+)
 from ports.async_transaction import IAsyncTransactionManager, AsyncOperation
 from ports.sync_transaction import ISyncTransactionManager
 from repositories import T
 from .async_session import AsyncSession
 from .base_transaction import BaseTransactionManager
+from .read_mode import mark_written
+from .replicas import ReplicaSet
 from .sync_session import SyncSession
+from .unit_of_work import UnitOfWork, after_commit, current_unit_of_work, finish_async_session, finish_sync_session
 
 
 class AsyncTransactionManager(IAsyncTransactionManager[AsyncSession], BaseTransactionManager):
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
-        super().__init__(AsyncSession)
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession],
+                 replicas: Optional[ReplicaSet[async_sessionmaker[AsyncSession]]] = None):
+        super().__init__(AsyncSession, replicas)
         self._session_factory = session_factory
         self.logger.info(f"init async transaction manager")
 
@@ -58,15 +70,19 @@ class AsyncTransactionManager(IAsyncTransactionManager[AsyncSession], BaseTransa
             # Execute it
             user = await transaction_manager.execute_with_session(get_user_by_id)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            return await operation(self._scoped_session(scope))
         async with self.session() as session:
             return await operation(session)
 
-    async def execute_with_transaction(self, operation: AsyncOperation[AsyncSession, T]) -> T:
+    async def execute_with_transaction(self, operation: AsyncOperation[AsyncSession, T], savepoint: bool = False) -> T:
         """
         Execute an asynchronous operation with transaction
         
         Args:
             operation: A callable that takes a session and returns a result
+            savepoint: In a unit of work, run the operation in a SAVEPOINT of its transaction
             
         Returns:
             The result of the operation
@@ -82,18 +98,55 @@ class AsyncTransactionManager(IAsyncTransactionManager[AsyncSession], BaseTransa
             # Execute it with transaction
             user = await transaction_manager.execute_with_transaction(create_user)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            session = self._scoped_session(scope)
+            mark_written(session)
+            if savepoint:
+                async with session.begin_nested():
+                    return await operation(session)
+            return await operation(session)
         async with self.transaction() as session:
             return await operation(session)
 
-    def transactional(self, read_only: bool = False):
+    def transactional(self, read_only: bool = False, savepoint: bool = False):
         """Returns a decorator for async functions."""
-        return self._create_transactional_decorator(read_only=read_only, is_async=True)
+        return self._create_transactional_decorator(read_only=read_only, is_async=True, savepoint=savepoint)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the writes of this context are committed."""
+        after_commit(callback)
+
+    async def _execute_on_replica(self, session_factory: async_sessionmaker[AsyncSession],
+                                  operation: AsyncOperation[AsyncSession, T]) -> T:
+        async with session_factory() as session:
+            return await operation(session)
+
+    def _scoped_session(self, scope: UnitOfWork) -> AsyncSession:
+        """The session of this manager in ``scope``, opened on first use."""
+        session = scope.get(self.scope_key)
+        if session is None:
+            session = self._session_factory()
+            scope.add(self.scope_key, session, lambda commit: finish_async_session(session, commit))
+        return session
 
 
 class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseTransactionManager):
-    def __init__(self, sync_transaction_manager: ISyncTransactionManager[SyncSession]):
-        super().__init__(SyncSession)
+    """
+    Runs a sync transaction manager from async code.
+
+    Without ``session_workers`` every session call is a separate thread-sensitive hop,
+    serialized on asgiref's single shared thread. With ``session_workers`` each session
+    is pinned to one worker of the pool and ``execute_with_*`` run the whole unit of
+    work (open, begin, operation, commit, close) in a single hop on that worker.
+    """
+
+    def __init__(self, sync_transaction_manager: ISyncTransactionManager[SyncSession],
+                 session_workers: Optional[SessionWorkerPool] = None):
+        # Reads go to the replicas of the wrapped manager
+        super().__init__(SyncSession, getattr(sync_transaction_manager, "replicas", None))
         self._sync_transaction_manager = sync_transaction_manager
+        self._session_workers = session_workers
         self.logger.info(f"init sync to async transaction manager")
 
     @property
@@ -102,6 +155,11 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
 
     @asynccontextmanager
     async def session(self) -> AsyncGenerator[SyncSession, None]:
+        if self._session_workers is not None:
+            async with self._pinned_session(begin=False) as sync_session:
+                yield sync_session
+            return
+
         sync_session = await sync_to_async(self._sync_transaction_manager.session_factory, thread_sensitive=True)()
 
         try:
@@ -111,6 +169,11 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
 
     @asynccontextmanager
     async def transaction(self) -> AsyncGenerator[SyncSession, None]:
+        if self._session_workers is not None:
+            async with self._pinned_session(begin=True) as sync_session:
+                yield sync_session
+            return
+
         sync_session = await sync_to_async(self._sync_transaction_manager.session_factory, thread_sensitive=True)()
 
         try:
@@ -141,6 +204,12 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
             # Execute it
             user = await transaction_manager.execute_with_session(get_user_by_id)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            return await operation(await self._scoped_session(scope))
+
+        if self._session_workers is not None:
+            return await self._session_workers.run(self._run_unit_of_work, operation, False)
 
         sync_session = await sync_to_async(self._sync_transaction_manager.session_factory, thread_sensitive=True)()
 
@@ -149,12 +218,13 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
         finally:
             await sync_to_async(sync_session.close, thread_sensitive=True)()
 
-    async def execute_with_transaction(self, operation: AsyncOperation[SyncSession, T]) -> T:
+    async def execute_with_transaction(self, operation: AsyncOperation[SyncSession, T], savepoint: bool = False) -> T:
         """
         Execute a synchronous operation with transaction using asyncio.to_thread
         
         Args:
             operation: A callable that takes a session and returns a result
+            savepoint: In a unit of work, run the operation in a SAVEPOINT of its transaction
             
         Returns:
             The result of the operation
@@ -169,6 +239,23 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
             # Execute it with transaction
             user = await transaction_manager.execute_with_transaction(create_user)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            sync_session = await self._scoped_session(scope)
+            mark_written(sync_session)
+            if not savepoint:
+                return await operation(sync_session)
+            nested = await self._on_session_thread(sync_session, sync_session.begin_nested)
+            try:
+                result = await operation(sync_session)
+                await self._on_session_thread(sync_session, nested.commit)
+                return result
+            except Exception:
+                await self._on_session_thread(sync_session, nested.rollback)
+                raise
+
+        if self._session_workers is not None:
+            return await self._session_workers.run(self._run_unit_of_work, operation, True)
 
         sync_session = await sync_to_async(self._sync_transaction_manager.session_factory, thread_sensitive=True)()
 
@@ -183,6 +270,102 @@ class SyncToAsyncTransactionManager(IAsyncTransactionManager[SyncSession], BaseT
         finally:
             await sync_to_async(sync_session.close, thread_sensitive=True)()
 
-    def transactional(self, read_only: bool = False):
+    def transactional(self, read_only: bool = False, savepoint: bool = False):
         """Returns a decorator for async functions."""
-        return self._create_transactional_decorator(read_only=read_only, is_async=True)
+        return self._create_transactional_decorator(read_only=read_only, is_async=True, savepoint=savepoint)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the writes of this context are committed."""
+        after_commit(callback)
+
+    async def _execute_on_replica(self, session_factory: Callable[[], SyncSession],
+                                  operation: AsyncOperation[SyncSession, T]) -> T:
+        if self._session_workers is not None:
+            return await self._session_workers.run(self._run_unit_of_work, operation, False, session_factory)
+
+        sync_session = await sync_to_async(session_factory, thread_sensitive=True)()
+
+        try:
+            return await operation(sync_session)
+        finally:
+            await sync_to_async(sync_session.close, thread_sensitive=True)()
+
+    def _open_pinned_session(self, worker: SessionWorker, begin: bool,
+                             session_factory: Optional[Callable[[], SyncSession]] = None) -> SyncSession:
+        sync_session = (session_factory or self._sync_transaction_manager.session_factory)()
+        sync_session.info[SESSION_WORKER_KEY] = worker
+        if begin:
+            sync_session.begin()
+        return sync_session
+
+    def _run_unit_of_work(self, operation: AsyncOperation[SyncSession, T], begin: bool,
+                          session_factory: Optional[Callable[[], SyncSession]] = None) -> T:
+        """Runs on a session worker: the operation's statements execute inline on this thread."""
+        sync_session = self._open_pinned_session(current_session_worker(), begin, session_factory)
+        try:
+            result = run_coroutine_on_worker(operation(sync_session))
+            if begin:
+                sync_session.commit()
+            return result
+        except Exception:
+            if begin:
+                sync_session.rollback()
+            raise
+        finally:
+            sync_session.close()
+
+    @asynccontextmanager
+    async def _pinned_session(self, begin: bool) -> AsyncGenerator[SyncSession, None]:
+        worker = self._session_workers.acquire()
+        try:
+            sync_session = await worker.run(self._open_pinned_session, worker, begin)
+            try:
+                yield sync_session
+                if begin:
+                    await worker.run(sync_session.commit)
+            except Exception:
+                if begin:
+                    await worker.run(sync_session.rollback)
+                raise
+            finally:
+                await worker.run(sync_session.close)
+        finally:
+            self._session_workers.release(worker)
+
+    @staticmethod
+    async def _on_session_thread(sync_session: SyncSession, fn: Callable[[], Any]) -> Any:
+        """Call ``fn`` on the thread owning ``sync_session``: its pinned worker, or asgiref's shared thread."""
+        worker = pinned_session_worker(sync_session)
+        if worker is not None:
+            return await worker.run(fn)
+        return await sync_to_async(fn, thread_sensitive=True)()
+
+    async def _scoped_session(self, scope: UnitOfWork) -> SyncSession:
+        """The session of this manager in ``scope``, opened on first use."""
+        sync_session = scope.get(self.scope_key)
+        if sync_session is not None:
+            return sync_session
+
+        if self._session_workers is not None:
+            # Pinned to one worker until the unit of work finishes
+            worker = self._session_workers.acquire()
+            try:
+                sync_session = await worker.run(self._open_pinned_session, worker, False)
+            except BaseException:
+                self._session_workers.release(worker)
+                raise
+
+            async def finish(commit: bool) -> None:
+                try:
+                    await worker.run(finish_sync_session, sync_session, commit)
+                finally:
+                    self._session_workers.release(worker)
+        else:
+            sync_session = await sync_to_async(self._sync_transaction_manager.session_factory,
+                                               thread_sensitive=True)()
+
+            async def finish(commit: bool) -> None:
+                await sync_to_async(finish_sync_session, thread_sensitive=True)(sync_session, commit)
+
+        scope.add(self.scope_key, sync_session, finish)
+        return sync_session
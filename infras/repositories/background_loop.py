@@ -0,0 +1,114 @@
+"""
+Long-lived event loop thread for running async sessions from sync code.
+
+``async_to_sync`` looks up or creates an event loop on every call, so a single
+sync request crossing into the async engine several times pays that cost each
+time, and async connections can end up used from different loops. Sync code
+instead submits whole coroutines to this loop, which owns every async session
+(and therefore every pooled connection) used through the sync adapters.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """An asyncio loop running forever in a dedicated thread."""
+
+    def __init__(self, name: str = "db_adapter_loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop thread; a no-op when it is already running."""
+        with self._lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            logger.info(f"Background event loop {self.name} started")
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Schedule ``coro`` on the loop, starting it on first use."""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def call(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the loop and block the calling (sync) thread for its result."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(f"{self.name}: blocking call from the loop's own thread would deadlock")
+        return self.submit(coro).result()
+
+    def iterate(self, aiterator: AsyncIterator[T]) -> Iterator[T]:
+        """Step ``aiterator`` on the loop, blocking the calling thread for one item at a time."""
+        async def step():
+            try:
+                return False, await aiterator.__anext__()
+            except StopAsyncIteration:
+                return True, None
+
+        try:
+            while True:
+                done, item = self.call(step())
+                if done:
+                    return
+                yield item
+        finally:
+            aclose = getattr(aiterator, "aclose", None)
+            if aclose is not None and self.running:
+                self.call(aclose())
+
+    def stop(self) -> None:
+        """Cancel pending tasks, stop the loop and join its thread."""
+        with self._lock:
+            if not self.running:
+                return
+            loop, thread = self._loop, self._thread
+
+            async def cancel_pending():
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await loop.shutdown_asyncgens()
+
+            asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            self._loop = None
+            self._thread = None
+            logger.info(f"Background event loop {self.name} stopped")
+
+
+# Global loop shared by the async-to-sync transaction manager, repositories and strategies
+background_loop = BackgroundEventLoop()
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Get the global background event loop."""
+    return background_loop
@@ -3,9 +3,18 @@ from datetime import datetime
 from typing import TypeVar
 
 from sqlalchemy import String, func, DateTime
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped, mapped_column
 
+# SQLite stores timestamps as text and CURRENT_TIMESTAMP has second precision. Bind
+# datetimes in the same format, otherwise a bound '... 10:00:00.000000' never equals
+# the stored '... 10:00:00' and keyset comparisons on created_at skip rows.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 
 class BasePO(DeclarativeBase):
     id: Mapped[str] = mapped_column(
@@ -16,13 +25,13 @@ class BasePO(DeclarativeBase):
         comment='Primary key'
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        Timestamp,
         server_default=func.now(),
         nullable=False,
         comment='Creation time'
     )
     updated_at: Mapped[datetime | None] = mapped_column(
-        DateTime(timezone=True),
+        Timestamp,
         server_default=func.now(),
         onupdate=func.now(),
         comment='Last update time'
@@ -1,32 +1,55 @@
 import inspect
 import logging
+import weakref
 from abc import ABC, abstractmethod
 from functools import wraps
 from inspect import iscoroutinefunction
-from typing import Callable, Type, Union, get_origin, TypeVar
+from typing import Callable, Hashable, Optional, Type, Union, get_origin, TypeVar
 
 from repositories import T, P
+from .read_mode import mark_read_only
+from .replicas import REPLICA_ERRORS, ReplicaSet
+from .unit_of_work import after_commit, current_unit_of_work
+
+# Session parameter resolved per underlying function and session type:
+# {function: {session_type: (name, index, keyword_only)}}
+_session_parameters: "weakref.WeakKeyDictionary[Callable, dict[Type, tuple[str, int, bool]]]" = \
+    weakref.WeakKeyDictionary()
 
 
 class BaseTransactionManager(ABC):
     """Base class for transaction managers with common session injection logic."""
 
-    def __init__(self, session_type: Type):
+    def __init__(self, session_type: Type, replicas: Optional[ReplicaSet] = None):
         self._session_type = session_type
+        # Session factories of the read replicas, None to read from the primary
+        self._replicas = replicas
+        self._decorators: dict[tuple[bool, bool, bool], Callable] = {}
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def _create_transactional_decorator(self, read_only: bool = False, is_async: bool = False):
+    def _create_transactional_decorator(self, read_only: bool = False, is_async: bool = False,
+                                        savepoint: bool = False):
         """
         Create a transactional decorator with session injection.
         
         Args:
-            read_only: Whether to use session (True) or transaction (False)
+            read_only: Whether to use session (True) or transaction (False). Read-only
+                sessions are marked so repositories can read plain Core rows, and come
+                from a replica when the manager has replicas
             is_async: Whether this is for async functions
+            savepoint: Run the call in a SAVEPOINT when it joins the transaction of a
+                unit of work, so that its failure only rolls back its own writes
             
         Returns:
             A decorator function
         """
+        key = (read_only, is_async, savepoint)
+        decorator = self._decorators.get(key)
+        if decorator is None:
+            decorator = self._decorators[key] = self._build_transactional_decorator(read_only, is_async, savepoint)
+        return decorator
 
+    def _build_transactional_decorator(self, read_only: bool, is_async: bool, savepoint: bool = False):
         def decorator(func: Callable[P, T]) -> Callable[P, T]:
             # Check function type
             if is_async:
@@ -36,84 +59,162 @@ class BaseTransactionManager(ABC):
                 if iscoroutinefunction(func):
                     raise TypeError("transactional decorator can only be applied to sync functions")
 
-            sig = inspect.signature(func)
+            call = self._compile_session_call(func)
 
             @wraps(func)
             def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
                 def operation(session):
-                    return self._inject_session_and_call(func, sig, args, kwargs, session)
+                    if read_only:
+                        mark_read_only(session)
+                    return call(args, kwargs, session)
 
                 if read_only:
-                    return self.execute_with_session(operation)
-                else:
-                    return self.execute_with_transaction(operation)
+                    return self._read(operation)
+                result = self.execute_with_transaction(operation, savepoint=savepoint)
+                if self._replicas is not None:
+                    after_commit(self._replicas.note_write)
+                return result
 
             @wraps(func)
             async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
                 async def operation(session):
-                    return await self._inject_session_and_call_async(func, sig, args, kwargs, session)
+                    if read_only:
+                        mark_read_only(session)
+                    return await call(args, kwargs, session)
 
                 if read_only:
-                    return await self.execute_with_session(operation)
-                else:
-                    return await self.execute_with_transaction(operation)
+                    return await self._aread(operation)
+                result = await self.execute_with_transaction(operation, savepoint=savepoint)
+                if self._replicas is not None:
+                    after_commit(self._replicas.note_write)
+                return result
 
             return async_wrapper if is_async else sync_wrapper
 
         return decorator
 
-    def _inject_session_and_call(self, func: Callable, sig: inspect.Signature,
-                                 args: tuple, kwargs: dict, session) -> T:
-        """Inject session parameter and call the function."""
-        # First, find which parameter should be the session parameter
-        session_param_name = None
-        non_session_params = []
-        
-        for name, param in sig.parameters.items():
-            param_type = param.annotation
-            if param_type is inspect.Parameter.empty:
-                non_session_params.append(name)
-                continue
-                
-            if self._is_compatible_session_type(param_type):
-                session_param_name = name
-            else:
-                non_session_params.append(name)
-        
-        if not session_param_name:
-            raise TypeError(
-                f"Function {func.__name__} does not accept a {self._session_type.__name__} parameter"
-            )
-        
-        # Create a new kwargs dict with session injected
-        new_kwargs = kwargs.copy()
-        new_kwargs[session_param_name] = session
-        
-        # Bind arguments, excluding the session parameter from positional binding
+    @property
+    def replicas(self) -> Optional[ReplicaSet]:
+        return self._replicas
+
+    @property
+    def scope_key(self) -> Hashable:
+        """Sessions shared in a unit of work: one per manager type and engine."""
+        factory = self.session_factory
+        return type(self), getattr(factory, "kw", {}).get("bind") or factory
+
+    def _read(self, operation) -> T:
+        """
+        Run a read-only operation on a replica, or on the primary when none is available or the replica fails.
+
+        In a unit of work, reads join its session on the primary to see its writes.
+        """
+        if current_unit_of_work() is not None:
+            return self.execute_with_session(operation)
+        replica = self._replicas.acquire() if self._replicas is not None else None
+        if replica is None:
+            return self.execute_with_session(operation)
         try:
-            # Try to bind without the session parameter
-            bound = sig.bind_partial(*args, **new_kwargs)
+            return self._execute_on_replica(replica, operation)
+        except REPLICA_ERRORS as e:
+            self._replicas.mark_failed(replica, e)
+        finally:
+            self._replicas.release(replica)
+        return self.execute_with_session(operation)
+
+    async def _aread(self, operation) -> T:
+        """Async variant of :meth:`_read`."""
+        if current_unit_of_work() is not None:
+            return await self.execute_with_session(operation)
+        replica = self._replicas.acquire() if self._replicas is not None else None
+        if replica is None:
+            return await self.execute_with_session(operation)
+        try:
+            return await self._execute_on_replica(replica, operation)
+        except REPLICA_ERRORS as e:
+            self._replicas.mark_failed(replica, e)
+        finally:
+            self._replicas.release(replica)
+        return await self.execute_with_session(operation)
+
+    def _execute_on_replica(self, session_factory: Callable, operation) -> T:
+        """Execute operation with a session of ``session_factory``, one of the replicas."""
+        raise NotImplementedError(f"{type(self).__name__} does not support read replicas")
+
+    def _compile_session_call(self, func: Callable) -> Callable[[tuple, dict, object], T]:
+        """
+        Resolve the session parameter of ``func`` once and build a call plan for it.
+
+        The caller's arguments never include the session, so the plan only has to
+        place the session at the right position (or keyword) on every call.
+
+        Args:
+            func: The function being decorated
+
+        Returns:
+            A callable ``call(args, kwargs, session)`` invoking ``func`` with the session
+            injected. For async functions it returns the coroutine.
+        """
+        name, index, keyword_only = self._resolve_session_parameter(func)
+
+        if keyword_only:
+            def call(args: tuple, kwargs: dict, session) -> T:
+                kwargs[name] = session
+                return func(*args, **kwargs)
+        elif index == 0:
+            def call(args: tuple, kwargs: dict, session) -> T:
+                return func(session, *args, **kwargs)
+        else:
+            def call(args: tuple, kwargs: dict, session) -> T:
+                if len(args) >= index:
+                    return func(*args[:index], session, *args[index:], **kwargs)
+                # Parameters before the session were passed by keyword
+                kwargs[name] = session
+                return func(*args, **kwargs)
+
+        return call
+
+    def _resolve_session_parameter(self, func: Callable) -> tuple[str, int, bool]:
+        """
+        Find the session parameter of ``func``.
+
+        The signature is only inspected once per underlying function and session type,
+        so decorating the bound methods of a freshly built service is a cache lookup.
+
+        Returns:
+            The parameter name, its position as seen by callers of ``func`` and whether
+            it is keyword-only
+        """
+        target = getattr(func, "__func__", func)
+        # Bound methods are inspected through their function, which also takes ``self``
+        offset = 0 if target is func else 1
+
+        try:
+            by_session_type = _session_parameters.setdefault(target, {})
         except TypeError:
-            # If that fails, we need to handle positional arguments more carefully
-            # Create a signature without the session parameter for binding
-            new_params = [p for name, p in sig.parameters.items() if name != session_param_name]
-            new_sig = inspect.Signature(new_params, return_annotation=sig.return_annotation)
-            
-            # Bind to the new signature
-            bound = new_sig.bind_partial(*args, **kwargs)
-            
-            # Create the final bound arguments
-            final_args = {}
-            for name, value in bound.arguments.items():
-                final_args[name] = value
-            final_args[session_param_name] = session
-            
-            # Call the function with the correct arguments
-            return func(**final_args)
-        
-        # Apply defaults and call
-        bound.apply_defaults()
-        return func(*bound.args, **bound.kwargs)
+            # Not weak-referenceable (e.g. some builtins), resolve without caching
+            by_session_type = {}
+
+        resolved = by_session_type.get(self._session_type)
+        if resolved is None:
+            session_param = None
+            index = 0
+            for position, param in enumerate(inspect.signature(target).parameters.values()):
+                if param.annotation is inspect.Parameter.empty:
+                    continue
+                if self._is_compatible_session_type(param.annotation):
+                    session_param, index = param, position
+
+            if session_param is None:
+                raise TypeError(
+                    f"Function {func.__name__} does not accept a {self._session_type.__name__} parameter"
+                )
+
+            resolved = (session_param.name, index, session_param.kind is inspect.Parameter.KEYWORD_ONLY)
+            by_session_type[self._session_type] = resolved
+
+        name, index, keyword_only = resolved
+        return name, index - offset, keyword_only
 
     def _is_compatible_session_type(self, param_type) -> bool:
         """Check if parameter type is compatible with session type."""
@@ -159,65 +260,19 @@ class BaseTransactionManager(ABC):
 
         return False
 
-    async def _inject_session_and_call_async(self, func: Callable, sig: inspect.Signature,
-                                             args: tuple, kwargs: dict, session) -> T:
-        """Inject session parameter and call the async function."""
-        # First, find which parameter should be the session parameter
-        session_param_name = None
-        non_session_params = []
-        
-        for name, param in sig.parameters.items():
-            param_type = param.annotation
-            if param_type is inspect.Parameter.empty:
-                non_session_params.append(name)
-                continue
-                
-            if self._is_compatible_session_type(param_type):
-                session_param_name = name
-            else:
-                non_session_params.append(name)
-        
-        if not session_param_name:
-            raise TypeError(
-                f"Function {func.__name__} does not accept a {self._session_type.__name__} parameter"
-            )
-        
-        # Create a new kwargs dict with session injected
-        new_kwargs = kwargs.copy()
-        new_kwargs[session_param_name] = session
-        
-        # Bind arguments, excluding the session parameter from positional binding
-        try:
-            # Try to bind without the session parameter
-            bound = sig.bind_partial(*args, **new_kwargs)
-        except TypeError:
-            # If that fails, we need to handle positional arguments more carefully
-            # Create a signature without the session parameter for binding
-            new_params = [p for name, p in sig.parameters.items() if name != session_param_name]
-            new_sig = inspect.Signature(new_params, return_annotation=sig.return_annotation)
-            
-            # Bind to the new signature
-            bound = new_sig.bind_partial(*args, **kwargs)
-            
-            # Create the final bound arguments
-            final_args = {}
-            for name, value in bound.arguments.items():
-                final_args[name] = value
-            final_args[session_param_name] = session
-            
-            # Call the function with the correct arguments
-            return await func(**final_args)
-        
-        # Apply defaults and call
-        bound.apply_defaults()
-        return await func(*bound.args, **bound.kwargs)
-
     @abstractmethod
     def execute_with_session(self, operation) -> T:
         """Execute operation with session."""
         pass
 
     @abstractmethod
-    def execute_with_transaction(self, operation) -> T:
-        """Execute operation with transaction."""
+    def execute_with_transaction(self, operation, savepoint: bool = False) -> T:
+        """
+        Execute operation with transaction.
+
+        Args:
+            operation: Callable receiving the session
+            savepoint: Run the operation in a SAVEPOINT when it joins the transaction of
+                a unit of work, so that its failure only rolls back its own writes
+        """
         pass
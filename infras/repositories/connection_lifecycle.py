@@ -0,0 +1,271 @@
+"""
+Connection lifecycle policies: maximum lifetime, idle timeout and liveness pings.
+
+SQLAlchemy's ``pool_recycle`` gives every connection the same lifetime, so the
+connections opened together at startup or at a traffic peak are all replaced
+together too, and ``pool_pre_ping`` pays a round trip on every checkout. The
+engine registry uses these policies instead:
+
+* every connection gets its own maximum lifetime, ``POOL_RECYCLE`` minus a
+  random share of up to ``POOL_RECYCLE_JITTER`` of it, and is replaced at the
+  first checkout after that;
+* a connection idle for ``POOL_IDLE_TIMEOUT`` is closed, by the
+  :class:`ConnectionReaper` while it sits in the pool or at checkout;
+* only a connection idle for ``POOL_PING_AFTER`` is pinged at checkout. A dead
+  one is replaced there, before the caller sees it.
+
+Replacements go through SQLAlchemy's checkout retry (a ``DisconnectionError``
+raised from the checkout event). Recycles, idle closes and pings are reported to
+the engine's :class:`~infras.telemetry.PoolTelemetry`.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.util import greenlet_spawn
+from sqlalchemy.util.queue import Empty, Full
+
+from infras.telemetry import PoolTelemetry
+from .pool_sizing import ResizableAsyncAdaptedQueuePool, ResizableQueuePool
+
+if TYPE_CHECKING:
+    from .engine_registry import EngineRegistry
+
+logger = logging.getLogger(__name__)
+
+# Connection record info keys, cleared by SQLAlchemy whenever the connection is replaced
+_EXPIRES_AT = "db_adapter_expires_at"
+_RETURNED_AT = "db_adapter_returned_at"
+
+
+class ConnectionExpired(exc.DisconnectionError):
+    """Raised on checkout to replace a connection a lifecycle policy retired."""
+
+
+class ConnectionLifecycle:
+    """Applies the lifecycle policies to the connections of one engine."""
+
+    def __init__(self, telemetry: PoolTelemetry, max_lifetime: float = 0, jitter: float = 0,
+                 idle_timeout: float = 0, ping_after: float = 0, clock: Callable[[], float] = time.monotonic,
+                 rng: Callable[[], float] = random.random):
+        """
+        Attach to the engine observed by ``telemetry``.
+
+        Args:
+            telemetry: Telemetry of the engine, which also receives the policies' counts
+            max_lifetime: Seconds a connection may live, 0 for no limit
+            jitter: Share of ``max_lifetime``, between 0 and 1, taken off each lifetime at random
+            idle_timeout: Seconds a connection may stay idle, 0 for no limit
+            ping_after: Seconds of idleness after which a checkout pings the connection, 0 to ping every reuse
+            clock: Monotonic clock in seconds, shared with the reaper
+            rng: Source of uniform numbers in [0, 1)
+        """
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self.telemetry = telemetry
+        self.engine = telemetry.engine
+        self.max_lifetime = max_lifetime
+        self.jitter = jitter
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.clock = clock
+        self.rng = rng
+        event.listen(self.engine, "connect", self._on_connect)
+        # Before the telemetry's listener, so a replaced connection is not counted as checked out twice
+        event.listen(self.engine, "checkout", self._on_checkout, insert=True)
+        event.listen(self.engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        if self.max_lifetime:
+            lifetime = self.max_lifetime * (1 - self.jitter * self.rng())
+            connection_record.info[_EXPIRES_AT] = self.clock() + lifetime
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        if dbapi_connection is not None:
+            connection_record.info[_RETURNED_AT] = self.clock()
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        info = connection_record.info
+        now = self.clock()
+        expires_at = info.get(_EXPIRES_AT)
+        if expires_at is not None and now >= expires_at:
+            self.telemetry.record_recycle()
+            raise ConnectionExpired("connection reached its maximum lifetime")
+
+        returned_at = info.get(_RETURNED_AT)
+        if returned_at is None:
+            # Fresh from connect
+            return
+        idle = now - returned_at
+        if self.idle_timeout and idle >= self.idle_timeout:
+            self.telemetry.record_idle_closes()
+            raise ConnectionExpired("connection stayed idle too long")
+        if idle >= self.ping_after:
+            self._ping(dbapi_connection)
+
+    def _ping(self, dbapi_connection: Any) -> None:
+        dialect = self.engine.dialect
+        start = time.perf_counter()
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except dialect.loaded_dbapi.Error as e:
+            if not dialect.is_disconnect(e, dbapi_connection, None):
+                self.telemetry.record_ping(time.perf_counter() - start, alive=True)
+                raise
+            alive = False
+        self.telemetry.record_ping(time.perf_counter() - start, alive)
+        if not alive:
+            raise exc.DisconnectionError("liveness ping failed")
+
+
+class _Reapable:
+    """Pool mixin closing the pooled connections idle for too long."""
+
+    def reap_idle(self, returned_before: float) -> int:
+        """
+        Close the connections in the pool returned before ``returned_before``.
+
+        Async pools must be reaped from their event loop, inside ``greenlet_spawn``.
+
+        Returns:
+            How many connections were closed
+        """
+        reaped: List[Any] = []
+        kept: List[Any] = []
+        with self._queue_lock():
+            while True:
+                try:
+                    record = self._pool.get(False)
+                except Empty:
+                    break
+                returned_at = record.info.get(_RETURNED_AT)
+                if returned_at is not None and returned_at < returned_before:
+                    reaped.append(record)
+                else:
+                    kept.append(record)
+            if self._pool.use_lifo:
+                # Taken from the top of the stack, put back bottom first
+                kept.reverse()
+            for record in kept:
+                try:
+                    self._pool.put(record, False)
+                except Full:
+                    # The pool shrank meanwhile
+                    reaped.append(record)
+
+        for record in reaped:
+            try:
+                record.close()
+            finally:
+                self._dec_overflow()
+        return len(reaped)
+
+    def _queue_lock(self):
+        raise NotImplementedError
+
+
+class ReapableQueuePool(_Reapable, ResizableQueuePool):
+    """Resizable QueuePool whose idle connections can be reaped."""
+
+    def _queue_lock(self):
+        # Keep other threads from seeing the queue empty while it is sorted; the lock is reentrant
+        return self._pool.mutex
+
+
+class ReapableAsyncAdaptedQueuePool(_Reapable, ResizableAsyncAdaptedQueuePool):
+    """Resizable AsyncAdaptedQueuePool whose idle connections can be reaped."""
+
+    def _queue_lock(self):
+        # Nothing else runs on the loop until the queue is refilled
+        return nullcontext()
+
+
+class ConnectionReaper:
+    """Periodically closes the connections idle in the registry's pools for longer than the idle timeout."""
+
+    def __init__(self, registry: "EngineRegistry", idle_timeout: float, interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the reaper.
+
+        Args:
+            registry: Registry whose engines are reaped, including engines created later
+            idle_timeout: Seconds a pooled connection may stay idle
+            interval: Seconds between two passes, half the idle timeout by default
+            clock: The clock of the engines' :class:`ConnectionLifecycle`
+        """
+        if idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        self.registry = registry
+        self.idle_timeout = idle_timeout
+        self.interval = interval if interval is not None else idle_timeout / 2
+        self.clock = clock
+        self._stopping: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    async def reap(self) -> int:
+        """
+        Reap every pool once; run it on the event loop that uses the async engines.
+
+        Returns:
+            How many connections were closed
+        """
+        telemetry = self.registry.telemetry
+        reaped = 0
+        for key, engine in self.registry.engines.items():
+            pool = engine.sync_engine.pool if key.is_async else engine.pool
+            if not isinstance(pool, _Reapable):
+                continue
+            returned_before = self.clock() - self.idle_timeout
+            if key.is_async:
+                # Closing an async connection awaits, which the pool does through greenlets
+                closed = await greenlet_spawn(pool.reap_idle, returned_before)
+            else:
+                closed = await asyncio.to_thread(pool.reap_idle, returned_before)
+            if closed:
+                logger.info(f"Closed {closed} idle connections of {key.url}")
+                if key in telemetry:
+                    telemetry[key].record_idle_closes(closed)
+            reaped += closed
+        return reaped
+
+    async def run(self) -> None:
+        """Reap every ``interval`` seconds until :meth:`stop` is called."""
+        self._stopping, self._stopped = asyncio.Event(), asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.interval)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.reap()
+                except Exception as e:
+                    logger.error(f"Reaping idle connections failed: {e}")
+        finally:
+            self._stopped.set()
+
+    async def stop(self) -> None:
+        """
+        Stop :meth:`run`, on its event loop, and wait until it has returned.
+
+        Unlike cancelling it, this lets a pass in progress finish: a pass closes
+        connections from worker threads and greenlets that cancellation would not
+        stop, so the pools must not be disposed before it is over.
+        """
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        await self._stopped.wait()
+
+
+def create_connection_reaper(settings: Any, registry: "EngineRegistry") -> Optional[ConnectionReaper]:
+    """Build the reaper of the registry's pools from settings, or None without an idle timeout."""
+    if not settings.POOL_IDLE_TIMEOUT:
+        return None
+    return ConnectionReaper(registry, settings.POOL_IDLE_TIMEOUT)
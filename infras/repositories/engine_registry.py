@@ -0,0 +1,157 @@
+"""
+Process-wide registry of SQLAlchemy engines.
+
+Engines (and the connection pools they own) are expensive to build, so every
+session factory in the application must share the same instance for a given
+URL and pool configuration instead of creating a new one per resolution.
+Every engine gets a :class:`~infras.telemetry.PoolTelemetry` and the connection
+lifecycle policies of :mod:`.connection_lifecycle` on creation, and a pool the
+adaptive sizer (see :mod:`.pool_sizing`) can resize and the reaper can reap.
+"""
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from config import Settings
+from infras.telemetry import PoolMetrics, PoolTelemetry
+from .connection_lifecycle import ConnectionLifecycle, ReapableAsyncAdaptedQueuePool, ReapableQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class EngineKey(NamedTuple):
+    """Identity of a registered engine."""
+    url: str
+    is_async: bool
+    echo: bool
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int
+    pool_recycle_jitter: float
+    pool_idle_timeout: int
+    pool_ping_after: float
+    pool_timeout: int
+
+    @classmethod
+    def from_settings(cls, settings: Settings, is_async: bool, url: Optional[str] = None) -> "EngineKey":
+        """Key of the engine for ``url`` (the primary by default) with the pool settings."""
+        if url is None:
+            url = settings.DB_URL_ASYNC if is_async else settings.DB_URL_SYNC
+        return cls(
+            url=url,
+            is_async=is_async,
+            echo=settings.ECHO,
+            pool_size=settings.POOL_SIZE,
+            max_overflow=settings.MAX_OVERFLOW,
+            pool_recycle=settings.POOL_RECYCLE,
+            pool_recycle_jitter=settings.POOL_RECYCLE_JITTER,
+            pool_idle_timeout=settings.POOL_IDLE_TIMEOUT,
+            pool_ping_after=settings.POOL_PING_AFTER,
+            pool_timeout=settings.POOL_TIMEOUT,
+        )
+
+
+class EngineRegistry:
+    """Creates each engine once and hands out the shared instance afterwards."""
+
+    def __init__(self):
+        self._engines: Dict[EngineKey, Union[Engine, AsyncEngine]] = {}
+        self._telemetry: Dict[EngineKey, PoolTelemetry] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def engines(self) -> Dict[EngineKey, Union[Engine, AsyncEngine]]:
+        """Snapshot of the registered engines, keyed by their identity."""
+        with self._lock:
+            return dict(self._engines)
+
+    @property
+    def telemetry(self) -> Dict[EngineKey, PoolTelemetry]:
+        """Snapshot of the pool telemetry of the registered engines, keyed like :attr:`engines`."""
+        with self._lock:
+            return dict(self._telemetry)
+
+    @property
+    def pool_metrics(self) -> List[PoolMetrics]:
+        """Metrics of the pool of every registered engine."""
+        with self._lock:
+            telemetry = list(self._telemetry.values())
+        return [pool.metrics for pool in telemetry]
+
+    def sync_engine(self, settings: Settings, url: Optional[str] = None) -> Engine:
+        """Get or create the sync engine for the given settings, of ``url`` instead of the primary if given."""
+        return self._get_or_create(EngineKey.from_settings(settings, is_async=False, url=url))
+
+    def async_engine(self, settings: Settings, url: Optional[str] = None) -> AsyncEngine:
+        """Get or create the async engine for the given settings, of ``url`` instead of the primary if given."""
+        return self._get_or_create(EngineKey.from_settings(settings, is_async=True, url=url))
+
+    def _get_or_create(self, key: EngineKey) -> Union[Engine, AsyncEngine]:
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._create_async(key) if key.is_async else self._create_sync(key)
+                telemetry = self._telemetry[key] = PoolTelemetry(engine)
+                ConnectionLifecycle(telemetry, key.pool_recycle, key.pool_recycle_jitter, key.pool_idle_timeout,
+                                    key.pool_ping_after)
+                self._engines[key] = engine
+            return engine
+
+    @staticmethod
+    def _create_async(key: EngineKey) -> AsyncEngine:
+        logger.info(f"Creating async db engine: {key.url}")
+        return create_async_engine(
+            key.url,
+            echo=key.echo,
+            poolclass=ReapableAsyncAdaptedQueuePool,
+            # Recycling and liveness checks are done by the ConnectionLifecycle
+            pool_size=key.pool_size,
+            max_overflow=key.max_overflow,
+            pool_timeout=key.pool_timeout,
+            future=True,
+        )
+
+    @staticmethod
+    def _create_sync(key: EngineKey) -> Engine:
+        logger.info(f"Creating sync db engine: {key.url}")
+        return create_engine(
+            key.url,
+            echo=key.echo,
+            poolclass=ReapableQueuePool,
+            # Recycling and liveness checks are done by the ConnectionLifecycle
+            pool_size=key.pool_size,
+            max_overflow=key.max_overflow,
+            pool_timeout=key.pool_timeout,
+            future=True,
+        )
+
+    async def dispose_all(self) -> None:
+        """Dispose every registered engine and forget about it."""
+        with self._lock:
+            engines = list(self._engines.items())
+            self._engines.clear()
+            self._telemetry.clear()
+
+        for key, engine in engines:
+            logger.info(f"Disposing {'async' if key.is_async else 'sync'} db engine: {key.url}")
+            if isinstance(engine, AsyncEngine):
+                await engine.dispose()
+            else:
+                engine.dispose()
+
+
+# Global engine registry shared by the DI container, the lifespan and scripts
+engine_registry = EngineRegistry()
+
+
+def get_engine_registry() -> EngineRegistry:
+    """Get the global engine registry."""
+    return engine_registry
@@ -1,87 +1,30 @@
 from contextlib import asynccontextmanager, contextmanager
-from typing import AsyncGenerator, Generator, Union
+from typing import AsyncGenerator, Generator, Optional, Union
 import logging
 
-from asgiref.sync import sync_to_async, async_to_sync
-from sqlalchemy import create_engine, event
-from sqlalchemy.pool import QueuePool
+from asgiref.sync import sync_to_async
 from sqlalchemy.engine import Engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine, AsyncEngine
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import QueuePool
 
 from config import Settings
 from .async_session import AsyncSession
+from .background_loop import background_loop
+from .engine_registry import engine_registry
 
 logger = logging.getLogger(__name__)
 
 
 def get_engine(settings: Settings) -> Union[Engine, AsyncEngine]:
     if settings.USE_ASYNC_DB:
-        logger.info(f"Using async db engine: {settings.DB_URL_ASYNC}")
-        engine = create_async_engine(
-            settings.DB_URL_ASYNC,
-            echo=settings.ECHO,
-            pool_pre_ping=True,
-            pool_size=settings.POOL_SIZE,
-            pool_recycle=settings.POOL_RECYCLE,
-            max_overflow=settings.MAX_OVERFLOW,
-            pool_timeout=settings.POOL_TIMEOUT,
-            future=True,
-        )
-    else:
-        logger.info(f"Using sync db engine: {settings.DB_URL_SYNC}")
-        engine = create_engine(
-            settings.DB_URL_SYNC,
-            echo=settings.ECHO,
-            poolclass=QueuePool,
-            pool_pre_ping=True,
-            pool_size=settings.POOL_SIZE,
-            pool_recycle=settings.POOL_RECYCLE,
-            max_overflow=settings.MAX_OVERFLOW,
-            pool_timeout=settings.POOL_TIMEOUT,
-            future=True,
-        )
-        
-        # 添加连接池事件监听器
-        @event.listens_for(engine, "checkout")
-        def receive_checkout(dbapi_connection, connection_record, connection_proxy):
-            logger.debug(f"Connection checked out. Pool size: {engine.pool.size()}, Checked out: {engine.pool.checkedout()}")
-
-        @event.listens_for(engine, "checkin")
-        def receive_checkin(dbapi_connection, connection_record):
-            logger.debug(f"Connection checked in. Pool size: {engine.pool.size()}, Checked out: {engine.pool.checkedout()}")
-
-        @event.listens_for(engine, "connect")
-        def receive_connect(dbapi_connection, connection_record):
-            logger.debug("New database connection created")
-
-        @event.listens_for(engine, "close")
-        def receive_close(dbapi_connection):
-            logger.debug("Database connection closed")
-    
-    return engine
-
-
-def sync_session_factory(settings: Settings) -> sessionmaker:
-    # For uniform_sync_db, we need to use the sync engine regardless of USE_ASYNC_DB
-    if settings.REPO_DRIVER == 'uniform_sync_db':
-        # Force sync engine for uniform_sync_db
-        engine = create_engine(
-            settings.DB_URL_SYNC,
-            echo=settings.ECHO,
-            poolclass=QueuePool,
-            pool_pre_ping=True,
-            pool_size=settings.POOL_SIZE,
-            pool_recycle=settings.POOL_RECYCLE,
-            max_overflow=settings.MAX_OVERFLOW,
-            pool_timeout=settings.POOL_TIMEOUT,
-            future=True,
-        )
-    else:
-        # Use the normal engine selection logic
-        engine = get_engine(settings)
-    
+        return engine_registry.async_engine(settings)
+    return engine_registry.sync_engine(settings)
+
+
+def sync_session_factory(settings: Settings, url: Optional[str] = None) -> sessionmaker:
+    # Sync sessions always need the sync engine, regardless of USE_ASYNC_DB; ``url`` selects a replica
+    engine = engine_registry.sync_engine(settings, url)
+
     return sessionmaker(
         bind=engine,
         # 优化 session 配置
@@ -92,24 +35,10 @@ def sync_session_factory(settings: Settings) -> sessionmaker:
     )
 
 
-def async_session_factory(settings: Settings) -> async_sessionmaker[AsyncSession]:
-    # For uniform_async_db, we need to use the async engine regardless of USE_ASYNC_DB
-    if settings.REPO_DRIVER == 'uniform_async_db':
-        # Force async engine for uniform_async_db
-        engine = create_async_engine(
-            settings.DB_URL_ASYNC,
-            echo=settings.ECHO,
-            pool_pre_ping=True,
-            pool_size=settings.POOL_SIZE,
-            pool_recycle=settings.POOL_RECYCLE,
-            max_overflow=settings.MAX_OVERFLOW,
-            pool_timeout=settings.POOL_TIMEOUT,
-            future=True,
-        )
-    else:
-        # Use the normal engine selection logic
-        engine = get_engine(settings)
-    
+def async_session_factory(settings: Settings, url: Optional[str] = None) -> async_sessionmaker[AsyncSession]:
+    # Async sessions always need the async engine, regardless of USE_ASYNC_DB; ``url`` selects a replica
+    engine = engine_registry.async_engine(settings, url)
+
     return async_sessionmaker(
         bind=engine,
         expire_on_commit=False,
@@ -152,18 +81,12 @@ def get_db_session_sync(settings: Settings) -> Generator[Union[AsyncSession, Ses
         finally:
             session.close()
     else:
-        async def _open_async_session() -> AsyncSession:
-            async with factory() as session:
-                return session
-
-        async def close_async_session(session: AsyncSession) -> None:
-            await session.close()
-
-        session: AsyncSession = async_to_sync(_open_async_session)()
+        # The session's connection lives on the background loop used by the sync adapters
+        session: AsyncSession = factory()
         try:
             yield session
         finally:
-            async_to_sync(close_async_session)(session)
+            background_loop.call(session.close())
 
 
 @asynccontextmanager
@@ -194,15 +117,9 @@ def db_session_context_sync(settings: Settings) -> Generator[Union[AsyncSession,
         finally:
             session.close()
     else:
-        async def open_async_session() -> AsyncSession:
-            async with factory() as session:
-                return session
-
-        async def close_async_session(session: AsyncSession) -> None:
-            await session.close()
-
-        session: AsyncSession = async_to_sync(open_async_session)()
+        # The session's connection lives on the background loop used by the sync adapters
+        session: AsyncSession = factory()
         try:
             yield session
         finally:
-            async_to_sync(close_async_session)(session)
+            background_loop.call(session.close())
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import AsyncIterator, Iterator, List, Sequence
 
 from asgiref.sync import sync_to_async
 from sqlalchemy import select
@@ -7,31 +7,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from api.v1.schemas.item_schema import ItemCreateSchema
-from infras.executors import thread_pool
+from infras.executors import get_engine_thread_pool
+from infras.executors.session_workers import pinned_session_worker
 from models.item_model import ItemModel
+from models.page_model import PageModel
 from ports.async_session_execution import IAsyncExecutionStrategy
 from repositories.item_async_repository import IASyncItemRepository
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
 from .async_session import AsyncSession as InfraAsyncSession
 from .item_po import ItemPO
+from .item_queries import (
+    create_items, create_items_async, delete_item_statement, in_requested_order, item_id_chunks, item_insert_chunks,
+    missing_server_defaults, select_item, select_item_for_update_fallback, select_items_by_ids, select_items_page,
+    to_item, to_items_by_id, to_items_page, update_item, update_item_async, update_item_statement,
+)
+from .read_mode import is_read_only
 from .sync_session import SyncSession as InfraSyncSession
 
 logger = logging.getLogger(__name__)
 
 
 class ItemRepository:
-    async def _list(self, session: AsyncSession) -> list[ItemModel]:
-        stmt = select(ItemPO)
-        result = await session.execute(stmt)
-        items = result.scalars().all()
-        if not items:
-            return []
-        return [ItemModel.model_validate(i) for i in items]
+    async def _list(self, session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = await session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
 
-    def _list_sync(self, session: Session) -> List[ItemModel]:
-        stmt = select(ItemPO)
-        result = session.execute(stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+    def _list_sync(self, session: Session, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
 
 
 class AsyncItemRepository(IASyncItemRepository):
@@ -40,10 +47,16 @@ class AsyncItemRepository(IASyncItemRepository):
         logger.info("init async item repository")
 
     async def get_by_id(self, session: InfraAsyncSession, item_id: int) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
+        core = is_read_only(session)
+        result = await session.execute(select_item(item_id, core))
+        return to_item(result, core)
+
+    async def get_many(self, session: InfraAsyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            found.update(to_items_by_id(await session.execute(select_items_by_ids(chunk, core)), core))
+        return in_requested_order(found, ids)
 
     async def create(self, session: InfraAsyncSession, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(
@@ -57,38 +70,27 @@ class AsyncItemRepository(IASyncItemRepository):
         await session.refresh(item_po)
         return ItemModel.model_validate(item_po)
 
-    async def list(self, session: InfraAsyncSession) -> list[ItemModel]:
-        stmt = select(ItemPO)
-        result = await session.execute(stmt)
-        items = result.scalars().all()
-        if not items:
-            return []
-        return [ItemModel.model_validate(i) for i in items]
+    async def create_many(self, session: InfraAsyncSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return await create_items_async(session, items)
 
-    async def update(self, session: InfraAsyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
+    async def list(self, session: InfraAsyncSession, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = await session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
 
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
+    async def stream(self, session: InfraAsyncSession,
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[ItemModel]]:
+        result = await session.stream_scalars(select(ItemPO).execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield [ItemModel.model_validate(i) for i in partition]
 
-        await session.flush()
-        await session.refresh(item)
-        return ItemModel.model_validate(item)
+    async def update(self, session: InfraAsyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+        return await update_item_async(session, item_id, update_data)
 
     async def delete(self, session: InfraAsyncSession, item_id: str) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-
-        await session.delete(item)
-        await session.flush()
-        return True
+        result = await session.execute(delete_item_statement(item_id))
+        return result.rowcount > 0
 
 
 class SyncToAsyncItemRepository(IASyncItemRepository):
@@ -96,17 +98,35 @@ class SyncToAsyncItemRepository(IASyncItemRepository):
         super().__init__()
         logger.info("init sync to async item repository")
 
+    @staticmethod
+    async def _run(fn, session: InfraSyncSession, *args):
+        # Sessions opened by a session worker stay on that worker's thread
+        worker = pinned_session_worker(session)
+        if worker is not None:
+            return await worker.run(fn, session, *args)
+        executor = get_engine_thread_pool(session.get_bind())
+        return await sync_to_async(fn, thread_sensitive=False, executor=executor)(session, *args)
+
     async def get_by_id(self, session: InfraSyncSession, item_id: int) -> ItemModel | None:
-        return await sync_to_async(self._get_by_id, thread_sensitive=False, executor=thread_pool)(session, item_id)
+        return await self._run(self._get_by_id, session, item_id)
 
     def _get_by_id(self, session: Session, item_id: int) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
+        core = is_read_only(session)
+        result = session.execute(select_item(item_id, core))
+        return to_item(result, core)
+
+    async def get_many(self, session: InfraSyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        return await self._run(self._get_many, session, ids)
+
+    def _get_many(self, session: Session, ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            found.update(to_items_by_id(session.execute(select_items_by_ids(chunk, core)), core))
+        return in_requested_order(found, ids)
 
     async def create(self, session: InfraSyncSession, item: ItemCreateSchema) -> ItemModel:
-        return await sync_to_async(self._create, thread_sensitive=False, executor=thread_pool)(session, item)
+        return await self._run(self._create, session, item)
 
     def _create(self, session: Session, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(
@@ -120,46 +140,44 @@ class SyncToAsyncItemRepository(IASyncItemRepository):
         session.refresh(item_po)
         return ItemModel.model_validate(item_po)
 
-    async def list(self, session: InfraSyncSession) -> list[ItemModel]:
-        return await sync_to_async(self._list, thread_sensitive=False, executor=thread_pool)(session)
+    async def create_many(self, session: InfraSyncSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return await self._run(create_items, session, items)
 
-    def _list(self, session: Session) -> List[ItemModel]:
-        stmt = select(ItemPO)
-        result = session.execute(stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+    async def list(self, session: InfraSyncSession, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str | None = None) -> PageModel[ItemModel]:
+        return await self._run(self._list, session, limit, cursor)
 
-    async def update(self, session: InfraSyncSession, item_id: int, update_data: ItemCreateSchema) -> ItemModel | None:
-        return await sync_to_async(self._update, thread_sensitive=False, executor=thread_pool)(session, item_id,
-                                                                                               update_data)
+    def _list(self, session: Session, limit: int, cursor: str | None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
 
-    def _update(self, session: Session, item_id: int, update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
+    async def stream(self, session: InfraSyncSession,
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[ItemModel]]:
+        partitions = await self._run(self._open_stream, session, chunk_size)
+        # One hop per chunk; the cursor stays open on the session's connection in between
+        while (chunk := await self._run(self._next_chunk, session, partitions)) is not None:
+            yield chunk
 
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
+    def _open_stream(self, session: Session, chunk_size: int) -> Iterator[Sequence[ItemPO]]:
+        stmt = select(ItemPO).execution_options(stream_results=True, yield_per=chunk_size)
+        return session.scalars(stmt).partitions()
 
-        session.flush()
-        session.refresh(item)
-        return ItemModel.model_validate(item)
+    def _next_chunk(self, session: Session, partitions: Iterator[Sequence[ItemPO]]) -> List[ItemModel] | None:
+        partition = next(partitions, None)
+        return None if partition is None else [ItemModel.model_validate(i) for i in partition]
+
+    async def update(self, session: InfraSyncSession, item_id: int, update_data: ItemCreateSchema) -> ItemModel | None:
+        return await self._run(self._update, session, item_id, update_data)
+
+    def _update(self, session: Session, item_id: int, update_data: ItemCreateSchema) -> ItemModel | None:
+        return update_item(session, item_id, update_data)
 
     async def delete(self, session: InfraSyncSession, item_id: int) -> bool:
-        return await sync_to_async(self._delete, thread_sensitive=False, executor=thread_pool)(session, item_id)
+        return await self._run(self._delete, session, item_id)
 
     def _delete(self, session: Session, item_id: int) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-
-        session.delete(item)
-        session.flush()
-        return True
+        return session.execute(delete_item_statement(item_id)).rowcount > 0
 
 
 class UniformAsyncItemRepository(IASyncItemRepository):
@@ -169,16 +187,29 @@ class UniformAsyncItemRepository(IASyncItemRepository):
         logger.info(f"init UniformItemRepository using strategy {type(strategy)} ")
 
     async def get_by_id(self, session: InfraAsyncSession | InfraSyncSession, item_id: int) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
-
-    async def list(self, session: InfraAsyncSession | InfraSyncSession) -> list[ItemModel]:
-        stmt = select(ItemPO)
-        result = await self.strategy.execute(session, stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+        core = is_read_only(session)
+        result = await self.strategy.execute(session, select_item(item_id, core))
+        return to_item(result, core)
+
+    async def get_many(self, session: InfraAsyncSession | InfraSyncSession,
+                       ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            result = await self.strategy.execute(session, select_items_by_ids(chunk, core))
+            found.update(to_items_by_id(result, core))
+        return in_requested_order(found, ids)
+
+    async def list(self, session: InfraAsyncSession | InfraSyncSession, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = await self.strategy.execute(session, select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
+
+    async def stream(self, session: InfraAsyncSession | InfraSyncSession,
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[ItemModel]]:
+        async for partition in self.strategy.stream_scalars(session, select(ItemPO), chunk_size):
+            yield [ItemModel.model_validate(i) for i in partition]
 
     async def create(self, session: InfraAsyncSession | InfraSyncSession, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(**item.model_dump())
@@ -188,25 +219,32 @@ class UniformAsyncItemRepository(IASyncItemRepository):
         await self.strategy.refresh(session, item_po)
         return ItemModel.model_validate(item_po)
 
+    async def create_many(self, session: InfraAsyncSession | InfraSyncSession,
+                          items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        created = []
+        for rows in item_insert_chunks(items):
+            item_pos = [ItemPO(**row) for row in rows]
+            self.strategy.add_all(session, item_pos)
+            # The flush batches the chunk into multi-row INSERTs, fetching server defaults
+            # with RETURNING where supported; otherwise load them with one SELECT
+            await self.strategy.flush(session)
+            if missing_server_defaults(item_pos):
+                await self.strategy.execute(session, select_items_by_ids([row["id"] for row in rows]))
+            created.extend(item_pos)
+        return [ItemModel.model_validate(i) for i in created]
+
     async def update(self, session: InfraAsyncSession | InfraSyncSession, item_id: int,
                      update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
-        await self.strategy.flush(session)
-        await self.strategy.refresh(session, item)
-        return ItemModel.model_validate(item)
+        returning = session.get_bind().dialect.update_returning
+        result = await self.strategy.execute(session, update_item_statement(item_id, update_data, returning))
+        if returning:
+            item = result.scalar_one_or_none()
+        elif result.rowcount:
+            item = (await self.strategy.execute(session, select_item_for_update_fallback(item_id))).scalar_one()
+        else:
+            item = None
+        return ItemModel.model_validate(item) if item else None
 
     async def delete(self, session: InfraAsyncSession | InfraSyncSession, item_id: int) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-        await self.strategy.delete(session, item)
-        await self.strategy.flush(session)
-        return True
+        result = await self.strategy.execute(session, delete_item_statement(item_id))
+        return result.rowcount > 0
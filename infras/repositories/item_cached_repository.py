@@ -0,0 +1,130 @@
+"""
+Read-through item cache in front of any item repository.
+
+The cached repositories decorate another repository of the same flavour. Only
+``get_by_id`` and ``get_many`` on read-only sessions are served from the cache:
+such sessions never see uncommitted writes, so nothing they load can come from a
+transaction that later rolls back. Other sessions go straight to the wrapped
+repository, which keeps read-your-writes inside a transaction; so do reads pinned
+to the primary after a write (see :mod:`.replicas`). ``update`` and ``delete``
+invalidate the item once the surrounding transaction commits.
+"""
+import logging
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence
+
+from api.v1.schemas.item_schema import ItemCreateSchema
+from infras.cache import LRUTTLCache, run_after_commit
+from models.item_model import ItemModel
+from models.page_model import PageModel
+from repositories import TSession
+from repositories.item_async_repository import IASyncItemRepository
+from repositories.item_sync_repository import ISyncItemRepository
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
+from .read_mode import is_read_only
+from .replicas import pinned_to_primary
+
+logger = logging.getLogger(__name__)
+
+ItemCache = LRUTTLCache[str, ItemModel]
+
+
+def create_item_cache(settings: Any) -> Optional[ItemCache]:
+    """Build the process-wide item cache from settings, or None when caching is disabled."""
+    if not settings.ITEM_CACHE_SIZE:
+        return None
+    return ItemCache("items", settings.ITEM_CACHE_SIZE, settings.ITEM_CACHE_TTL)
+
+
+def with_item_cache(repo: IASyncItemRepository | ISyncItemRepository, cache: Optional[ItemCache]):
+    """Wrap ``repo`` in the cached repository of its flavour, or return it as is without a cache."""
+    if cache is None:
+        return repo
+    if isinstance(repo, IASyncItemRepository):
+        return CachedAsyncItemRepository(repo, cache)
+    return CachedSyncItemRepository(repo, cache)
+
+
+class CachedAsyncItemRepository(IASyncItemRepository):
+    def __init__(self, repo: IASyncItemRepository, cache: ItemCache):
+        super().__init__()
+        self.repo = repo
+        self.cache = cache
+        logger.info(f"init CachedAsyncItemRepository over {type(repo).__name__}")
+
+    async def get_by_id(self, session: TSession, item_id: str) -> ItemModel | None:
+        if not is_read_only(session) or pinned_to_primary():
+            return await self.repo.get_by_id(session, item_id)
+        return await self.cache.aget_or_load(item_id, lambda: self.repo.get_by_id(session, item_id))
+
+    async def get_many(self, session: TSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        if not is_read_only(session) or pinned_to_primary():
+            return await self.repo.get_many(session, ids)
+        return await self.cache.aget_many_or_load(ids, lambda missing: self.repo.get_many(session, missing))
+
+    async def create(self, session: TSession, item: ItemCreateSchema) -> ItemModel:
+        return await self.repo.create(session, item)
+
+    async def create_many(self, session: TSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return await self.repo.create_many(session, items)
+
+    async def list(self, session: TSession, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: str | None = None) -> PageModel[ItemModel]:
+        return await self.repo.list(session, limit, cursor)
+
+    def stream(self, session: TSession, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[ItemModel]]:
+        return self.repo.stream(session, chunk_size)
+
+    async def update(self, session: TSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+        updated = await self.repo.update(session, item_id, update_data)
+        if updated is not None:
+            run_after_commit(session, lambda: self.cache.invalidate(item_id))
+        return updated
+
+    async def delete(self, session: TSession, item_id: str) -> bool:
+        deleted = await self.repo.delete(session, item_id)
+        if deleted:
+            run_after_commit(session, lambda: self.cache.invalidate(item_id))
+        return deleted
+
+
+class CachedSyncItemRepository(ISyncItemRepository):
+    def __init__(self, repo: ISyncItemRepository, cache: ItemCache):
+        super().__init__()
+        self.repo = repo
+        self.cache = cache
+        logger.info(f"init CachedSyncItemRepository over {type(repo).__name__}")
+
+    def get_by_id(self, session: TSession, item_id: str) -> ItemModel | None:
+        if not is_read_only(session) or pinned_to_primary():
+            return self.repo.get_by_id(session, item_id)
+        return self.cache.get_or_load(item_id, lambda: self.repo.get_by_id(session, item_id))
+
+    def get_many(self, session: TSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        if not is_read_only(session) or pinned_to_primary():
+            return self.repo.get_many(session, ids)
+        return self.cache.get_many_or_load(ids, lambda missing: self.repo.get_many(session, missing))
+
+    def create(self, session: TSession, item: ItemCreateSchema) -> ItemModel:
+        return self.repo.create(session, item)
+
+    def create_many(self, session: TSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return self.repo.create_many(session, items)
+
+    def list(self, session: TSession, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str | None = None) -> PageModel[ItemModel]:
+        return self.repo.list(session, limit, cursor)
+
+    def stream(self, session: TSession, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]:
+        return self.repo.stream(session, chunk_size)
+
+    def update(self, session: TSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+        updated = self.repo.update(session, item_id, update_data)
+        if updated is not None:
+            run_after_commit(session, lambda: self.cache.invalidate(item_id))
+        return updated
+
+    def delete(self, session: TSession, item_id: str) -> bool:
+        deleted = self.repo.delete(session, item_id)
+        if deleted:
+            run_after_commit(session, lambda: self.cache.invalidate(item_id))
+        return deleted
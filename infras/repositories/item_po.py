@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Float
+from sqlalchemy import Index, Integer, String, Float
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base_po import BasePO
@@ -6,6 +6,10 @@ from .base_po import BasePO
 
 class ItemPO(BasePO):
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset pagination order, see infras.repositories.item_queries
+        Index("ix_items_created_at_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(
         String(36),
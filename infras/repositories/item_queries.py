@@ -0,0 +1,225 @@
+"""Statements shared by every item repository implementation."""
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Delete, Select, Update, and_, delete, inspect, insert, or_, select, update
+from sqlalchemy.engine import Dialect, Result, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api.v1.schemas.item_schema import ItemCreateSchema
+from models.item_model import ItemModel
+from models.page_model import PageModel
+from repositories.pagination import decode_cursor, encode_cursor
+from .item_po import ItemPO
+
+
+# Core read path: the table's columns selected as plain rows, and the ItemModel field
+# each of them fills, resolved once through the mapper
+ITEM_COLUMNS = tuple(ItemPO.__table__.columns)
+_ITEM_FIELDS = tuple(inspect(ItemPO).get_property_by_column(column).key for column in ITEM_COLUMNS)
+_validate_item = ItemModel.__pydantic_validator__.validate_python
+
+
+def item_from_row(row: Row) -> ItemModel:
+    """Build an ItemModel from a row of :data:`ITEM_COLUMNS`, without an ORM instance."""
+    return _validate_item(dict(zip(_ITEM_FIELDS, row)))
+
+
+def _item_entities(core: bool) -> tuple:
+    return ITEM_COLUMNS if core else (ItemPO,)
+
+
+def select_item(item_id: str, core: bool = False) -> Select:
+    """
+    Select one item by id.
+
+    Args:
+        item_id: Id of the item
+        core: Select plain rows (read-only sessions) instead of ORM instances
+    """
+    return select(*_item_entities(core)).where(ItemPO.id == item_id)
+
+
+def to_item(result: Result, core: bool = False) -> ItemModel | None:
+    """Build the item selected by :func:`select_item`, if it exists."""
+    if core:
+        row = result.one_or_none()
+        return item_from_row(row) if row is not None else None
+    item = result.scalar_one_or_none()
+    return ItemModel.model_validate(item) if item else None
+
+
+def select_items_page(limit: int, cursor: Optional[str] = None, core: bool = False) -> Select:
+    """
+    Select one keyset page of items ordered by ``(created_at, id)``.
+
+    One extra row is fetched to tell whether another page follows.
+
+    Args:
+        limit: Page size
+        cursor: ``next_cursor`` of the previous page, None for the first page
+        core: Select plain rows (read-only sessions) instead of ORM instances
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    stmt = select(*_item_entities(core)).order_by(ItemPO.created_at, ItemPO.id).limit(limit + 1)
+    if cursor is not None:
+        created_at, item_id = decode_cursor(cursor)
+        # Expanded row-value comparison, usable as a range scan on ix_items_created_at_id
+        stmt = stmt.where(or_(
+            ItemPO.created_at > created_at,
+            and_(ItemPO.created_at == created_at, ItemPO.id > item_id),
+        ))
+    return stmt
+
+
+def to_items_page(result: Result, limit: int, core: bool = False) -> PageModel[ItemModel]:
+    """Build the page from the result of :func:`select_items_page`."""
+    if core:
+        rows = result.all()
+        items = [item_from_row(row) for row in rows[:limit]]
+    else:
+        rows = result.scalars().all()
+        items = [ItemModel.model_validate(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return PageModel[ItemModel](items=items, next_cursor=next_cursor)
+
+
+# Rows per INSERT in create_many; the dialect may still split a chunk into several
+# multi-row statements (insertmanyvalues page size, bound parameter limits)
+INSERT_CHUNK_SIZE = 500
+
+
+def item_insert_chunks(items: Sequence[ItemCreateSchema],
+                       chunk_size: int = INSERT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Insert parameters for ``items``, ``chunk_size`` rows at a time.
+
+    Ids are generated here rather than by the column default, so rows inserted
+    without RETURNING can be selected back.
+    """
+    for start in range(0, len(items), chunk_size):
+        yield [{"id": str(uuid.uuid4()), **item.model_dump()} for item in items[start:start + chunk_size]]
+
+
+def supports_insert_returning(dialect: Dialect) -> bool:
+    """Whether a multi-row INSERT can return the created rows in parameter order."""
+    return dialect.insert_executemany_returning_sort_by_parameter_order
+
+
+def select_items_by_ids(ids: Sequence[str], core: bool = False) -> Select:
+    return select(*_item_entities(core)).where(ItemPO.id.in_(ids))
+
+
+# Ids per IN list in get_many, well below the bound parameter limits of the
+# supported dialects (SQLite 999 before 3.32, Oracle 1000 expressions per list)
+SELECT_CHUNK_SIZE = 500
+
+
+def item_id_chunks(ids: Sequence[str], chunk_size: int = SELECT_CHUNK_SIZE) -> Iterator[List[str]]:
+    """Distinct ``ids``, ``chunk_size`` at a time, for one IN query each."""
+    distinct = list(dict.fromkeys(ids))
+    for start in range(0, len(distinct), chunk_size):
+        yield distinct[start:start + chunk_size]
+
+
+def to_items_by_id(result: Result, core: bool = False) -> Dict[str, ItemModel]:
+    """Items selected by :func:`select_items_by_ids`, keyed by id."""
+    if core:
+        items = [item_from_row(row) for row in result.all()]
+    else:
+        items = [ItemModel.model_validate(item) for item in result.scalars().all()]
+    return {item.id: item for item in items}
+
+
+def in_requested_order(found: Dict[str, ItemModel], ids: Sequence[str]) -> List[ItemModel | None]:
+    """One entry per requested id, None for ids that do not exist."""
+    return [found.get(item_id) for item_id in ids]
+
+
+def in_parameter_order(items: Sequence[ItemPO], rows: Sequence[Dict[str, Any]]) -> List[ItemPO]:
+    by_id = {item.id: item for item in items}
+    return [by_id[row["id"]] for row in rows]
+
+
+def missing_server_defaults(items: Sequence[ItemPO]) -> bool:
+    """Whether flushed items still need their server-generated columns loaded."""
+    return bool(items) and "created_at" in inspect(items[0]).unloaded
+
+
+def create_items(session: Session, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+    """Insert ``items`` with one multi-row INSERT ... RETURNING per chunk."""
+    returning = supports_insert_returning(session.connection().dialect)
+    created: List[ItemPO] = []
+    for rows in item_insert_chunks(items):
+        if returning:
+            created.extend(session.scalars(insert(ItemPO).returning(ItemPO, sort_by_parameter_order=True), rows))
+        else:
+            session.execute(insert(ItemPO), rows)
+            result = session.scalars(select_items_by_ids([row["id"] for row in rows]))
+            created.extend(in_parameter_order(result.all(), rows))
+    return [ItemModel.model_validate(item) for item in created]
+
+
+async def create_items_async(session: AsyncSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+    """Insert ``items`` with one multi-row INSERT ... RETURNING per chunk."""
+    returning = supports_insert_returning((await session.connection()).dialect)
+    created: List[ItemPO] = []
+    for rows in item_insert_chunks(items):
+        if returning:
+            result = await session.scalars(insert(ItemPO).returning(ItemPO, sort_by_parameter_order=True), rows)
+            created.extend(result.all())
+        else:
+            await session.execute(insert(ItemPO), rows)
+            result = await session.scalars(select_items_by_ids([row["id"] for row in rows]))
+            created.extend(in_parameter_order(result.all(), rows))
+    return [ItemModel.model_validate(item) for item in created]
+
+
+def update_item_statement(item_id: str, update_data: ItemCreateSchema, returning: bool) -> Update:
+    """UPDATE of one item, returning the updated row when ``returning`` is set."""
+    stmt = update(ItemPO).where(ItemPO.id == item_id).values(**update_data.model_dump())
+    if returning:
+        # Refresh an instance of the row already in the session from the returned values
+        stmt = stmt.returning(ItemPO).execution_options(populate_existing=True)
+    return stmt
+
+
+def select_item_for_update_fallback(item_id: str) -> Select:
+    """Reload an item after an UPDATE on dialects without RETURNING."""
+    return select(ItemPO).where(ItemPO.id == item_id).execution_options(populate_existing=True)
+
+
+def delete_item_statement(item_id: str) -> Delete:
+    return delete(ItemPO).where(ItemPO.id == item_id)
+
+
+def update_item(session: Session, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+    """Update one item with a single UPDATE ... RETURNING, or UPDATE + SELECT without RETURNING."""
+    returning = session.connection().dialect.update_returning
+    result = session.execute(update_item_statement(item_id, update_data, returning))
+    if returning:
+        item = result.scalar_one_or_none()
+    elif result.rowcount:
+        item = session.scalars(select_item_for_update_fallback(item_id)).one()
+    else:
+        item = None
+    return ItemModel.model_validate(item) if item else None
+
+
+async def update_item_async(session: AsyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+    """Update one item with a single UPDATE ... RETURNING, or UPDATE + SELECT without RETURNING."""
+    returning = (await session.connection()).dialect.update_returning
+    result = await session.execute(update_item_statement(item_id, update_data, returning))
+    if returning:
+        item = result.scalar_one_or_none()
+    elif result.rowcount:
+        item = (await session.scalars(select_item_for_update_fallback(item_id))).one()
+    else:
+        item = None
+    return ItemModel.model_validate(item) if item else None
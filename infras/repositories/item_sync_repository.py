@@ -1,16 +1,24 @@
 import logging
-from typing import List
+from typing import Iterator, List, Sequence
 
-from asgiref.sync import async_to_sync
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.v1.schemas.item_schema import ItemCreateSchema
 from models.item_model import ItemModel
+from models.page_model import PageModel
 from ports.sync_session_execution import ISyncExecutionStrategy
 from repositories.item_sync_repository import ISyncItemRepository
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
 from .async_session import AsyncSession as InfraAsyncSession
+from .background_loop import background_loop
 from .item_po import ItemPO
+from .item_queries import (
+    create_items, create_items_async, delete_item_statement, in_requested_order, item_id_chunks, item_insert_chunks,
+    missing_server_defaults, select_item, select_item_for_update_fallback, select_items_by_ids, select_items_page,
+    to_item, to_items_by_id, to_items_page, update_item, update_item_async, update_item_statement,
+)
+from .read_mode import is_read_only
 from .sync_session import SyncSession as InfraSyncSession
 
 logger = logging.getLogger(__name__)
@@ -22,10 +30,16 @@ class SyncItemRepository(ISyncItemRepository):
         logger.error("init sync item repository")
 
     def get_by_id(self, session: InfraSyncSession, item_id: str) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
+        core = is_read_only(session)
+        result = session.execute(select_item(item_id, core))
+        return to_item(result, core)
+
+    def get_many(self, session: InfraSyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            found.update(to_items_by_id(session.execute(select_items_by_ids(chunk, core)), core))
+        return in_requested_order(found, ids)
 
     def create(self, session: InfraSyncSession, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(
@@ -39,36 +53,25 @@ class SyncItemRepository(ISyncItemRepository):
         session.refresh(item_po)
         return ItemModel.model_validate(item_po)
 
-    def list(self, session: InfraSyncSession) -> list[ItemModel]:
-        stmt = select(ItemPO)
-        result = session.execute(stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+    def create_many(self, session: InfraSyncSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return create_items(session, items)
 
-    def update(self, session: InfraSyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
+    def list(self, session: InfraSyncSession, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
 
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
+    def stream(self, session: InfraSyncSession, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]:
+        stmt = select(ItemPO).execution_options(stream_results=True, yield_per=chunk_size)
+        for partition in session.scalars(stmt).partitions():
+            yield [ItemModel.model_validate(i) for i in partition]
 
-        session.flush()
-        session.refresh(item)
-        return ItemModel.model_validate(item)
+    def update(self, session: InfraSyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
+        return update_item(session, item_id, update_data)
 
     def delete(self, session: InfraSyncSession, item_id: str) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-
-        session.delete(item)
-        session.flush()
-        return True
+        return session.execute(delete_item_statement(item_id)).rowcount > 0
 
 
 class AsyncToSyncItemRepository(ISyncItemRepository):
@@ -77,16 +80,25 @@ class AsyncToSyncItemRepository(ISyncItemRepository):
         logger.error("init async to sync item repository")
 
     def get_by_id(self, session: InfraAsyncSession, item_id: str) -> ItemModel | None:
-        return async_to_sync(self._get_by_id)(session, item_id)
+        return background_loop.call(self._get_by_id(session, item_id))
 
     async def _get_by_id(self, session: AsyncSession, item_id: str) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
+        core = is_read_only(session)
+        result = await session.execute(select_item(item_id, core))
+        return to_item(result, core)
+
+    def get_many(self, session: InfraAsyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        return background_loop.call(self._get_many(session, ids))
+
+    async def _get_many(self, session: AsyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            found.update(to_items_by_id(await session.execute(select_items_by_ids(chunk, core)), core))
+        return in_requested_order(found, ids)
 
     def create(self, session: InfraAsyncSession, item: ItemCreateSchema) -> ItemModel:
-        return async_to_sync(self._create)(session, item)
+        return background_loop.call(self._create(session, item))
 
     async def _create(self, session: AsyncSession, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(**item.model_dump())
@@ -95,42 +107,35 @@ class AsyncToSyncItemRepository(ISyncItemRepository):
         await session.refresh(item_po)
         return ItemModel.model_validate(item_po)
 
-    def list(self, session: InfraAsyncSession) -> list[ItemModel]:
-        return async_to_sync(self._list)(session)
+    def create_many(self, session: InfraAsyncSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        return background_loop.call(create_items_async(session, items))
 
-    async def _list(self, session: AsyncSession) -> List[ItemModel]:
-        stmt = select(ItemPO)
-        result = await session.execute(stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+    def list(self, session: InfraAsyncSession, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str | None = None) -> PageModel[ItemModel]:
+        return background_loop.call(self._list(session, limit, cursor))
+
+    async def _list(self, session: AsyncSession, limit: int, cursor: str | None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = await session.execute(select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
+
+    def stream(self, session: InfraAsyncSession, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]:
+        result = background_loop.call(session.stream_scalars(select(ItemPO).execution_options(yield_per=chunk_size)))
+        for partition in background_loop.iterate(result.partitions()):
+            yield [ItemModel.model_validate(i) for i in partition]
 
     def update(self, session: InfraAsyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
-        return async_to_sync(self._update)(session, item_id, update_data)
+        return background_loop.call(self._update(session, item_id, update_data))
 
     async def _update(self, session: AsyncSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
-        await session.flush()
-        await session.refresh(item)
-        return ItemModel.model_validate(item)
+        return await update_item_async(session, item_id, update_data)
 
     def delete(self, session: InfraAsyncSession, item_id: str) -> bool:
-        return async_to_sync(self._delete)(session, item_id)
+        return background_loop.call(self._delete(session, item_id))
 
     async def _delete(self, session: AsyncSession, item_id: str) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = await session.execute(stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-        await session.delete(item)
-        await session.flush()
-        return True
+        result = await session.execute(delete_item_statement(item_id))
+        return result.rowcount > 0
 
 
 class UniformSyncItemRepository(ISyncItemRepository):
@@ -140,16 +145,27 @@ class UniformSyncItemRepository(ISyncItemRepository):
         logger.info(f"init UniformSyncItemRepository using strategy {type(strategy)} ")
 
     def get_by_id(self, session: InfraAsyncSession | InfraSyncSession, item_id: str) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        return ItemModel.model_validate(item) if item else None
-
-    def list(self, session: InfraAsyncSession | InfraSyncSession) -> list[ItemModel]:
-        stmt = select(ItemPO)
-        result = self.strategy.execute(session, stmt)
-        items = result.scalars().all()
-        return [ItemModel.model_validate(i) for i in items]
+        core = is_read_only(session)
+        result = self.strategy.execute(session, select_item(item_id, core))
+        return to_item(result, core)
+
+    def get_many(self, session: InfraAsyncSession | InfraSyncSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        core = is_read_only(session)
+        found = {}
+        for chunk in item_id_chunks(ids):
+            found.update(to_items_by_id(self.strategy.execute(session, select_items_by_ids(chunk, core)), core))
+        return in_requested_order(found, ids)
+
+    def list(self, session: InfraAsyncSession | InfraSyncSession, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str | None = None) -> PageModel[ItemModel]:
+        core = is_read_only(session)
+        result = self.strategy.execute(session, select_items_page(limit, cursor, core))
+        return to_items_page(result, limit, core)
+
+    def stream(self, session: InfraAsyncSession | InfraSyncSession,
+               chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]:
+        for partition in self.strategy.stream_scalars(session, select(ItemPO), chunk_size):
+            yield [ItemModel.model_validate(i) for i in partition]
 
     def create(self, session: InfraAsyncSession | InfraSyncSession, item: ItemCreateSchema) -> ItemModel:
         item_po = ItemPO(**item.model_dump())
@@ -158,25 +174,32 @@ class UniformSyncItemRepository(ISyncItemRepository):
         self.strategy.refresh(session, item_po)
         return ItemModel.model_validate(item_po)
 
+    def create_many(self, session: InfraAsyncSession | InfraSyncSession,
+                    items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        created = []
+        for rows in item_insert_chunks(items):
+            item_pos = [ItemPO(**row) for row in rows]
+            self.strategy.add_all(session, item_pos)
+            # The flush batches the chunk into multi-row INSERTs, fetching server defaults
+            # with RETURNING where supported; otherwise load them with one SELECT
+            self.strategy.flush(session)
+            if missing_server_defaults(item_pos):
+                self.strategy.execute(session, select_items_by_ids([row["id"] for row in rows]))
+            created.extend(item_pos)
+        return [ItemModel.model_validate(i) for i in created]
+
     def update(self, session: InfraAsyncSession | InfraSyncSession, item_id: str,
                update_data: ItemCreateSchema) -> ItemModel | None:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return None
-        for field, value in update_data.model_dump().items():
-            setattr(item, field, value)
-        self.strategy.flush(session)
-        self.strategy.refresh(session, item)
-        return ItemModel.model_validate(item)
+        returning = session.get_bind().dialect.update_returning
+        result = self.strategy.execute(session, update_item_statement(item_id, update_data, returning))
+        if returning:
+            item = result.scalar_one_or_none()
+        elif result.rowcount:
+            item = self.strategy.execute(session, select_item_for_update_fallback(item_id)).scalar_one()
+        else:
+            item = None
+        return ItemModel.model_validate(item) if item else None
 
     def delete(self, session: InfraAsyncSession | InfraSyncSession, item_id: str) -> bool:
-        stmt = select(ItemPO).where(ItemPO.id == item_id)
-        result = self.strategy.execute(session, stmt)
-        item = result.scalar_one_or_none()
-        if not item:
-            return False
-        self.strategy.delete(session, item)
-        self.strategy.flush(session)
-        return True
+        result = self.strategy.execute(session, delete_item_statement(item_id))
+        return result.rowcount > 0
@@ -0,0 +1,355 @@
+"""
+Adaptive connection pool sizing.
+
+``POOL_SIZE`` is fixed at engine creation: too large and every process holds
+connections the database has to pay for, too small and peak traffic queues for
+a connection until ``POOL_TIMEOUT``. With ``POOL_AUTOSIZE`` the pools of the
+registered engines are resized between ``POOL_SIZE_MIN`` and ``POOL_SIZE_MAX``
+from what their telemetry saw over the last interval:
+
+* the pool grows by a quarter when checkouts waited ``POOL_GROW_WAIT`` seconds
+  on average, or timed out, for ``grow_after`` intervals in a row;
+* it shrinks, by at most a quarter, to the smallest size that keeps utilization
+  (connections busy over the interval / pool size) under
+  ``POOL_SHRINK_UTILIZATION``, once that held for ``shrink_after`` intervals and
+  no growth happened for ``shrink_delay`` intervals.
+
+The separate grow and shrink conditions, the streaks and the delay after growth
+are the hysteresis: a pool settles instead of flapping around a threshold.
+``MAX_OVERFLOW`` still applies on top of the current size. A shrunk pool closes
+its surplus connections as they are returned, not while they are in use.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy.util import memoized_property
+from sqlalchemy.util.queue import AsyncAdaptedQueue, Queue
+
+from infras.telemetry import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedQueuePool
+
+if TYPE_CHECKING:
+    from .engine_registry import EngineKey, EngineRegistry
+
+logger = logging.getLogger(__name__)
+
+# Consecutive intervals a condition must hold before the pool is resized
+DEFAULT_GROW_AFTER = 2
+DEFAULT_SHRINK_AFTER = 6
+# Intervals after a growth during which the pool does not shrink
+DEFAULT_SHRINK_DELAY = 60
+# Decisions kept for inspection
+_DECISION_HISTORY = 100
+
+
+class _ResizableQueue(Queue):
+    def _full(self) -> bool:
+        # Queue compares with ==, which a shrunk queue holding more than its new size would never reach
+        return self.maxsize > 0 and len(self.queue) >= self.maxsize
+
+
+class _ResizableAsyncQueue(AsyncAdaptedQueue):
+    """
+    AsyncAdaptedQueue whose size can be changed from any thread.
+
+    The asyncio.Queue behind it belongs to the event loop that first used it and is
+    not thread-safe, so a resize is applied on that loop.
+    """
+
+    # Loop of the asyncio.Queue, None until it is created or when it was created outside of a loop
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @memoized_property
+    def _queue(self) -> asyncio.Queue:
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        return AsyncAdaptedQueue._queue.fget(self)
+
+    def resize(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        queue = self.__dict__.get("_queue")
+        if queue is None:
+            # Created with the new size on first use
+            return
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self._apply_size(queue)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._apply_size(queue)
+        else:
+            loop.call_soon_threadsafe(self._apply_size, queue)
+
+    def _apply_size(self, queue: asyncio.Queue) -> None:
+        # asyncio.Queue has no public way to resize: set its bound and wake the putters the new room admits
+        queue._maxsize = self.maxsize
+        for _ in range(max(0, self.maxsize - queue.qsize())):
+            queue._wakeup_next(queue._putters)
+
+
+class _Resizable(ABC):
+    """Pool mixin changing the pool size of a running QueuePool."""
+
+    def resize(self, pool_size: int) -> None:
+        """Keep up to ``pool_size`` connections; ``max_overflow`` more can still be opened."""
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        with self._overflow_lock:
+            delta = pool_size - self._pool.maxsize
+            self._set_queue_size(pool_size)
+            # The pool counts open connections beyond its size as overflow
+            self._overflow -= delta
+
+    @abstractmethod
+    def _set_queue_size(self, pool_size: int) -> None:
+        """Change how many connections the queue of the pool keeps."""
+
+
+class ResizableQueuePool(_Resizable, TimedQueuePool):
+    """Timed QueuePool that can be resized."""
+
+    _queue_class = _ResizableQueue
+
+    def _set_queue_size(self, pool_size: int) -> None:
+        with self._pool.mutex:
+            self._pool.maxsize = pool_size
+            self._pool.not_full.notify_all()
+
+
+class ResizableAsyncAdaptedQueuePool(_Resizable, TimedAsyncAdaptedQueuePool):
+    """Timed AsyncAdaptedQueuePool that can be resized."""
+
+    _queue_class = _ResizableAsyncQueue
+
+    def _set_queue_size(self, pool_size: int) -> None:
+        # The sizer runs in its own thread: the asyncio.Queue is resized on its loop.
+        # Its full() already compares with >=
+        self._pool.resize(pool_size)
+
+
+@dataclass(frozen=True)
+class PoolLoadSample:
+    """Load a pool saw over one interval."""
+    size: int
+    checkouts: int
+    # Mean checkout wait in seconds
+    wait: float
+    # Mean number of connections checked out
+    busy: float
+    timeouts: int
+
+    @property
+    def utilization(self) -> float:
+        return self.busy / self.size if self.size else 0.0
+
+
+@dataclass(frozen=True)
+class PoolSizingDecision:
+    """A resize decided by a controller."""
+    pool: str
+    old_size: int
+    new_size: int
+    reason: str
+
+
+class PoolSizeController:
+    """Decides the size of one pool from its load samples; it does not touch the pool."""
+
+    def __init__(self, name: str, min_size: int, max_size: int, grow_wait: float, shrink_utilization: float,
+                 grow_after: int = DEFAULT_GROW_AFTER, shrink_after: int = DEFAULT_SHRINK_AFTER,
+                 shrink_delay: int = DEFAULT_SHRINK_DELAY):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Pool name, used in decisions and logs
+            min_size: Smallest pool size
+            max_size: Largest pool size
+            grow_wait: Mean checkout wait in seconds from which the pool grows
+            shrink_utilization: Utilization the pool shrinks towards
+            grow_after: Intervals in a row checkouts must wait before growing
+            shrink_after: Intervals in a row utilization must stay low before shrinking
+            shrink_delay: Intervals after a growth during which the pool does not shrink
+        """
+        if not 1 <= min_size <= max_size:
+            raise ValueError("pool size bounds must satisfy 1 <= min_size <= max_size")
+        if not 0 < shrink_utilization <= 1:
+            raise ValueError("shrink_utilization must be in (0, 1]")
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.grow_wait = grow_wait
+        self.shrink_utilization = shrink_utilization
+        self.grow_after = grow_after
+        self.shrink_after = shrink_after
+        self.shrink_delay = shrink_delay
+        self._intervals = 0
+        self._grown_at: Optional[int] = None
+        self._grow_streak = 0
+        self._shrink_streak = 0
+
+    def decide(self, sample: PoolLoadSample) -> Optional[PoolSizingDecision]:
+        """The resize ``sample`` calls for, if any."""
+        self._intervals += 1
+        size = sample.size
+        if not self.min_size <= size <= self.max_size:
+            return self._resize(size, min(max(size, self.min_size), self.max_size),
+                                f"outside [{self.min_size}, {self.max_size}]")
+
+        if sample.timeouts or (sample.checkouts and sample.wait >= self.grow_wait):
+            self._grow_streak += 1
+            self._shrink_streak = 0
+            if self._grow_streak >= self.grow_after and size < self.max_size:
+                self._grown_at = self._intervals
+                return self._resize(size, min(size + max(1, size // 4), self.max_size),
+                                    f"checkout wait {sample.wait * 1000:.1f}ms, {sample.timeouts} timeouts")
+            return None
+
+        target = self._shrink_target(sample)
+        if target < size:
+            self._shrink_streak += 1
+            self._grow_streak = 0
+            if self._shrink_streak >= self.shrink_after and not self._shrink_delayed():
+                return self._resize(size, target, f"utilization {sample.utilization:.0%}")
+            return None
+
+        self._grow_streak = self._shrink_streak = 0
+        return None
+
+    def _shrink_target(self, sample: PoolLoadSample) -> int:
+        needed = math.ceil(sample.busy / self.shrink_utilization)
+        return max(self.min_size, needed, sample.size - max(1, sample.size // 4))
+
+    def _shrink_delayed(self) -> bool:
+        return self._grown_at is not None and self._intervals - self._grown_at < self.shrink_delay
+
+    def _resize(self, old_size: int, new_size: int, reason: str) -> PoolSizingDecision:
+        self._grow_streak = self._shrink_streak = 0
+        return PoolSizingDecision(self.name, old_size, new_size, reason)
+
+
+def _sample(size: int, previous: PoolMetrics, current: PoolMetrics, elapsed: float) -> PoolLoadSample:
+    waits = current.checkout_wait.count - previous.checkout_wait.count
+    wait_time = current.checkout_wait.sum - previous.checkout_wait.sum
+    return PoolLoadSample(
+        size=size,
+        checkouts=current.checkouts - previous.checkouts,
+        wait=wait_time / waits if waits else 0.0,
+        # Connection-seconds of the checkouts returned during the interval
+        busy=(current.hold_time.sum - previous.hold_time.sum) / elapsed if elapsed > 0 else 0.0,
+        timeouts=current.timeouts - previous.timeouts,
+    )
+
+
+class AdaptivePoolSizer:
+    """Samples the telemetry of every registered engine each interval and resizes its pool."""
+
+    def __init__(self, registry: "EngineRegistry", controller_factory: Callable[[str], PoolSizeController],
+                 interval: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the sizer.
+
+        Args:
+            registry: Registry whose engines are sized, including engines created later
+            controller_factory: Builds the controller of a pool from its name
+            interval: Seconds between two samples
+            clock: Monotonic clock in seconds
+        """
+        self.registry = registry
+        self.controller_factory = controller_factory
+        self.interval = interval
+        self.clock = clock
+        self._controllers: Dict["EngineKey", PoolSizeController] = {}
+        self._last: Dict["EngineKey", tuple] = {}
+        self._decisions: Deque[PoolSizingDecision] = deque(maxlen=_DECISION_HISTORY)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def decisions(self) -> List[PoolSizingDecision]:
+        """The latest resizes, oldest first."""
+        return list(self._decisions)
+
+    def tick(self) -> List[PoolSizingDecision]:
+        """Sample every pool once and apply the resizes it calls for."""
+        now = self.clock()
+        telemetry = self.registry.telemetry
+        for key in set(self._last) - set(telemetry):
+            # Disposed engines
+            del self._last[key]
+            self._controllers.pop(key, None)
+
+        decisions = []
+        for key, pool_telemetry in telemetry.items():
+            pool = pool_telemetry.engine.pool
+            if not isinstance(pool, _Resizable):
+                continue
+            metrics = pool_telemetry.metrics
+            previous = self._last.get(key)
+            self._last[key] = (now, metrics)
+            if previous is None:
+                continue
+
+            controller = self._controllers.get(key)
+            if controller is None:
+                name = f"{'async' if pool_telemetry.is_async else 'sync'} {pool_telemetry.url}"
+                controller = self._controllers[key] = self.controller_factory(name)
+            decision = controller.decide(_sample(pool.size(), previous[1], metrics, now - previous[0]))
+            if decision is None:
+                continue
+            pool.resize(decision.new_size)
+            logger.info(f"Pool {decision.pool} resized from {decision.old_size} to {decision.new_size}: "
+                        f"{decision.reason}")
+            self._decisions.append(decision)
+            decisions.append(decision)
+        return decisions
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="db_adapter_pool_sizer", daemon=True)
+        self._thread.start()
+        logger.info(f"Adaptive pool sizing started, every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop sampling; pools keep their current size."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        logger.info("Adaptive pool sizing stopped")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Adaptive pool sizing failed: {e}")
+
+
+def create_pool_sizer(settings: Any, registry: "EngineRegistry") -> Optional[AdaptivePoolSizer]:
+    """Build the sizer of the registry's pools from settings, or None when POOL_AUTOSIZE is off."""
+    if not settings.POOL_AUTOSIZE:
+        return None
+    max_size = settings.POOL_SIZE_MAX or 2 * settings.POOL_SIZE
+
+    def controller(name: str) -> PoolSizeController:
+        return PoolSizeController(name, settings.POOL_SIZE_MIN, max_size, settings.POOL_GROW_WAIT,
+                                  settings.POOL_SHRINK_UTILIZATION)
+
+    return AdaptivePoolSizer(registry, controller, settings.POOL_AUTOSIZE_INTERVAL)
@@ -0,0 +1,38 @@
+"""
+Read-only session marking.
+
+Sessions opened for ``transactional(read_only=True)`` are marked in ``Session.info``,
+which lets repositories answer reads with plain Core rows instead of ORM instances:
+nothing is written back, so the identity map and change tracking are pure overhead.
+
+A session shared by a unit of work (see :mod:`.unit_of_work`) serves reads and
+writes alike. Its reads take the read-only path until its first write, and the
+regular path after it, which sees the uncommitted rows.
+"""
+from typing import Any
+
+# Key under which the read-only flag is stored in ``Session.info``
+READ_ONLY_KEY = "read_only"
+# Key set in ``Session.info`` once a shared session has written
+WRITTEN_KEY = "written"
+
+
+def mark_read_only(session: Any) -> None:
+    """Opt a session into the Core read path for the rest of its life, unless it has written."""
+    info = getattr(session, "info", None)
+    if isinstance(info, dict) and not info.get(WRITTEN_KEY, False):
+        info[READ_ONLY_KEY] = True
+
+
+def mark_written(session: Any) -> None:
+    """Take a shared session out of the read-only path for good, before it writes."""
+    info = getattr(session, "info", None)
+    if isinstance(info, dict):
+        info[WRITTEN_KEY] = True
+        info.pop(READ_ONLY_KEY, None)
+
+
+def is_read_only(session: Any) -> bool:
+    """Whether ``session`` was marked with :func:`mark_read_only`."""
+    info = getattr(session, "info", None)
+    return isinstance(info, dict) and info.get(READ_ONLY_KEY, False)
@@ -0,0 +1,184 @@
+"""
+Read replicas for read-only transactions.
+
+A :class:`ReplicaSet` holds the session factories of the replicas of one
+flavour (sync or async) and picks one per read-only unit of work, round-robin or
+least-outstanding. A replica whose read fails with a connection-level error is
+skipped for ``retry_after`` seconds and the read is retried on the primary.
+
+Read-your-writes: once a write commits, reads made from the same context (the
+same request, or tasks it starts) go to the primary for ``read_your_writes``
+seconds, so a replica lagging behind never hides that write from its author.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from .factory import async_session_factory, sync_session_factory
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F")
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+SELECTIONS = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+# Errors after which a read is retried on the primary: DBAPI errors about the
+# database connection rather than the statement (PEP 249)
+REPLICA_ERRORS = (OperationalError, InterfaceError)
+
+# Monotonic time until which reads of this context go to the primary
+_pinned_until: ContextVar[float] = ContextVar("pinned_until", default=0.0)
+
+
+def pinned_to_primary() -> bool:
+    """Whether this context wrote recently enough that its reads must see the primary."""
+    pinned_until = _pinned_until.get()
+    return bool(pinned_until) and pinned_until > time.monotonic()
+
+
+@dataclass(frozen=True)
+class ReplicaSetMetrics:
+    """Point-in-time metrics of a replica set."""
+    name: str
+    replicas: int
+    healthy: int
+    outstanding: int
+    reads: int
+    pinned: int
+    fallbacks: int
+    failures: int
+
+
+class ReplicaSet(Generic[F]):
+    """Thread-safe selection of the replica serving the next read."""
+
+    def __init__(self, name: str, replicas: Sequence[F], selection: str = ROUND_ROBIN,
+                 read_your_writes: float = 2.0, retry_after: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the replica set.
+
+        Args:
+            name: Replica set name, used in logs and metrics
+            replicas: Session factories of the replicas
+            selection: ``round_robin`` or ``least_outstanding``
+            read_your_writes: Seconds reads stay on the primary after a write of the same context
+            retry_after: Seconds a failed replica is skipped
+            clock: Monotonic time source of the failure back-off, replaceable in tests
+        """
+        if not replicas:
+            raise ValueError("a replica set needs at least one replica")
+        if selection not in SELECTIONS:
+            raise ValueError(f"selection must be one of {', '.join(SELECTIONS)}")
+        self.name = name
+        self.replicas: List[F] = list(replicas)
+        self.selection = selection
+        self.read_your_writes = read_your_writes
+        self.retry_after = retry_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        self._outstanding = [0] * len(self.replicas)
+        self._down_until = [0.0] * len(self.replicas)
+        self._reads = 0
+        self._pinned = 0
+        self._fallbacks = 0
+        self._failures = 0
+        logger.info(f"Replica set {name} initialized with {len(self.replicas)} replicas, {selection} selection")
+
+    def note_write(self) -> None:
+        """Pin the reads of the current context to the primary for the read-your-writes window."""
+        if self.read_your_writes > 0:
+            _pinned_until.set(time.monotonic() + self.read_your_writes)
+
+    def acquire(self) -> Optional[F]:
+        """
+        The replica to serve the next read, or None to read from the primary.
+
+        The primary is chosen while the current context is pinned or when every
+        replica is backing off. A replica returned here must be given back with
+        :meth:`release`.
+        """
+        if pinned_to_primary():
+            with self._lock:
+                self._pinned += 1
+            return None
+
+        with self._lock:
+            now = self._clock()
+            healthy = [index for index, down_until in enumerate(self._down_until) if down_until <= now]
+            if not healthy:
+                self._fallbacks += 1
+                return None
+            start = next(self._next)
+            # Rotate from a moving start so ties spread over the replicas
+            ordered = [healthy[(start + offset) % len(healthy)] for offset in range(len(healthy))]
+            if self.selection == LEAST_OUTSTANDING:
+                index = min(ordered, key=self._outstanding.__getitem__)
+            else:
+                index = ordered[0]
+            self._outstanding[index] += 1
+            self._reads += 1
+            return self.replicas[index]
+
+    def release(self, replica: F) -> None:
+        with self._lock:
+            self._outstanding[self._index(replica)] -= 1
+
+    def mark_failed(self, replica: F, error: BaseException) -> None:
+        """Skip ``replica`` for ``retry_after`` seconds; the caller retries the read on the primary."""
+        index = self._index(replica)
+        with self._lock:
+            self._down_until[index] = self._clock() + self.retry_after
+            self._failures += 1
+            self._fallbacks += 1
+        logger.warning(f"Replica {index} of {self.name} failed, reading from the primary "
+                       f"for {self.retry_after}s: {error}")
+
+    def _index(self, replica: F) -> int:
+        for index, candidate in enumerate(self.replicas):
+            if candidate is replica:
+                return index
+        raise ValueError(f"{replica!r} is not a replica of {self.name}")
+
+    @property
+    def metrics(self) -> ReplicaSetMetrics:
+        with self._lock:
+            now = self._clock()
+            return ReplicaSetMetrics(
+                name=self.name,
+                replicas=len(self.replicas),
+                healthy=sum(1 for down_until in self._down_until if down_until <= now),
+                outstanding=sum(self._outstanding),
+                reads=self._reads,
+                pinned=self._pinned,
+                fallbacks=self._fallbacks,
+                failures=self._failures,
+            )
+
+
+def _replica_set(name: str, factories: List[Any], settings: Any) -> Optional[ReplicaSet]:
+    if not factories:
+        return None
+    return ReplicaSet(name, factories, settings.REPLICA_SELECTION, settings.READ_YOUR_WRITES_WINDOW,
+                      settings.REPLICA_RETRY_AFTER)
+
+
+def create_sync_replicas(settings: Any) -> Optional[ReplicaSet]:
+    """Build the replica set of the sync sessions, or None without ``DB_REPLICA_URLS_SYNC``."""
+    return _replica_set("sync_replicas", [sync_session_factory(settings, url)
+                                          for url in settings.DB_REPLICA_URLS_SYNC], settings)
+
+
+def create_async_replicas(settings: Any) -> Optional[ReplicaSet]:
+    """Build the replica set of the async sessions, or None without ``DB_REPLICA_URLS_ASYNC``."""
+    return _replica_set("async_replicas", [async_session_factory(settings, url)
+                                           for url in settings.DB_REPLICA_URLS_ASYNC], settings)
@@ -1,23 +1,13 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
 
 from config import Settings
+from .engine_registry import engine_registry
 from .sync_session import SyncSession
 
 
 class SyncDatabase:
     def __init__(self, settings: Settings) -> None:
-        self._engine = create_engine(
-            settings.DB_URL_SYNC,
-            echo=settings.ECHO,
-            poolclass=QueuePool,
-            pool_pre_ping=True,
-            pool_size=settings.POOL_SIZE,
-            pool_recycle=settings.POOL_RECYCLE,
-            max_overflow=settings.MAX_OVERFLOW,
-            pool_timeout=settings.POOL_TIMEOUT,
-        )
+        self._engine = engine_registry.sync_engine(settings)
         self.session_factory = sessionmaker(
             bind=self._engine,
             class_=SyncSession,
@@ -1,10 +1,9 @@
 import logging
-from typing import Any
-
-from asgiref.sync import async_to_sync
+from typing import Any, Iterator, Sequence
 
 from ports.sync_session_execution import ISyncExecutionStrategy
 from .async_session import AsyncSession
+from .background_loop import background_loop
 from .sync_session import SyncSession
 
 logger = logging.getLogger(__name__)
@@ -39,23 +38,27 @@ class SyncExecutionStrategy(ISyncExecutionStrategy):
         logger.info(f"merge sync instance")
         return session.merge(instance)
 
+    def stream_scalars(self, session: SyncSession, stmt: Any, chunk_size: int) -> Iterator[Sequence[Any]]:
+        logger.info(f"stream sync stmt: {stmt}")
+        yield from session.scalars(stmt.execution_options(stream_results=True, yield_per=chunk_size)).partitions()
+
 
 class AsyncToSyncExecutionStrategy(ISyncExecutionStrategy):
     def execute(self, session: AsyncSession, stmt: Any) -> Any:
         logger.info(f"execute async to sync stmt: {stmt}")
-        return async_to_sync(session.execute)(stmt)
+        return background_loop.call(session.execute(stmt))
 
     def flush(self, session: AsyncSession) -> None:
         logger.info(f"flush async to sync session")
-        async_to_sync(session.flush)()
+        background_loop.call(session.flush())
 
     def refresh(self, session: AsyncSession, instance: Any) -> None:
         logger.info(f"refresh async to sync instance")
-        async_to_sync(session.refresh)(instance)
+        background_loop.call(session.refresh(instance))
 
     def delete(self, session: AsyncSession, instance: Any) -> None:
         logger.info(f"delete async to sync instance")
-        async_to_sync(session.delete)(instance)
+        background_loop.call(session.delete(instance))
 
     def add(self, session: AsyncSession, instance: Any) -> None:
         logger.info(f"add async to sync instance")
@@ -67,4 +70,9 @@ class AsyncToSyncExecutionStrategy(ISyncExecutionStrategy):
 
     def merge(self, session: AsyncSession, instance: Any) -> Any:
         logger.info(f"merge async to sync instance")
-        return async_to_sync(session.merge)(instance)
+        return background_loop.call(session.merge(instance))
+
+    def stream_scalars(self, session: AsyncSession, stmt: Any, chunk_size: int) -> Iterator[Sequence[Any]]:
+        logger.info(f"stream async to sync stmt: {stmt}")
+        result = background_loop.call(session.stream_scalars(stmt.execution_options(yield_per=chunk_size)))
+        yield from background_loop.iterate(result.partitions())
@@ -1,20 +1,24 @@
+import asyncio
 from contextlib import contextmanager
-from typing import Generator, Callable
+from typing import AsyncContextManager, Generator, Callable, Optional
 
-from asgiref.sync import async_to_sync,sync_to_async
 from sqlalchemy.orm import sessionmaker
 
 from ports.async_transaction import IAsyncTransactionManager
 from ports.sync_transaction import ISyncTransactionManager
 from repositories import T
 from .async_session import AsyncSession
+from .background_loop import BackgroundEventLoop, background_loop
 from .base_transaction import BaseTransactionManager
+from .read_mode import mark_written
+from .replicas import ReplicaSet
 from .sync_session import SyncSession
+from .unit_of_work import UnitOfWork, after_commit, current_unit_of_work, finish_async_session, finish_sync_session
 
 
 class SyncTransactionManager(ISyncTransactionManager[SyncSession], BaseTransactionManager):
-    def __init__(self, session_factory: sessionmaker):
-        super().__init__(SyncSession)
+    def __init__(self, session_factory: sessionmaker, replicas: Optional[ReplicaSet[sessionmaker]] = None):
+        super().__init__(SyncSession, replicas)
         self._session_factory = session_factory
         self.logger.info(f"init sync transaction manager")
 
@@ -57,15 +61,19 @@ class SyncTransactionManager(ISyncTransactionManager[SyncSession], BaseTransacti
             # Execute it
             user = transaction_manager.execute_with_session(get_user_by_id)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            return operation(self._scoped_session(scope))
         with self.session() as session:
             return operation(session)
 
-    def execute_with_transaction(self, operation: Callable[[SyncSession], T]) -> T:
+    def execute_with_transaction(self, operation: Callable[[SyncSession], T], savepoint: bool = False) -> T:
         """
         Execute a synchronous operation with transaction
         
         Args:
             operation: A callable that takes a session and returns a result
+            savepoint: In a unit of work, run the operation in a SAVEPOINT of its transaction
             
         Returns:
             The result of the operation
@@ -80,18 +88,55 @@ class SyncTransactionManager(ISyncTransactionManager[SyncSession], BaseTransacti
             # Execute it with transaction
             user = transaction_manager.execute_with_transaction(create_user)
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            session = self._scoped_session(scope)
+            mark_written(session)
+            if savepoint:
+                with session.begin_nested():
+                    return operation(session)
+            return operation(session)
         with self.transaction() as session:
             return operation(session)
 
-    def transactional(self, read_only: bool = False):
+    def transactional(self, read_only: bool = False, savepoint: bool = False):
         """Returns a decorator for sync functions."""
-        return self._create_transactional_decorator(read_only=read_only, is_async=False)
+        return self._create_transactional_decorator(read_only=read_only, is_async=False, savepoint=savepoint)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the writes of this context are committed."""
+        after_commit(callback)
+
+    def _execute_on_replica(self, session_factory: sessionmaker, operation: Callable[[SyncSession], T]) -> T:
+        with session_factory() as session:
+            return operation(session)
+
+    def _scoped_session(self, scope: UnitOfWork) -> SyncSession:
+        """The session of this manager in ``scope``, opened on first use."""
+        session = scope.get(self.scope_key)
+        if session is None:
+            session = self._session_factory()
+            # The unit of work finishes on the event loop, keep the blocking commit off it
+            scope.add(self.scope_key, session,
+                      lambda commit: asyncio.to_thread(finish_sync_session, session, commit))
+        return session
 
 
 class AsyncToSyncTransactionManager(ISyncTransactionManager[AsyncSession], BaseTransactionManager):
-    def __init__(self, async_transaction_manager: IAsyncTransactionManager[AsyncSession]):
-        super().__init__(AsyncSession)
+    """
+    Runs an async transaction manager from sync code.
+
+    Sessions are opened, committed and closed on a long-lived background event loop,
+    while the operation itself runs in the calling thread and submits its statements
+    to the same loop.
+    """
+
+    def __init__(self, async_transaction_manager: IAsyncTransactionManager[AsyncSession],
+                 loop: Optional[BackgroundEventLoop] = None):
+        # Reads go to the replicas of the wrapped manager
+        super().__init__(AsyncSession, getattr(async_transaction_manager, "replicas", None))
         self._async_transaction_manager = async_transaction_manager
+        self._loop = loop or background_loop
         self.logger.info(f"init async to sync transaction manager")
 
     @property
@@ -100,15 +145,17 @@ class AsyncToSyncTransactionManager(ISyncTransactionManager[AsyncSession], BaseT
 
     @contextmanager
     def session(self) -> Generator[AsyncSession, None, None]:
-        raise NotImplementedError("Direct session context manager not supported for AsyncToSyncTransactionManager")
+        with self._bridge(self._async_transaction_manager.session()) as session:
+            yield session
 
     @contextmanager
     def transaction(self) -> Generator[AsyncSession, None, None]:
-        raise NotImplementedError("Direct transaction context manager not supported for AsyncToSyncTransactionManager")
+        with self._bridge(self._async_transaction_manager.transaction()) as session:
+            yield session
 
     def execute_with_session(self, operation: Callable[[AsyncSession], T]) -> T:
         """
-        Execute an operation with session using async_to_sync
+        Execute an operation with session on the background event loop
         
         Args:
             operation: A callable that takes a session and returns a result
@@ -116,30 +163,68 @@ class AsyncToSyncTransactionManager(ISyncTransactionManager[AsyncSession], BaseT
         Returns:
             The result of the operation
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            return operation(self._scoped_session(scope))
+        with self.session() as session:
+            return operation(session)
 
-        async def async_operation():
-            async with self._async_transaction_manager.session() as session:
-                return await sync_to_async(operation)(session)
-
-        return async_to_sync(async_operation)()
-
-    def execute_with_transaction(self, operation: Callable[[AsyncSession], T]) -> T:
+    def execute_with_transaction(self, operation: Callable[[AsyncSession], T], savepoint: bool = False) -> T:
         """
-        Execute an operation with transaction using async_to_sync
+        Execute an operation with transaction on the background event loop
         
         Args:
             operation: A callable that takes a session and returns a result
+            savepoint: In a unit of work, run the operation in a SAVEPOINT of its transaction
             
         Returns:
             The result of the operation
         """
+        scope = current_unit_of_work()
+        if scope is not None:
+            session = self._scoped_session(scope)
+            mark_written(session)
+            if savepoint:
+                with self._bridge(session.begin_nested()):
+                    return operation(session)
+            return operation(session)
+        with self.transaction() as session:
+            return operation(session)
 
-        async def async_operation():
-            async with self._async_transaction_manager.transaction() as session:
-                return await sync_to_async(operation)(session)
+    def transactional(self, read_only: bool = False, savepoint: bool = False):
+        """Returns a decorator for sync functions."""
+        return self._create_transactional_decorator(read_only=read_only, is_async=False, savepoint=savepoint)
 
-        return async_to_sync(async_operation)()
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the writes of this context are committed."""
+        after_commit(callback)
 
-    def transactional(self, read_only: bool = False):
-        """Returns a decorator for sync functions."""
-        return self._create_transactional_decorator(read_only=read_only, is_async=False)
+    def _execute_on_replica(self, session_factory: Callable[[], AsyncSession],
+                            operation: Callable[[AsyncSession], T]) -> T:
+        session = session_factory()
+        try:
+            return operation(session)
+        finally:
+            self._loop.call(session.close())
+
+    def _scoped_session(self, scope: UnitOfWork) -> AsyncSession:
+        """The session of this manager in ``scope``, opened on first use."""
+        session = scope.get(self.scope_key)
+        if session is None:
+            session = self.session_factory()
+            # Its connection belongs to the background loop, which must also finish it
+            scope.add(self.scope_key, session,
+                      lambda commit: asyncio.wrap_future(self._loop.submit(finish_async_session(session, commit))))
+        return session
+
+    @contextmanager
+    def _bridge(self, context: AsyncContextManager[AsyncSession]) -> Generator[AsyncSession, None, None]:
+        """Enter and exit an async session context on the background loop."""
+        session = self._loop.call(context.__aenter__())
+        try:
+            yield session
+        except BaseException as exc:
+            if not self._loop.call(context.__aexit__(type(exc), exc, exc.__traceback__)):
+                raise
+        else:
+            self._loop.call(context.__aexit__(None, None, None))
@@ -0,0 +1,195 @@
+"""
+Request-scoped unit of work.
+
+Inside :func:`unit_of_work` the transaction managers open at most one session per
+database and reuse it: ``execute_with_session``, ``execute_with_transaction`` and
+the ``transactional`` wrappers all join its transaction instead of checking out a
+connection each, so a handler that reads, checks and writes pays for one session.
+The unit of work commits when the scope ends and rolls back when it fails.
+:class:`UnitOfWorkMiddleware` opens one per HTTP request (``REQUEST_SCOPED_SESSION``).
+
+A call joining the unit of work runs directly in its transaction: if it fails, the
+whole unit of work rolls back. ``transactional(savepoint=True)`` runs the call in a
+SAVEPOINT instead, which is rolled back alone when the call raises. What must only
+follow a durable write, such as pinning reads to the primary or dropping shared
+reads, waits for the unit of work to commit (see :func:`after_commit`).
+
+Reads joining the unit of work see its uncommitted writes, so they are never
+shared with other requests (see :func:`reads_are_private`) and only use the
+read-only path (Core rows, item cache) until the session has written. The
+``session()`` and ``transaction()`` context managers keep opening their own
+session: they may outlive the response, e.g. to stream it.
+"""
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .replicas import pinned_to_primary
+
+logger = logging.getLogger(__name__)
+
+# Commits (True) or rolls back (False), then closes one session of a unit of work
+Finisher = Callable[[bool], Awaitable[None]]
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """Sessions shared by the transaction managers until the scope ends."""
+
+    def __init__(self):
+        self._sessions: Dict[Hashable, Tuple[Any, Finisher]] = {}
+        self._after_commit: List[Callable[[], None]] = []
+        self.finished = False
+
+    def get(self, key: Hashable) -> Any:
+        """The session opened for ``key``, None if there is none yet."""
+        entry = self._sessions.get(key)
+        return entry[0] if entry is not None else None
+
+    def add(self, key: Hashable, session: Any, finish: Finisher) -> None:
+        """Share ``session`` for ``key`` until the unit of work ends, which calls ``finish``."""
+        self._sessions[key] = (session, finish)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once every session has committed; it is dropped if the unit of work rolls back."""
+        self._after_commit.append(callback)
+
+    async def finish(self, commit: bool) -> None:
+        """
+        Commit or roll back every session, in opening order, and close them.
+
+        Once a commit fails the remaining sessions roll back; the first error is raised.
+        """
+        self.finished = True
+        sessions, self._sessions = list(self._sessions.values()), {}
+        callbacks, self._after_commit = self._after_commit, []
+        error: Optional[BaseException] = None
+        for _, finish in sessions:
+            try:
+                await finish(commit and error is None)
+            except Exception as e:
+                if error is None:
+                    error = e
+                else:
+                    logger.exception("Failed to finish a unit of work session")
+        if error is not None:
+            raise error
+        if commit:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    # The unit of work is already committed, a failing callback must not undo that
+                    logger.error(f"after-commit callback {callback!r} failed: {e}")
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """The unit of work of this context, None outside of one or once it finished."""
+    scope = _current.get()
+    return scope if scope is not None and not scope.finished else None
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """
+    Call ``callback`` once the writes of this context are committed.
+
+    In a unit of work that is when it commits, and never if it rolls back; outside of
+    one the writes committed on their own, so ``callback`` is called right away.
+    """
+    scope = current_unit_of_work()
+    if scope is None:
+        callback()
+    else:
+        scope.after_commit(callback)
+
+
+def reads_are_private() -> bool:
+    """
+    Whether reads of this context must run on their own instead of being shared.
+
+    True for reads pinned to the primary after a write (see :mod:`.replicas`) and for
+    reads joining a unit of work, which may see its uncommitted writes and must not
+    run on its session once the request has finished.
+    """
+    return pinned_to_primary() or current_unit_of_work() is not None
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Share one session per database between the transaction manager calls of the block."""
+    scope = UnitOfWork()
+    token = _current.set(scope)
+    try:
+        yield scope
+    except BaseException:
+        if not scope.finished:
+            await scope.finish(commit=False)
+        raise
+    else:
+        if not scope.finished:
+            await scope.finish(commit=True)
+    finally:
+        _current.reset(token)
+
+
+def finish_sync_session(session: Any, commit: bool) -> None:
+    try:
+        if commit:
+            session.commit()
+        else:
+            session.rollback()
+    finally:
+        session.close()
+
+
+async def finish_async_session(session: Any, commit: bool) -> None:
+    try:
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+    finally:
+        await session.close()
+
+
+class UnitOfWorkMiddleware:
+    """
+    ASGI middleware running every HTTP request in a :func:`unit_of_work`.
+
+    The unit of work finishes when the response starts, before the client can see
+    it: it commits for statuses below 400 and rolls back otherwise. A failed commit
+    replaces the response with a 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        replaced = False
+
+        async def send_after_finish(message):
+            nonlocal replaced
+            if message["type"] == "http.response.start" and not uow.finished:
+                try:
+                    await uow.finish(commit=message["status"] < 400)
+                except Exception:
+                    logger.exception("Failed to commit the unit of work of the request")
+                    replaced = True
+                    await send({"type": "http.response.start", "status": 500,
+                                "headers": [(b"content-type", b"text/plain; charset=utf-8"),
+                                            (b"content-length", b"21")]})
+                    await send({"type": "http.response.body", "body": b"Internal Server Error"})
+                    return
+            if replaced:
+                # The original response was dropped
+                return
+            await send(message)
+
+        async with unit_of_work() as uow:
+            await self.app(scope, receive, send_after_finish)
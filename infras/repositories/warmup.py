@@ -0,0 +1,256 @@
+"""
+Engine warm-up before the application reports ready.
+
+A cold engine makes the first requests pay for connection establishment, the
+dialect's first-connect initialization and the compilation of every statement.
+Warming an engine:
+
+* checks out up to ``POOL_SIZE`` connections at once, pings each of them and
+  returns them, leaving the pool full of live connections;
+* runs every item repository read once, so their statements (ORM and Core read
+  paths) land in the engine's compiled cache. With ``WARMUP_WRITES`` the primary
+  also runs insert, update and delete in a transaction that is rolled back: that
+  still takes the write lock (the whole database on SQLite), consumes sequence
+  values and fires triggers, hence off by default.
+
+A warm-up that fails on the primary, e.g. while the database is still booting,
+is retried with exponential back-off by :func:`retry_warm_up`.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from api.v1.schemas.item_schema import ItemCreateSchema
+from repositories.pagination import encode_cursor
+from .async_session import AsyncSession
+from .engine_registry import engine_registry
+from .item_async_repository import AsyncItemRepository
+from .item_sync_repository import SyncItemRepository
+from .read_mode import mark_read_only
+from .sync_session import SyncSession
+
+logger = logging.getLogger(__name__)
+
+# Matches no stored item: reads find nothing, and the rolled back writes touch only their own row
+_WARMUP_ID = "warmup"
+_WARMUP_CURSOR = encode_cursor(datetime(1970, 1, 1, tzinfo=timezone.utc), _WARMUP_ID)
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    """Outcome of warming one engine."""
+    url: str
+    connections: int
+    statements: int
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _warmup_items(count: int) -> List[ItemCreateSchema]:
+    """Items to insert, named uniquely so they never collide with stored ones."""
+    return [ItemCreateSchema(name=f"warmup-{uuid.uuid4().hex}", description="warmup", quantity=0, price=0.0)
+            for _ in range(count)]
+
+
+def _pool_connections(engine: Union[Engine, AsyncEngine], connections: int) -> int:
+    """How many connections the pool can keep: pools other than a QueuePool get one."""
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        return min(connections, pool.size())
+    return 1
+
+
+class _StatementCounter:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.count = 0
+
+    def __enter__(self) -> "_StatementCounter":
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+def warm_up_sync_engine(engine: Engine, connections: int, writes: bool = False) -> WarmupReport:
+    """
+    Warm a sync engine.
+
+    Args:
+        engine: The engine to warm
+        connections: Connections to open, capped at the pool size
+        writes: Whether to also run the write statements in a rolled-back transaction; never on replicas
+
+    Returns:
+        What was warmed; failures are reported, not raised
+    """
+    url = engine.url.render_as_string(hide_password=True)
+    start = time.perf_counter()
+    opened = 0
+    with _StatementCounter(engine) as counter:
+        try:
+            opened = _prefill_sync_pool(engine, _pool_connections(engine, connections))
+            _run_sync_statements(engine, writes)
+        except Exception as e:
+            logger.error(f"Warm-up of {url} failed: {e}")
+            return WarmupReport(url, opened, counter.count, time.perf_counter() - start, str(e))
+    report = WarmupReport(url, opened, counter.count, time.perf_counter() - start)
+    logger.info(f"Warmed {url}: {report.connections} connections, {report.statements} statements "
+                f"in {report.seconds:.3f}s")
+    return report
+
+
+async def warm_up_async_engine(engine: AsyncEngine, connections: int, writes: bool = False) -> WarmupReport:
+    """Async variant of :func:`warm_up_sync_engine`; run it on the loop that will use the engine."""
+    url = engine.url.render_as_string(hide_password=True)
+    start = time.perf_counter()
+    opened = 0
+    with _StatementCounter(engine.sync_engine) as counter:
+        try:
+            opened = await _prefill_async_pool(engine, _pool_connections(engine, connections))
+            await _run_async_statements(engine, writes)
+        except Exception as e:
+            logger.error(f"Warm-up of {url} failed: {e}")
+            return WarmupReport(url, opened, counter.count, time.perf_counter() - start, str(e))
+    report = WarmupReport(url, opened, counter.count, time.perf_counter() - start)
+    logger.info(f"Warmed {url}: {report.connections} connections, {report.statements} statements "
+                f"in {report.seconds:.3f}s")
+    return report
+
+
+def _prefill_sync_pool(engine: Engine, connections: int) -> int:
+    # Hold every connection at once so the pool has to open each of them
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(select(1))
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+async def _prefill_async_pool(engine: AsyncEngine, connections: int) -> int:
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = await engine.connect()
+            opened.append(connection)
+            await connection.execute(select(1))
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+def _run_sync_statements(engine: Engine, writes: bool) -> None:
+    repo = SyncItemRepository()
+    for read_only in (False, True):
+        with SyncSession(bind=engine) as session:
+            if read_only:
+                mark_read_only(session)
+            repo.get_by_id(session, _WARMUP_ID)
+            repo.get_many(session, [_WARMUP_ID])
+            repo.list(session, 1)
+            repo.list(session, 1, _WARMUP_CURSOR)
+    if writes:
+        item, bulk_item, update_data = _warmup_items(3)
+        with SyncSession(bind=engine) as session:
+            session.begin()
+            try:
+                created = repo.create(session, item)
+                repo.create_many(session, [bulk_item])
+                repo.update(session, created.id, update_data)
+                repo.delete(session, created.id)
+            finally:
+                session.rollback()
+
+
+async def _run_async_statements(engine: AsyncEngine, writes: bool) -> None:
+    repo = AsyncItemRepository()
+    for read_only in (False, True):
+        async with AsyncSession(bind=engine) as session:
+            if read_only:
+                mark_read_only(session)
+            await repo.get_by_id(session, _WARMUP_ID)
+            await repo.get_many(session, [_WARMUP_ID])
+            await repo.list(session, 1)
+            await repo.list(session, 1, _WARMUP_CURSOR)
+    if writes:
+        item, bulk_item, update_data = _warmup_items(3)
+        async with AsyncSession(bind=engine) as session:
+            await session.begin()
+            try:
+                created = await repo.create(session, item)
+                await repo.create_many(session, [bulk_item])
+                await repo.update(session, created.id, update_data)
+                await repo.delete(session, created.id)
+            finally:
+                await session.rollback()
+
+
+def _warmup_connections(settings: Any) -> int:
+    return settings.WARMUP_CONNECTIONS or settings.POOL_SIZE
+
+
+def warm_up_sync_engines(settings: Any) -> List[WarmupReport]:
+    """Warm the sync primary and replica engines of the settings."""
+    connections = _warmup_connections(settings)
+    reports = [warm_up_sync_engine(engine_registry.sync_engine(settings), connections, settings.WARMUP_WRITES)]
+    for url in settings.DB_REPLICA_URLS_SYNC:
+        reports.append(warm_up_sync_engine(engine_registry.sync_engine(settings, url), connections))
+    return reports
+
+
+async def warm_up_async_engines(settings: Any) -> List[WarmupReport]:
+    """Warm the async primary and replica engines of the settings."""
+    connections = _warmup_connections(settings)
+    reports = [await warm_up_async_engine(engine_registry.async_engine(settings), connections,
+                                         settings.WARMUP_WRITES)]
+    for url in settings.DB_REPLICA_URLS_ASYNC:
+        reports.append(await warm_up_async_engine(engine_registry.async_engine(settings, url), connections))
+    return reports
+
+
+def primary_warmed_up(reports: List[WarmupReport]) -> bool:
+    """Whether the primary, the first report, warmed up; replica failures fall back to the primary."""
+    return not reports or reports[0].ok
+
+
+async def retry_warm_up(warm_up: Callable[[], Awaitable[List[WarmupReport]]],
+                        on_attempt: Callable[[List[WarmupReport]], None],
+                        delay: float, max_delay: float) -> List[WarmupReport]:
+    """
+    Repeat ``warm_up`` until the primary warms up.
+
+    Waits ``delay`` before the first attempt and doubles it after every failure,
+    up to ``max_delay``. ``on_attempt`` receives the reports of every attempt.
+    """
+    while True:
+        await asyncio.sleep(delay)
+        reports = await warm_up()
+        on_attempt(reports)
+        if primary_warmed_up(reports):
+            logger.info("Warm-up of the primary succeeded after a retry")
+            return reports
+        logger.warning(f"Warm-up of the primary failed again: {reports[0].error}")
+        delay = min(delay * 2, max_delay)
@@ -0,0 +1,27 @@
+from .histogram import (
+    DEFAULT_TIME_BUCKETS,
+    Histogram,
+    HistogramSnapshot,
+)
+from .pool_telemetry import (
+    PoolMetrics,
+    PoolTelemetry,
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+)
+from .prometheus import (
+    CONTENT_TYPE,
+    render_pool_metrics,
+)
+
+__all__ = [
+    "DEFAULT_TIME_BUCKETS",
+    "Histogram",
+    "HistogramSnapshot",
+    "PoolMetrics",
+    "PoolTelemetry",
+    "TimedAsyncAdaptedQueuePool",
+    "TimedQueuePool",
+    "CONTENT_TYPE",
+    "render_pool_metrics",
+]
@@ -0,0 +1,232 @@
+"""
+Connection pool telemetry for sync and async engines.
+
+A :class:`PoolTelemetry` listens to the pool events of one engine and keeps
+counters (checkouts, checkouts in overflow, timeouts, connects and reconnects,
+closes and invalidations) and histograms of how long a checkout took and how
+long the connection was held before being returned. The engine registry
+attaches one to every engine it creates. The connection lifecycle policies
+report their recycles, idle closes and liveness pings to it as well.
+
+Pool events fire once a connection is already checked out, so the time spent
+getting it is measured by the pool itself: :class:`TimedQueuePool` and
+:class:`TimedAsyncAdaptedQueuePool` time ``connect()`` (waiting in the queue,
+opening an overflow connection and the liveness ping) and count timeouts. The
+engine registry builds on them: its engines use ``ReapableQueuePool`` and
+``ReapableAsyncAdaptedQueuePool`` from ``infras.repositories.connection_lifecycle``,
+which add idle reaping to the resizable pools of ``infras.repositories.pool_sizing``,
+themselves timed pools.
+
+Each event costs a clock read and a short critical section, cheap enough to
+leave enabled in production; see ``python -m benchmarks.bench_pool_telemetry``.
+"""
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .histogram import Histogram, HistogramSnapshot
+
+
+class _TimedCheckout:
+    """Pool mixin reporting the duration of every ``connect()`` to its telemetry."""
+
+    telemetry: Optional["PoolTelemetry"] = None
+
+    def connect(self):
+        telemetry = self.telemetry
+        if telemetry is None:
+            return super().connect()
+        start = telemetry.clock()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            telemetry.record_timeout()
+            raise
+        telemetry.record_checkout_wait(telemetry.clock() - start)
+        return connection
+
+    def recreate(self):
+        # Engine.dispose() replaces the pool; the new one keeps reporting
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that times checkouts."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times checkouts."""
+
+
+@dataclass(frozen=True)
+class PoolMetrics:
+    """Point-in-time metrics of an engine's connection pool."""
+    url: str
+    is_async: bool
+    size: int
+    checked_out: int
+    # Connections open beyond ``size``, now and at most so far
+    overflow: int
+    overflow_peak: int
+    checkouts: int
+    # Checkouts that found the pool in overflow
+    overflow_checkouts: int
+    timeouts: int
+    connects: int
+    # Connects replacing a connection that was closed, recycled or invalidated
+    reconnects: int
+    closes: int
+    # Hard or soft, including the connections the lifecycle policies replace
+    invalidations: int
+    # Connections closed for reaching their maximum lifetime or idle timeout
+    recycles: int
+    idle_closes: int
+    pings: int
+    ping_failures: int
+    checkout_wait: HistogramSnapshot
+    hold_time: HistogramSnapshot
+    ping_time: HistogramSnapshot
+
+
+class PoolTelemetry:
+    """Counters and histograms of one engine's pool, fed by pool events."""
+
+    def __init__(self, engine: Union[Engine, AsyncEngine], clock: Callable[[], float] = time.perf_counter):
+        """
+        Attach to ``engine``.
+
+        Args:
+            engine: The engine whose pool to observe; an async engine is observed through its sync engine
+            clock: Monotonic clock in seconds
+        """
+        self.is_async = isinstance(engine, AsyncEngine)
+        self.engine: Engine = engine.sync_engine if self.is_async else engine
+        self.url = self.engine.url.render_as_string(hide_password=True)
+        self.clock = clock
+        # Pools without a fixed size (e.g. NullPool) have no overflow; dispose() keeps the pool class
+        self._queued = isinstance(self.engine.pool, QueuePool)
+        self._lock = threading.Lock()
+        # Checkout time of each checked out connection, by connection record
+        self._checked_out_at: Dict[int, float] = {}
+        # Connection records that had a connection before, to tell reconnects apart
+        self._connected_records: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._checkout_wait = Histogram()
+        self._hold_time = Histogram()
+        self._ping_time = Histogram()
+        self._checkouts = 0
+        self._overflow_checkouts = 0
+        self._overflow_peak = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._reconnects = 0
+        self._closes = 0
+        self._invalidations = 0
+        self._recycles = 0
+        self._idle_closes = 0
+        self._pings = 0
+        self._ping_failures = 0
+
+        if isinstance(self.engine.pool, _TimedCheckout):
+            self.engine.pool.telemetry = self
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+        event.listen(self.engine, "connect", self._on_connect)
+        event.listen(self.engine, "close", self._on_close)
+        event.listen(self.engine, "invalidate", self._on_invalidate)
+        event.listen(self.engine, "soft_invalidate", self._on_invalidate)
+
+    def record_checkout_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._checkout_wait.observe(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def record_ping(self, seconds: float, alive: bool) -> None:
+        with self._lock:
+            self._pings += 1
+            self._ping_time.observe(seconds)
+            if not alive:
+                self._ping_failures += 1
+
+    def record_recycle(self) -> None:
+        with self._lock:
+            self._recycles += 1
+
+    def record_idle_closes(self, count: int = 1) -> None:
+        with self._lock:
+            self._idle_closes += count
+
+    def _overflow(self) -> int:
+        return max(self.engine.pool.overflow(), 0) if self._queued else 0
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        now = self.clock()
+        overflow = self._overflow()
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out_at[id(connection_record)] = now
+            if overflow:
+                self._overflow_checkouts += 1
+                if overflow > self._overflow_peak:
+                    self._overflow_peak = overflow
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        now = self.clock()
+        with self._lock:
+            checked_out_at = self._checked_out_at.pop(id(connection_record), None)
+            if checked_out_at is not None:
+                self._hold_time.observe(now - checked_out_at)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._connects += 1
+            if connection_record in self._connected_records:
+                self._reconnects += 1
+            else:
+                self._connected_records.add(connection_record)
+
+    def _on_close(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._closes += 1
+
+    def _on_invalidate(self, dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        with self._lock:
+            self._invalidations += 1
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        pool = self.engine.pool
+        with self._lock:
+            return PoolMetrics(
+                url=self.url,
+                is_async=self.is_async,
+                size=pool.size() if self._queued else 0,
+                checked_out=pool.checkedout() if self._queued else len(self._checked_out_at),
+                overflow=self._overflow(),
+                overflow_peak=self._overflow_peak,
+                checkouts=self._checkouts,
+                overflow_checkouts=self._overflow_checkouts,
+                timeouts=self._timeouts,
+                connects=self._connects,
+                reconnects=self._reconnects,
+                closes=self._closes,
+                invalidations=self._invalidations,
+                recycles=self._recycles,
+                idle_closes=self._idle_closes,
+                pings=self._pings,
+                ping_failures=self._ping_failures,
+                checkout_wait=self._checkout_wait.snapshot(),
+                hold_time=self._hold_time.snapshot(),
+                ping_time=self._ping_time.snapshot(),
+            )
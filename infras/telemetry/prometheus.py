@@ -0,0 +1,93 @@
+"""
+Prometheus text exposition (format 0.0.4) of the pool metrics.
+
+Rendered by hand: the format is a few lines per sample, and writing it here
+avoids a dependency on ``prometheus_client`` and a second, global registry.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from .histogram import HistogramSnapshot
+from .pool_telemetry import PoolMetrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Dict[str, str]
+
+# (name, type, help, PoolMetrics attribute)
+_POOL_SAMPLES: Tuple[Tuple[str, str, str, str], ...] = (
+    ("db_pool_size", "gauge", "Connections the pool keeps open", "size"),
+    ("db_pool_checked_out", "gauge", "Connections currently checked out", "checked_out"),
+    ("db_pool_overflow", "gauge", "Connections currently open beyond the pool size", "overflow"),
+    ("db_pool_overflow_peak", "gauge", "Most connections open beyond the pool size so far", "overflow_peak"),
+    ("db_pool_checkouts_total", "counter", "Connections checked out", "checkouts"),
+    ("db_pool_overflow_checkouts_total", "counter", "Checkouts while the pool was in overflow",
+     "overflow_checkouts"),
+    ("db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out waiting for a connection",
+     "timeouts"),
+    ("db_pool_connects_total", "counter", "New database connections opened", "connects"),
+    ("db_pool_reconnects_total", "counter", "Connections opened to replace a closed or invalidated one",
+     "reconnects"),
+    ("db_pool_closes_total", "counter", "Database connections closed", "closes"),
+    ("db_pool_invalidations_total", "counter", "Connections invalidated, hard or soft", "invalidations"),
+    ("db_pool_recycles_total", "counter", "Connections replaced for reaching their maximum lifetime", "recycles"),
+    ("db_pool_idle_closes_total", "counter", "Connections closed for staying idle too long", "idle_closes"),
+    ("db_pool_pings_total", "counter", "Liveness pings of connections idle before checkout", "pings"),
+    ("db_pool_ping_failures_total", "counter", "Liveness pings that found the connection dead", "ping_failures"),
+)
+
+_POOL_HISTOGRAMS: Tuple[Tuple[str, str, str], ...] = (
+    ("db_pool_checkout_wait_seconds", "Time taken to check out a connection, including the liveness ping",
+     "checkout_wait"),
+    ("db_pool_hold_seconds", "Time a connection stayed checked out", "hold_time"),
+    ("db_pool_ping_seconds", "Time taken by a liveness ping", "ping_time"),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _histogram_lines(name: str, labels: Labels, snapshot: HistogramSnapshot) -> List[str]:
+    lines = []
+    bounds = snapshot.buckets + (float("inf"),)
+    for bound, count in zip(bounds, snapshot.cumulative_counts):
+        bucket_labels = {**labels, "le": _format_value(bound)}
+        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot.sum)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot.count}")
+    return lines
+
+
+def _pool_labels(metrics: PoolMetrics) -> Labels:
+    return {"engine": "async" if metrics.is_async else "sync", "url": metrics.url}
+
+
+def render_pool_metrics(pools: Iterable[PoolMetrics]) -> str:
+    """Render the metrics of every pool, one family after the other."""
+    pools = list(pools)
+    lines: List[str] = []
+    for name, kind, help_text, attribute in _POOL_SAMPLES:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for metrics in pools:
+            lines.append(f"{name}{_format_labels(_pool_labels(metrics))} {getattr(metrics, attribute)}")
+    for name, help_text, attribute in _POOL_HISTOGRAMS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for metrics in pools:
+            lines.extend(_histogram_lines(name, _pool_labels(metrics), getattr(metrics, attribute)))
+    return "\n".join(lines) + "\n"
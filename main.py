@@ -1,13 +1,31 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from dataclasses import asdict
+from typing import List, Optional
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from config import get_settings
 from container import Container
+from infras.executors import ExecutorRejectedError, shutdown_thread_pool, thread_pool_manager
+from infras.repositories.background_loop import BackgroundEventLoop, background_loop
 from infras.repositories.base_po import BasePO
+from infras.repositories.connection_lifecycle import create_connection_reaper
+from infras.repositories.engine_registry import engine_registry
 from infras.repositories.factory import get_engine
+from infras.repositories.pool_sizing import create_pool_sizer
+from infras.repositories.unit_of_work import UnitOfWorkMiddleware
+from infras.repositories.warmup import (
+    WarmupReport,
+    primary_warmed_up,
+    retry_warm_up,
+    warm_up_async_engines,
+    warm_up_sync_engines,
+)
+from infras.telemetry import CONTENT_TYPE, render_pool_metrics
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,25 +34,116 @@ logger = logging.getLogger("ApiServer")
 container = Container()
 settings = get_settings()
 
+# Seconds a client is asked to wait after an executor rejected its request
+EXECUTOR_RETRY_AFTER = 1
+
+
+def _uses_async_engine() -> bool:
+    return settings.REPO_DRIVER in ("async_db", "uniform_async_db")
+
+
+def _uses_async_to_sync_bridge() -> bool:
+    """Sync routes on an async driver run their sessions on the background event loop."""
+    return not settings.USE_ASYNC_ROUTER and _uses_async_engine()
+
+
+async def _create_tables(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(BasePO.metadata.create_all)
+
+
+async def _warm_up(bridge_loop: Optional[BackgroundEventLoop]) -> List[WarmupReport]:
+    """Warm the engines the repository driver uses, on the loop or thread that will use them."""
+    if _uses_async_engine():
+        if bridge_loop is not None:
+            return await asyncio.wrap_future(bridge_loop.submit(warm_up_async_engines(settings)))
+        return await warm_up_async_engines(settings)
+    # Sync connects and statements block, keep them off the event loop
+    return await asyncio.to_thread(warm_up_sync_engines, settings)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    thread_pool_manager.configure(settings)
+    session_workers = container.session_workers()
+    bridge_loop = background_loop if _uses_async_to_sync_bridge() else None
+    if bridge_loop is not None:
+        bridge_loop.start()
+
     engine = get_engine(settings)
     if settings.USE_ASYNC_DB:
-        async with engine.begin() as conn:
-            await conn.run_sync(BasePO.metadata.create_all)
+        if bridge_loop is not None:
+            # Keep the async pool's connections on the loop that will use them
+            await asyncio.wrap_future(bridge_loop.submit(_create_tables(engine)))
+        else:
+            await _create_tables(engine)
     else:
         BasePO.metadata.create_all(bind=engine)
 
+    def record_warmup(reports: List[WarmupReport]) -> None:
+        app.state.warmup = reports
+        app.state.ready = primary_warmed_up(reports)
+
+    warming = None
+    if settings.WARMUP_ON_STARTUP:
+        record_warmup(await _warm_up(bridge_loop))
+        if not app.state.ready:
+            # The primary may still be booting: keep warming up in the background, /ready stays 503 until then
+            warming = asyncio.ensure_future(retry_warm_up(lambda: _warm_up(bridge_loop), record_warmup,
+                                                          settings.WARMUP_RETRY_DELAY,
+                                                          settings.WARMUP_RETRY_MAX_DELAY))
+    else:
+        app.state.ready = True
+    pool_sizer = create_pool_sizer(settings, engine_registry)
+    if pool_sizer is not None:
+        pool_sizer.start()
+    reaper = create_connection_reaper(settings, engine_registry)
+    if reaper is not None:
+        # On the loop of the async pools, which must be reaped from their own loop
+        if bridge_loop is not None:
+            bridge_loop.submit(reaper.run())
+        else:
+            asyncio.ensure_future(reaper.run())
+
     yield
 
-    if settings.USE_ASYNC_DB:
-        await engine.dispose()
-    else:
-        engine.dispose()
+    app.state.ready = False
+    if warming is not None:
+        warming.cancel()
+        with suppress(asyncio.CancelledError):
+            await warming
+    if reaper is not None:
+        # A pass in progress must finish before the pools are disposed
+        if bridge_loop is not None:
+            await asyncio.wrap_future(bridge_loop.submit(reaper.stop()))
+        else:
+            await reaper.stop()
+    if pool_sizer is not None:
+        pool_sizer.stop()
+    if session_workers is not None:
+        session_workers.shutdown()
+        container.session_workers.reset()
+    if bridge_loop is not None:
+        await asyncio.wrap_future(bridge_loop.submit(engine_registry.dispose_all()))
+        bridge_loop.stop()
+    shutdown_thread_pool()
+    await engine_registry.dispose_all()
 
 
 app = FastAPI(lifespan=lifespan)
+app.state.ready = False
+app.state.warmup = []
+if settings.REQUEST_SCOPED_SESSION:
+    # One session per database for all the service calls of a request
+    app.add_middleware(UnitOfWorkMiddleware)
+
+
+@app.exception_handler(ExecutorRejectedError)
+async def executor_rejected(request: Request, exc: ExecutorRejectedError):
+    """A saturated executor sheds load: 503 with a Retry-After, not a 500 with a traceback."""
+    logger.warning(str(exc))
+    return JSONResponse({"detail": "Service overloaded, retry later"}, status_code=503,
+                        headers={"Retry-After": str(EXECUTOR_RETRY_AFTER)})
 
 
 @app.get("/health")
@@ -43,6 +152,21 @@ async def health_check():
     return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup, including the engine warm-up, has finished."""
+    warmup = [asdict(report) for report in app.state.warmup]
+    if not app.state.ready:
+        return JSONResponse({"status": "not ready", "warmup": warmup}, status_code=503)
+    return {"status": "ready", "warmup": warmup}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pool telemetry of every engine, in the Prometheus text format."""
+    return PlainTextResponse(render_pool_metrics(engine_registry.pool_metrics), media_type=CONTENT_TYPE)
+
+
 if settings.USE_ASYNC_ROUTER:
     from api.v1.controllers import item_async_controller as item
 
@@ -0,0 +1,10 @@
+from typing import Generic
+
+from pydantic import BaseModel as PydanticBaseModel
+
+from .base_model import M
+
+
+class PageModel(PydanticBaseModel, Generic[M]):
+    items: list[M]
+    next_cursor: str | None = None
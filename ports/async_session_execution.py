@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import Any
+from typing import Any, AsyncIterator, Sequence
 
 from repositories import TSession
 
@@ -25,3 +25,6 @@ class IAsyncExecutionStrategy(ABC):
 
     @abstractmethod
     async def merge(self, session: TSession, instance: Any) -> Any: ...
+
+    @abstractmethod
+    def stream_scalars(self, session: TSession, stmt: Any, chunk_size: int) -> AsyncIterator[Sequence[Any]]: ...
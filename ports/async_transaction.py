@@ -21,7 +21,10 @@ class IAsyncTransactionManager(ABC, Generic[TSession]):
     async def execute_with_session(self, operation: AsyncOperation[TSession, T]) -> T: ...
 
     @abstractmethod
-    async def execute_with_transaction(self, operation: AsyncOperation[TSession, T]) -> T: ...
+    async def execute_with_transaction(self, operation: AsyncOperation[TSession, T], savepoint: bool = False) -> T: ...
 
     @abstractmethod
-    def transactional(self, read_only: bool = False) -> Callable: ...
+    def transactional(self, read_only: bool = False, savepoint: bool = False) -> Callable: ...
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None: ...
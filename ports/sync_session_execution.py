@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import Any
+from typing import Any, Iterator, Sequence
 
 from repositories import TSession
 
@@ -25,3 +25,6 @@ class ISyncExecutionStrategy(ABC):
 
     @abstractmethod
     def merge(self, session: TSession, instance: Any) -> Any: ...
+
+    @abstractmethod
+    def stream_scalars(self, session: TSession, stmt: Any, chunk_size: int) -> Iterator[Sequence[Any]]: ...
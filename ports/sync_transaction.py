@@ -21,7 +21,10 @@ class ISyncTransactionManager(Generic[TSession], ABC):
     def execute_with_session(self, operation: Callable[[TSession], T]) -> T: ...
 
     @abstractmethod
-    def execute_with_transaction(self, operation: Callable[[TSession], T]) -> T: ...
+    def execute_with_transaction(self, operation: Callable[[TSession], T], savepoint: bool = False) -> T: ...
 
     @abstractmethod
-    def transactional(self, read_only: bool = False) -> Callable:...
\ No newline at end of file
+    def transactional(self, read_only: bool = False, savepoint: bool = False) -> Callable:...
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None: ...
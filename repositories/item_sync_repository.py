@@ -1,19 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Sequence
 
 from api.v1.schemas.item_schema import ItemCreateSchema
 from models.item_model import ItemModel
+from models.page_model import PageModel
 from repositories import TSession
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
 
 
 class ISyncItemRepository(ABC):
     @abstractmethod
     def get_by_id(self, session: TSession, item_id: str) -> ItemModel | None: ...
 
+    @abstractmethod
+    def get_many(self, session: TSession, ids: Sequence[str]) -> List[ItemModel | None]: ...
+
     @abstractmethod
     def create(self, session: TSession, item: ItemCreateSchema) -> ItemModel: ...
 
     @abstractmethod
-    def list(self, session: TSession) -> list[ItemModel]: ...
+    def create_many(self, session: TSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]: ...
+
+    @abstractmethod
+    def list(self, session: TSession, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str | None = None) -> PageModel[ItemModel]: ...
+
+    @abstractmethod
+    def stream(self, session: TSession, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]: ...
 
     @abstractmethod
     def update(self, session: TSession, item_id: str, update_data: ItemCreateSchema) -> ItemModel | None: ...
@@ -0,0 +1,47 @@
+"""
+Keyset pagination cursors.
+
+Pages are ordered by ``(created_at, id)``. A cursor is the opaque, URL-safe encoding
+of the last row of the previous page, so the next page starts with a range scan on
+the composite index instead of an ``OFFSET`` that grows with the page number.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip when streaming the whole table
+STREAM_CHUNK_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: str
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(created_at), str(item_id))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
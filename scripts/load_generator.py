@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the item API.
+
+Requests are sent at a fixed arrival rate whatever the app does: the i-th
+request is due at ``start + i / rate`` and its latency is measured from that
+intended send time, not from when it actually left. A closed-loop client waits
+for a response before sending the next request, so a saturated pool slows the
+client down with it and the stalled requests never show up in the tail
+(coordinated omission); here they do. Latencies go into an HDR-style
+log-linear histogram with a fixed number of significant digits.
+
+Each rate of ``--rates`` runs for ``--duration`` seconds and reports the
+achieved throughput and the latency percentiles. The saturation knee is the
+highest rate still sustained: at least 95% of the rate achieved, no errors and
+a p99 within ``--slo-p99`` milliseconds.
+
+Targets:
+
+* ``--mode inprocess`` (default) runs the app in a subprocess per
+  configuration and sends requests through an ASGI transport on the same event
+  loop, so the generator competes with the app for the loop;
+* ``--mode uvicorn`` starts ``uvicorn main:app`` on localhost per configuration;
+* ``--url`` targets a server that is already running, with its own settings.
+
+Every combination of ``--drivers`` and ``--pool-sizes`` is a configuration
+(``REPO_DRIVER`` and ``POOL_SIZE``). Each gets a fresh SQLite database unless
+``DB_URL_SYNC`` and ``DB_URL_ASYNC`` are set in the environment.
+
+Usage:
+    python -m scripts.load_generator --rates 50 100 200 400 [--duration 10]
+        [--mix get=70,list=10,create=10,update=5,delete=5] [--mode inprocess|uvicorn | --url URL]
+        [--drivers async_db sync_db] [--pool-sizes 5 20] [--router async|sync] [--slo-p99 100]
+        [--output results.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("get", "list", "create", "update", "delete", "batch_get")
+DEFAULT_MIX = "get=70,list=10,create=10,update=5,delete=5"
+DRIVERS = ("async_db", "sync_db", "uniform_async_db", "uniform_sync_db")
+LIST_LIMIT = 20
+BATCH_GET_SIZE = 10
+# Share of the target rate a run must achieve to count as sustained
+SUSTAINED_SHARE = 0.95
+PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99, 100.0)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in microseconds.
+
+    Buckets are log-linear: each power of two is split into enough linear
+    sub-buckets to keep ``significant_digits`` digits, so the relative error of
+    a recorded value is bounded whatever its magnitude. Values above
+    ``highest`` are clamped to it.
+    """
+
+    def __init__(self, highest: float = 60.0, significant_digits: int = 2):
+        """
+        Args:
+            highest: Largest latency tracked, in seconds
+            significant_digits: Decimal digits kept for every value, 1 to 5
+        """
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.highest_us = max(1, int(highest * 1e6))
+        self.significant_digits = significant_digits
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_half = 1 << (self._sub_bucket_bits - 1)
+        self._counts = [0] * (self._index(self.highest_us) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def _index(self, value_us: int) -> int:
+        shift = max(0, value_us.bit_length() - self._sub_bucket_bits)
+        return shift * self._sub_bucket_half + (value_us >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value counted in the bucket at ``index``."""
+        shift = max(0, index // self._sub_bucket_half - 1)
+        sub_bucket = index - shift * self._sub_bucket_half
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """Record one latency."""
+        value_us = min(self.highest_us, max(0, int(seconds * 1e6)))
+        self._counts[self._index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the values recorded by ``other``, which must have the same layout."""
+        if (other.highest_us, other.significant_digits) != (self.highest_us, self.significant_digits):
+            raise ValueError("histograms with different layouts cannot be merged")
+        for index, count in enumerate(other._counts):
+            self._counts[index] += count
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percentile: float) -> float:
+        """Latency in seconds under which ``percentile`` percent of the values fall."""
+        if not self.count:
+            return 0.0
+        if percentile >= 100:
+            return self.max_us / 1e6
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    @property
+    def mean(self) -> float:
+        return self.total_us / self.count / 1e6 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Percentile distribution in milliseconds."""
+        result = {f"p{p:g}_ms": self.percentile(p) * 1000 for p in PERCENTILES if p < 100}
+        result["max_ms"] = self.max_us / 1000
+        result["mean_ms"] = self.mean * 1000
+        return result
+
+
+@dataclass
+class RateResult:
+    """Outcome of one run at a fixed rate."""
+    rate: float
+    duration: float
+    sent: int
+    completed: int
+    errors: int
+    # Requests still running when the drain timeout expired
+    unfinished: int
+    achieved_rate: float
+    # From the intended send time
+    latency: Dict[str, float]
+    # From the actual send time, what a closed-loop tool would report
+    service_time: Dict[str, float]
+    # How late the generator sent requests; large values mean the generator itself could not keep up
+    send_lag: Dict[str, float]
+    by_operation: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def sustained(self, slo_p99_ms: float) -> bool:
+        return (self.errors == 0 and self.unfinished == 0
+                and self.achieved_rate >= SUSTAINED_SHARE * self.rate
+                and self.latency["p99_ms"] <= slo_p99_ms)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``get=70,list=10,...`` into operation weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+def _item(prefix: str) -> Dict[str, Any]:
+    # Names are unique in the items table
+    return {"name": f"{prefix}-{uuid.uuid4().hex}", "description": "load item", "quantity": 1, "price": 9.99}
+
+
+async def _create_items(client: httpx.AsyncClient, count: int) -> List[str]:
+    ids = []
+    for start in range(0, count, 500):
+        response = await client.post("/items/bulk", json=[_item("seed") for _ in range(min(500, count - start))])
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json())
+    return ids
+
+
+class LoadGenerator:
+    """Sends an open-loop request mix to one app through ``client``."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], seed: int = 0,
+                 drain_timeout: float = 30.0, significant_digits: int = 2):
+        """
+        Args:
+            client: Client of the app, its base URL set
+            mix: Operation weights
+            seed: Seed of the operation sequence and of the item choice
+            drain_timeout: Seconds to wait for the requests still running once all were sent
+            significant_digits: Precision of the latency histograms
+        """
+        self.client = client
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.drain_timeout = drain_timeout
+        self.significant_digits = significant_digits
+        self._items: List[str] = []
+        self._deletable: List[str] = []
+
+    async def seed(self, count: int) -> None:
+        """Create the items read and updated by the mix."""
+        self._items = await _create_items(self.client, count)
+
+    def _histogram(self) -> LatencyHistogram:
+        return LatencyHistogram(significant_digits=self.significant_digits)
+
+    def _request(self, operation: str) -> Tuple[str, str, Optional[Any]]:
+        if operation == "get":
+            return "GET", f"/items/{self.rng.choice(self._items)}", None
+        if operation == "list":
+            return "GET", f"/items/?limit={LIST_LIMIT}", None
+        if operation == "create":
+            return "POST", "/items/", _item("load")
+        if operation == "update":
+            return "PUT", f"/items/{self.rng.choice(self._items)}", _item("load")
+        if operation == "delete":
+            return "DELETE", f"/items/{self._deletable.pop()}", None
+        return "POST", "/items/batch-get", self.rng.sample(self._items, min(BATCH_GET_SIZE, len(self._items)))
+
+    async def run(self, rate: float, duration: float) -> RateResult:
+        """Send ``rate`` requests per second for ``duration`` seconds."""
+        if not self._items and any(op in self.mix for op in ("get", "update", "batch_get")):
+            raise RuntimeError("seed() the items first")
+        total = max(1, int(rate * duration))
+        operations = self.rng.choices(list(self.mix), weights=list(self.mix.values()), k=total)
+        # Every delete needs an item of its own
+        self._deletable = await _create_items(self.client, operations.count("delete"))
+
+        latency, service, lag = self._histogram(), self._histogram(), self._histogram()
+        by_operation = {operation: self._histogram() for operation in self.mix}
+        errors = 0
+        loop = asyncio.get_running_loop()
+
+        async def send(operation: str, intended: float) -> None:
+            nonlocal errors
+            method, url, body = self._request(operation)
+            sent = loop.time()
+            lag.record(sent - intended)
+            try:
+                response = await self.client.request(method, url, json=body)
+                if response.is_error:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            done = loop.time()
+            latency.record(done - intended)
+            service.record(done - sent)
+            by_operation[operation].record(done - intended)
+
+        tasks = []
+        start = loop.time()
+        for index, operation in enumerate(operations):
+            intended = start + index / rate
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Never wait for earlier responses: that is what makes the load open-loop
+            tasks.append((intended, asyncio.ensure_future(send(operation, intended))))
+
+        pending = [task for _, task in tasks]
+        _, unfinished = await asyncio.wait(pending, timeout=self.drain_timeout)
+        now = loop.time()
+        for intended, task in tasks:
+            if task in unfinished:
+                task.cancel()
+                # At least this late
+                latency.record(now - intended)
+        if unfinished:
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+        completed = len(tasks) - len(unfinished)
+        return RateResult(
+            rate=rate,
+            duration=duration,
+            sent=len(tasks),
+            completed=completed,
+            errors=errors,
+            unfinished=len(unfinished),
+            achieved_rate=completed / (now - start) if now > start else 0.0,
+            latency=latency.summary(),
+            service_time=service.summary(),
+            send_lag=lag.summary(),
+            by_operation={operation: histogram.summary() for operation, histogram in by_operation.items()
+                          if histogram.count},
+        )
+
+
+async def sweep(client: httpx.AsyncClient, args: argparse.Namespace) -> List[RateResult]:
+    """Run every rate of ``args.rates`` against the app behind ``client``."""
+    generator = LoadGenerator(client, parse_mix(args.mix), seed=args.seed, drain_timeout=args.drain_timeout,
+                              significant_digits=args.significant_digits)
+    await generator.seed(args.seed_items)
+    if args.warmup > 0:
+        await generator.run(args.rates[0], args.warmup)
+    results = []
+    for rate in args.rates:
+        result = await generator.run(rate, args.duration)
+        logger.info(f"{rate:g} req/s: achieved {result.achieved_rate:.1f} req/s, "
+                    f"p99 {result.latency['p99_ms']:.1f} ms, {result.errors} errors")
+        results.append(result)
+    return results
+
+
+def saturation_knee(results: List[RateResult], slo_p99_ms: float) -> Optional[float]:
+    """Highest rate sustained before the first one that was not, None if even the first was not."""
+    knee = None
+    for result in sorted(results, key=lambda r: r.rate):
+        if not result.sustained(slo_p99_ms):
+            break
+        knee = result.rate
+    return knee
+
+
+async def _run_inprocess(args: argparse.Namespace) -> List[RateResult]:
+    import main
+
+    # The repositories log every statement at INFO, which would slow the app down
+    logging.getLogger().setLevel(args.log_level)
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=args.timeout) as client:
+            return await sweep(client, args)
+
+
+async def _run_remote(url: str, args: argparse.Namespace) -> List[RateResult]:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await sweep(client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:g}s")
+
+
+def _configuration_env(driver: str, pool_size: int, router: str, db_dir: str) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        "REPO_DRIVER": driver,
+        "POOL_SIZE": str(pool_size),
+        "USE_ASYNC_ROUTER": str(router == "async").lower(),
+        "USE_ASYNC_DB": str(driver in ("async_db", "uniform_async_db")).lower(),
+    }
+    if not (os.environ.get("DB_URL_SYNC") and os.environ.get("DB_URL_ASYNC")):
+        db_path = os.path.join(db_dir, f"{driver}-{pool_size}-{router}.db")
+        env["DB_URL_SYNC"] = f"sqlite:///{db_path}"
+        env["DB_URL_ASYNC"] = f"sqlite+aiosqlite:///{db_path}"
+    return env
+
+
+def _run_configuration(driver: str, pool_size: int, args: argparse.Namespace, db_dir: str) -> List[RateResult]:
+    env = _configuration_env(driver, pool_size, args.router, db_dir)
+    if args.mode == "uvicorn":
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        # main.py logs every statement at INFO: keep it out of the terminal
+        with open(args.server_log, "a") as log:
+            server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                       "--port", str(port), "--no-access-log"], env=env, stdout=log, stderr=log)
+            try:
+                _wait_ready(url, server)
+                return asyncio.run(_run_remote(url, args))
+            finally:
+                server.terminate()
+                server.wait()
+
+    # The settings, the container and the router are fixed at import: one process per configuration
+    command = [sys.executable, "-m", "scripts.load_generator", "--worker", *sys.argv[1:]]
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True, check=True)
+    return [RateResult(**result) for result in json.loads(completed.stdout)]
+
+
+def _print_results(label: str, results: List[RateResult], slo_p99_ms: float) -> None:
+    print(f"{label}", file=sys.stderr)
+    print(f"{'rate':>8} {'achieved':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9} {'max ms':>9} "
+          f"{'svc p99':>9} {'errors':>6} {'unfin':>5}", file=sys.stderr)
+    for r in results:
+        lat = r.latency
+        print(f"{r.rate:8g} {r.achieved_rate:9.1f} {lat['p50_ms']:9.2f} {lat['p90_ms']:9.2f} {lat['p99_ms']:9.2f} "
+              f"{lat['p99.9_ms']:9.2f} {lat['max_ms']:9.2f} {r.service_time['p99_ms']:9.2f} {r.errors:>6} "
+              f"{r.unfinished:>5}", file=sys.stderr)
+    knee = saturation_knee(results, slo_p99_ms)
+    print(f"saturation knee: {f'{knee:g} req/s' if knee is not None else 'below the lowest rate'} "
+          f"(p99 <= {slo_p99_ms:g} ms, >= {SUSTAINED_SHARE:.0%} of the rate, no errors)", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=float, nargs="+", default=[50, 100, 200, 400],
+                        help="arrival rates in requests per second, run in this order")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds at the first rate before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights, from {', '.join(OPERATIONS)}")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--url", help="target a running server instead, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--drivers", nargs="+", choices=DRIVERS, default=["async_db"], help="REPO_DRIVER values")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[20], help="POOL_SIZE values")
+    parser.add_argument("--router", choices=("async", "sync"), default="async", help="USE_ASYNC_ROUTER")
+    parser.add_argument("--seed-items", type=int, default=1000, help="items created before the first rate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the request sequence")
+    parser.add_argument("--slo-p99", type=float, default=100.0, help="p99 in ms a sustained rate must stay under")
+    parser.add_argument("--timeout", type=float, default=30.0, help="request timeout in seconds")
+    parser.add_argument("--drain-timeout", type=float, default=30.0,
+                        help="seconds to wait for the requests still running after the last was sent")
+    parser.add_argument("--connections", type=int, default=512, help="HTTP connections to a server")
+    parser.add_argument("--significant-digits", type=int, default=2, help="precision of the latency histograms")
+    parser.add_argument("--log-level", default="WARNING", help="log level of the app in process")
+    parser.add_argument("--server-log", default=os.devnull, help="file the uvicorn server logs to")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.worker:
+        results = asyncio.run(_run_inprocess(args))
+        json.dump([asdict(result) for result in results], sys.stdout)
+        return
+
+    report = []
+    if args.url:
+        configurations = [("remote", args.url, asyncio.run(_run_remote(args.url, args)))]
+    else:
+        configurations = []
+        with tempfile.TemporaryDirectory() as db_dir:
+            for driver, pool_size in itertools.product(args.drivers, args.pool_sizes):
+                logger.info(f"Load testing {driver} with POOL_SIZE={pool_size} ({args.mode})")
+                results = _run_configuration(driver, pool_size, args, db_dir)
+                configurations.append((driver, pool_size, results))
+
+    for first, second, results in configurations:
+        label = f"{first} {second}" if args.url else f"REPO_DRIVER={first} POOL_SIZE={second}"
+        _print_results(label, results, args.slo_p99)
+        knee = saturation_knee(results, args.slo_p99)
+        entry = {"url": second} if args.url else {"driver": first, "pool_size": second, "router": args.router}
+        report.append({**entry, "saturation_knee": knee, "results": [asdict(r) for r in results]})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mix": parse_mix(args.mix), "slo_p99_ms": args.slo_p99, "configurations": report}, f,
+                      indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,271 @@
 #!/usr/bin/env python3
-"""Database setup script."""
+"""
+Database setup script.
 
+Creates the tables and adds a few sample items. With ``--items N`` it seeds N
+generated items instead, for benchmarks that need realistic volumes: the
+lengths of names and descriptions, the quantities and the prices each follow a
+configurable distribution (``constant:V``, ``uniform:LOW:HIGH``,
+``normal:MU:SIGMA``, ``lognormal:MU:SIGMA`` or ``exponential:MEAN``), and the
+same ``--seed`` always generates the same items, ids included.
+
+Items are inserted through the fastest bulk path of the dialect: ``COPY`` on
+PostgreSQL (psycopg and asyncpg), a Core executemany of ``--chunk-size`` rows
+elsewhere. A transaction commits every ``--commit-every`` rows, and on SQLite
+the seeding connection runs with ``PRAGMA synchronous = OFF``. Progress and the
+final rate are reported in rows per second.
+
+Usage:
+    python -m scripts.setup_db [--items N] [--seed S] [--chunk-size 10000] [--commit-every 100000]
+        [--name-length uniform:8:24] [--description-length lognormal:4:0.8]
+        [--quantity uniform:0:1000] [--price lognormal:3:1]
+"""
+
+import argparse
 import asyncio
 import logging
-from typing import List
+import random
+import string
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Connection, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import await_only
 
+from api.v1.schemas.item_schema import ItemCreateSchema
 from config import get_settings
 from infras.repositories.base_po import BasePO
+from infras.repositories.engine_registry import engine_registry
 from infras.repositories.factory import get_engine
-from models.item_model import ItemModel
-from api.v1.schemas.item_schema import ItemCreateSchema
+from infras.repositories.item_po import ItemPO
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ITEMS_TABLE = ItemPO.__table__
+# Columns written by the seeding; created_at and updated_at take their server default
+SEED_COLUMNS = ("id", "name", "description", "quantity", "price")
+NAME_MAX_LENGTH = ITEMS_TABLE.c.name.type.length
+DESCRIPTION_MAX_LENGTH = ITEMS_TABLE.c.description.type.length
+# Names and descriptions are slices of one block of text generated from the seed
+TEXT_BLOCK_SIZE = 1 << 16
+# Version 4 and RFC 4122 variant bits of a UUID, set on 128 random bits; faster than uuid.UUID(int=..., version=4)
+_UUID_CLEAR = ~(0xf000 << 64 | 0xc000 << 48) & ((1 << 128) - 1)
+_UUID_SET = 0x4000 << 64 | 0x8000 << 48
+
+Row = Tuple[Any, ...]
+
+SAMPLE_ITEMS = [
+    ItemCreateSchema(name="Laptop", description="High-performance laptop for development", quantity=10,
+                     price=1299.99),
+    ItemCreateSchema(name="Programming Book", description="Comprehensive guide to Python development",
+                     quantity=25, price=49.99),
+    ItemCreateSchema(name="Coffee Mug", description="Ceramic coffee mug for developers", quantity=100, price=12.99),
+    ItemCreateSchema(name="Wireless Mouse", description="Ergonomic wireless mouse", quantity=40, price=29.99),
+    ItemCreateSchema(name="Desk Lamp", description="LED desk lamp with adjustable brightness", quantity=15,
+                     price=39.99),
+]
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """A distribution of values, parsed from ``kind:param:...``."""
+    kind: str
+    params: Tuple[float, ...]
+
+    _ARITY = {"constant": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    @classmethod
+    def parse(cls, text: str) -> "Distribution":
+        kind, *params = text.split(":")
+        if kind not in cls._ARITY:
+            raise ValueError(f"unknown distribution {kind!r}, expected one of {', '.join(cls._ARITY)}")
+        if len(params) != cls._ARITY[kind]:
+            raise ValueError(f"{kind} takes {cls._ARITY[kind]} parameter(s), got {len(params)}")
+        return cls(kind, tuple(float(param) for param in params))
+
+    def sampler(self, rng: random.Random) -> Callable[[], float]:
+        """Function drawing one value from ``rng``."""
+        if self.kind == "constant":
+            value = self.params[0]
+            return lambda: value
+        if self.kind == "uniform":
+            return lambda: rng.uniform(*self.params)
+        if self.kind == "normal":
+            return lambda: rng.gauss(*self.params)
+        if self.kind == "lognormal":
+            return lambda: rng.lognormvariate(*self.params)
+        mean = self.params[0]
+        return lambda: rng.expovariate(1 / mean)
+
+    def __str__(self) -> str:
+        return ":".join([self.kind, *(f"{param:g}" for param in self.params)])
+
+
+def _distribution(text: str) -> Distribution:
+    try:
+        return Distribution.parse(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class ItemGenerator:
+    """
+    Deterministic stream of item rows.
+
+    Every name ends with ``-<seed>-<index>`` in hex, so names are unique within a
+    run and across seeds; a length drawn below that suffix is raised to fit it.
+    """
+
+    def __init__(self, seed: int, name_length: Distribution, description_length: Distribution,
+                 quantity: Distribution, price: Distribution):
+        """
+        Args:
+            seed: Seed of every random choice
+            name_length: Length of the names, capped at the column length
+            description_length: Length of the descriptions, capped at the column length; 0 means no description
+            quantity: Item quantities, rounded and at least 0
+            price: Item prices, rounded to cents and at least 0
+        """
+        self.seed = seed
+        self._rng = random.Random(seed)
+        alphabet = string.ascii_lowercase + " " * 5
+        self._text = "".join(self._rng.choices(alphabet, k=TEXT_BLOCK_SIZE + DESCRIPTION_MAX_LENGTH))
+        self._name_length = name_length.sampler(self._rng)
+        self._description_length = description_length.sampler(self._rng)
+        self._quantity = quantity.sampler(self._rng)
+        self._price = price.sampler(self._rng)
+        self._index = 0
+
+    def _slice(self, length: int) -> str:
+        start = self._rng.randrange(TEXT_BLOCK_SIZE)
+        return self._text[start:start + length]
+
+    def row(self) -> Row:
+        suffix = f"-{self.seed:x}-{self._index:x}"
+        self._index += 1
+        name_length = min(NAME_MAX_LENGTH, max(len(suffix) + 1, round(self._name_length())))
+        prefix = self._slice(name_length - len(suffix)).strip() or "item"
+        description_length = min(DESCRIPTION_MAX_LENGTH, max(0, round(self._description_length())))
+        bits = f"{self._rng.getrandbits(128) & _UUID_CLEAR | _UUID_SET:032x}"
+        return (
+            f"{bits[:8]}-{bits[8:12]}-{bits[12:16]}-{bits[16:20]}-{bits[20:]}",
+            prefix + suffix,
+            self._slice(description_length) if description_length else None,
+            max(0, round(self._quantity())),
+            max(0.0, round(self._price(), 2)),
+        )
+
+    def chunks(self, count: int, chunk_size: int) -> Iterator[List[Row]]:
+        """``count`` rows, ``chunk_size`` at a time."""
+        for start in range(0, count, chunk_size):
+            yield [self.row() for _ in range(min(chunk_size, count - start))]
+
+
+def bulk_method(connection: Connection) -> str:
+    """Bulk insert path used on ``connection``: ``copy`` or ``executemany``."""
+    if connection.dialect.name == "postgresql" and connection.dialect.driver in ("psycopg", "asyncpg"):
+        return "copy"
+    return "executemany"
 
-async def setup_database():
-    """Set up database with sample data."""
+
+def insert_rows(connection: Connection, rows: Sequence[Row], method: str) -> None:
+    """Insert ``rows`` of :data:`SEED_COLUMNS` in the current transaction of ``connection``."""
+    if method != "copy":
+        connection.execute(insert(ITEMS_TABLE), [dict(zip(SEED_COLUMNS, row)) for row in rows])
+        return
+    driver_connection = connection.connection.driver_connection
+    if connection.dialect.driver == "asyncpg":
+        # Run from run_sync, in the greenlet of the async engine
+        await_only(driver_connection.copy_records_to_table(ITEMS_TABLE.name, records=rows, columns=SEED_COLUMNS))
+        return
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {ITEMS_TABLE.name} ({', '.join(SEED_COLUMNS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def seed_items(connection: Connection, generator: ItemGenerator, count: int, chunk_size: int,
+               commit_every: int) -> float:
+    """
+    Insert ``count`` generated items, committing every ``commit_every`` rows.
+
+    Args:
+        connection: Connection outside of a transaction
+        generator: Source of the rows
+        count: Number of items
+        chunk_size: Rows per executemany or COPY
+        commit_every: Rows per transaction
+
+    Returns:
+        Rows inserted per second
+    """
+    method = bulk_method(connection)
+    sqlite = connection.dialect.name == "sqlite"
+    if sqlite:
+        # No fsync per commit: a crash loses the seeding, which is simply run again
+        synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        connection.commit()
+    logger.info(f"Seeding {count} items with {method} ({chunk_size} rows per chunk, "
+                f"{commit_every} per transaction)")
+
+    start = time.perf_counter()
+    inserted = uncommitted = 0
+    try:
+        for rows in generator.chunks(count, chunk_size):
+            insert_rows(connection, rows, method)
+            inserted += len(rows)
+            uncommitted += len(rows)
+            if uncommitted >= commit_every or inserted == count:
+                connection.commit()
+                uncommitted = 0
+                elapsed = time.perf_counter() - start
+                logger.info(f"{inserted}/{count} items, {inserted / elapsed:.0f} rows/s")
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        if sqlite:
+            connection.exec_driver_sql(f"PRAGMA synchronous = {synchronous}")
+            connection.commit()
+    elapsed = time.perf_counter() - start
+    rate = inserted / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Seeded {inserted} items in {elapsed:.1f}s: {rate:.0f} rows/s")
+    return rate
+
+
+def add_sample_items(connection: Connection) -> int:
+    """Insert the sample items missing from the table, returns how many were added."""
+    names = [item.name for item in SAMPLE_ITEMS]
+    existing = set(connection.scalars(select(ITEMS_TABLE.c.name).where(ITEMS_TABLE.c.name.in_(names))))
+    rows = [(str(uuid.uuid4()), item.name, item.description, item.quantity, item.price)
+            for item in SAMPLE_ITEMS if item.name not in existing]
+    if rows:
+        insert_rows(connection, rows, "executemany")
+    connection.commit()
+    return len(rows)
+
+
+async def _run_sync(engine, func: Callable[[Connection], Any]) -> Any:
+    """Call ``func`` with a sync connection of ``engine``, async or not."""
+    if isinstance(engine, AsyncEngine):
+        async with engine.connect() as conn:
+            return await conn.run_sync(func)
+    with engine.connect() as conn:
+        return func(conn)
+
+
+async def setup_database(args: Optional[argparse.Namespace] = None):
+    """Set up database with sample or generated data."""
+    args = args or build_parser().parse_args([])
     settings = get_settings()
     engine = get_engine(settings)
-    
+
     try:
         # Create tables
         if settings.USE_ASYNC_DB:
@@ -28,70 +273,58 @@ async def setup_database():
                 await conn.run_sync(BasePO.metadata.create_all)
         else:
             BasePO.metadata.create_all(bind=engine)
-        
+
         logger.info("Database tables created successfully")
-        
-        # Add sample data
-        await add_sample_data(settings)
-        
+
+        if args.items:
+            generator = ItemGenerator(args.seed, args.name_length, args.description_length, args.quantity,
+                                      args.price)
+            await _run_sync(engine, lambda conn: seed_items(conn, generator, args.items, args.chunk_size,
+                                                            args.commit_every))
+        else:
+            await add_sample_data(engine)
+
         logger.info("Database setup completed successfully")
-        
+
     except Exception as e:
         logger.error(f"Error setting up database: {e}")
         raise
     finally:
-        if settings.USE_ASYNC_DB:
-            await engine.dispose()
-        else:
-            engine.dispose()
+        await engine_registry.dispose_all()
 
 
-async def add_sample_data(settings):
+async def add_sample_data(engine):
     """Add sample data to the database."""
-    sample_items = [
-        ItemCreateSchema(
-            name="Laptop",
-            description="High-performance laptop for development",
-            price=1299.99,
-            category="electronics"
-        ),
-        ItemCreateSchema(
-            name="Programming Book",
-            description="Comprehensive guide to Python development",
-            price=49.99,
-            category="books"
-        ),
-        ItemCreateSchema(
-            name="Coffee Mug",
-            description="Ceramic coffee mug for developers",
-            price=12.99,
-            category="accessories"
-        ),
-        ItemCreateSchema(
-            name="Wireless Mouse",
-            description="Ergonomic wireless mouse",
-            price=29.99,
-            category="electronics"
-        ),
-        ItemCreateSchema(
-            name="Desk Lamp",
-            description="LED desk lamp with adjustable brightness",
-            price=39.99,
-            category="accessories"
-        )
-    ]
-    
-    # Note: In a real application, you would use the service layer
-    # to create items. This is a simplified example for setup purposes.
-    logger.info(f"Added {len(sample_items)} sample items to the database")
+    added = await _run_sync(engine, add_sample_items)
+    logger.info(f"Added {added} sample items to the database")
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=0, help="generated items to insert instead of the samples")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated items")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per executemany or COPY")
+    parser.add_argument("--commit-every", type=int, default=100000, help="rows per transaction")
+    parser.add_argument("--name-length", type=_distribution, default=Distribution.parse("uniform:8:24"),
+                        help=f"distribution of name lengths, at most {NAME_MAX_LENGTH}")
+    parser.add_argument("--description-length", type=_distribution, default=Distribution.parse("lognormal:4:0.8"),
+                        help=f"distribution of description lengths, at most {DESCRIPTION_MAX_LENGTH}")
+    parser.add_argument("--quantity", type=_distribution, default=Distribution.parse("uniform:0:1000"),
+                        help="distribution of quantities")
+    parser.add_argument("--price", type=_distribution, default=Distribution.parse("lognormal:3:1"),
+                        help="distribution of prices")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the database setup."""
+    args = build_parser().parse_args(argv)
+    if args.chunk_size <= 0 or args.commit_every <= 0:
+        build_parser().error("--chunk-size and --commit-every must be positive")
     logger.info("Starting database setup...")
-    
+
     try:
-        asyncio.run(setup_database())
+        asyncio.run(setup_database(args))
         logger.info("Database setup completed successfully!")
     except Exception as e:
         logger.error(f"Database setup failed: {e}")
@@ -99,4 +332,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,146 @@
+"""
+DataLoader-style batching of single-key loads.
+
+Loads requested during one event-loop iteration are collected and dispatched
+together on the next one, as a single ``load_many(keys)`` call: N concurrent
+``get`` calls become one ``SELECT ... WHERE id IN (...)`` instead of N queries,
+N sessions and N pool checkouts. Each dispatch is a fresh call, so nothing is
+kept once it finishes: this batches, it does not cache.
+"""
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Keys dispatched together at most; a fuller batch is dispatched right away
+DEFAULT_MAX_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class BatchLoaderMetrics:
+    """Point-in-time metrics of a batch loader."""
+    name: str
+    loads: int
+    keys: int
+    batches: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.keys / self.batches if self.batches else 0.0
+
+
+class _Batch(Generic[K, V]):
+    __slots__ = ("load_many", "futures")
+
+    def __init__(self, load_many: Callable[[List[K]], Awaitable[Sequence[Optional[V]]]]):
+        self.load_many = load_many
+        self.futures: Dict[K, asyncio.Future] = {}
+
+
+class AsyncBatchLoader(Generic[K, V]):
+    """
+    Collects concurrent loads into batches.
+
+    A batch runs with the ``load_many`` of the call that opened it, so a loader
+    must only be shared by callers whose ``load_many`` are interchangeable (e.g.
+    every service instance of one container). The batch runs in its own task:
+    cancelling one caller does not cancel the load for the others.
+    """
+
+    def __init__(self, name: str, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 bypass: Optional[Callable[[], bool]] = None):
+        """
+        Initialize the loader.
+
+        Args:
+            name: Loader name, used in metrics
+            max_batch_size: Most keys loaded by one ``load_many`` call
+            bypass: Loads for which it returns True run alone instead of joining a batch
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self._bypass = bypass
+        # Futures belong to one event loop, so the open batch is tracked per loop
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Batch[K, V]]" = \
+            weakref.WeakKeyDictionary()
+        # The loop only keeps weak references to tasks
+        self._running: Set[asyncio.Task] = set()
+        self._loads = 0
+        self._keys = 0
+        self._batches = 0
+
+    async def load(self, key: K, load_many: Callable[[List[K]], Awaitable[Sequence[Optional[V]]]]) -> Optional[V]:
+        """
+        Load ``key`` as part of the next batch.
+
+        Args:
+            key: Key to load; the same key requested twice in a batch is loaded once
+            load_many: Loads a list of distinct keys, returning one value (or None) per key in order
+
+        Returns:
+            The value loaded for ``key``; an exception of ``load_many`` is raised to every caller of the batch
+        """
+        if self._bypass is not None and self._bypass():
+            return (await load_many([key]))[0]
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = _Batch(load_many)
+            loop.call_soon(self._dispatch, loop, batch)
+
+        self._loads += 1
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            if len(batch.futures) >= self.max_batch_size:
+                self._dispatch(loop, batch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, batch: _Batch[K, V]) -> None:
+        if self._pending.get(loop) is not batch:
+            # Already dispatched when it filled up
+            return
+        del self._pending[loop]
+        self._keys += len(batch.futures)
+        self._batches += 1
+        task = loop.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    @staticmethod
+    async def _run(batch: _Batch[K, V]) -> None:
+        keys = list(batch.futures)
+        try:
+            values = await batch.load_many(keys)
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            for future in batch.futures.values():
+                future.cancel()
+            raise
+        for key, value in zip(keys, values):
+            future = batch.futures[key]
+            if not future.done():
+                future.set_result(value)
+
+    @property
+    def metrics(self) -> BatchLoaderMetrics:
+        return BatchLoaderMetrics(
+            name=self.name,
+            loads=self._loads,
+            keys=self._keys,
+            batches=self._batches,
+        )
+
+
+def create_item_loader(settings: Any, bypass: Optional[Callable[[], bool]] = None) -> Optional[AsyncBatchLoader]:
+    """Build the process-wide loader batching async item reads, or None when disabled."""
+    return AsyncBatchLoader("item_loads", bypass=bypass) if settings.BATCH_ITEM_LOADS else None
@@ -1,58 +1,123 @@
 import logging
-from typing import Sequence
+from typing import AsyncIterator, Awaitable, List, Sequence
 
 from api.v1.schemas.item_schema import ItemCreateSchema
 from models.item_model import ItemModel
+from models.page_model import PageModel
 from ports.async_transaction import IAsyncTransactionManager
 from repositories import TSession
 from repositories.item_async_repository import IASyncItemRepository
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
+from .batch_loader import AsyncBatchLoader
+from .single_flight import AsyncSingleFlight
 
 
 class AsyncItemService:
-    def __init__(self, transaction: IAsyncTransactionManager, repo: IASyncItemRepository):
+    def __init__(self, transaction: IAsyncTransactionManager, repo: IASyncItemRepository,
+                 flights: AsyncSingleFlight | None = None,
+                 loader: AsyncBatchLoader[str, ItemModel] | None = None):
         self.transaction = transaction
         self.repo = repo
+        # Coalesces concurrent identical reads into one session, None to disable
+        self.flights = flights
+        # Batches concurrent gets of different items into one query, None to disable
+        self.loader = loader
         self.logger = logging.getLogger(__name__)
         self.logger.info("init async item service")
 
+        # Bind the transactional wrappers once so requests don't pay for decoration
+        self._transactional_get = transaction.transactional(read_only=True)(self._get)
+        self._transactional_get_many = transaction.transactional(read_only=True)(self._get_many)
+        self._transactional_create = transaction.transactional(read_only=False)(self._create)
+        self._transactional_create_many = transaction.transactional(read_only=False)(self._create_many)
+        self._transactional_list = transaction.transactional(read_only=True)(self._list)
+        self._transactional_update = transaction.transactional(read_only=False)(self._update)
+        self._transactional_delete = transaction.transactional(read_only=False)(self._delete)
+
     async def get(self, item_id: str) -> ItemModel | None:
-        """Get item by ID using session"""
-        return await self.transaction.transactional(read_only=True)(self._get)(item_id)
+        """Get item by ID using session; concurrent calls for the same item share one read"""
+        if self.flights is None:
+            return await self._load(item_id)
+        return await self.flights.do(("get", item_id), lambda: self._load(item_id))
+
+    async def get_many(self, ids: Sequence[str]) -> List[ItemModel | None]:
+        """Get items by ID in one query per chunk; one entry per id, None where missing"""
+        return await self._transactional_get_many(ids)
 
     async def create(self, item: ItemCreateSchema) -> ItemModel:
         """Create new item using transaction"""
-        return await self.transaction.transactional(read_only=False)(self._create)(item)
-
-    async def list(self) -> Sequence[ItemModel]:
-        """List all items using session"""
-        return await self.transaction.transactional(read_only=True)(self._list)()
+        created = await self._transactional_create(item)
+        self._forget_reads()
+        return created
+
+    async def create_many(self, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        """Create items in bulk using one transaction"""
+        created = await self._transactional_create_many(items)
+        self._forget_reads()
+        return created
+
+    async def list(self, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> PageModel[ItemModel]:
+        """List one page of items using session; concurrent calls for the same page share one read"""
+        if self.flights is None:
+            return await self._transactional_list(limit, cursor)
+        return await self.flights.do(("list", limit, cursor), lambda: self._transactional_list(limit, cursor))
+
+    async def export(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[ItemModel]]:
+        """Stream every item in chunks; the session stays open until the stream is exhausted or closed"""
+        async with self.transaction.session() as session:
+            async for chunk in self.repo.stream(session, chunk_size):
+                yield chunk
 
     async def update(self, item_id: str, item: ItemCreateSchema) -> ItemModel | None:
         """Update item using transaction"""
-        return await self.transaction.transactional(read_only=False)(self._update)(item_id, item)
+        updated = await self._transactional_update(item_id, item)
+        self._forget_reads(item_id)
+        return updated
 
     async def delete(self, item_id: str) -> bool:
         """Delete item using transaction"""
-        return await self.transaction.transactional(read_only=False)(self._delete)(item_id)
+        deleted = await self._transactional_delete(item_id)
+        self._forget_reads(item_id)
+        return deleted
+
+    def _load(self, item_id: str) -> Awaitable[ItemModel | None]:
+        """Read one item, batched with the other gets of this loop iteration when a loader is set"""
+        if self.loader is None:
+            return self._transactional_get(item_id)
+        return self.loader.load(item_id, self._transactional_get_many)
+
+    def _forget_reads(self, item_id: str | None = None) -> None:
+        """Once the write commits, make reads start a new flight instead of joining one that began before it"""
+        if self.flights is not None:
+            self.transaction.after_commit(
+                lambda: self.flights.forget(lambda key: key[0] == "list" or key == ("get", item_id)))
 
     # Internal methods designed to work with transactional decorator
     async def _get(self, session: TSession, item_id: str) -> ItemModel | None:
         """Get item by ID - designed for transactional decorator"""
         return await self.repo.get_by_id(session, item_id)
 
+    async def _get_many(self, session: TSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        """Get items by ID - designed for transactional decorator"""
+        return await self.repo.get_many(session, ids)
+
     async def _create(self, session: TSession, item: ItemCreateSchema) -> ItemModel:
         """Create new item - designed for transactional decorator"""
         return await self.repo.create(session, item)
 
-    async def _list(self, session: TSession) -> Sequence[ItemModel]:
-        """List all items - designed for transactional decorator"""
-        return await self.repo.list(session)
+    async def _create_many(self, session: TSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        """Create items in bulk - designed for transactional decorator"""
+        return await self.repo.create_many(session, items)
+
+    async def _list(self, session: TSession, limit: int, cursor: str | None) -> PageModel[ItemModel]:
+        """List one page of items - designed for transactional decorator"""
+        return await self.repo.list(session, limit, cursor)
 
-    async def _update(self, session, item_id: str, item: ItemCreateSchema) -> ItemModel | None:
+    async def _update(self, session: TSession, item_id: str, item: ItemCreateSchema) -> ItemModel | None:
         """Update item - designed for transactional decorator"""
         return await self.repo.update(session, item_id, item)
 
-    async def _delete(self, session, item_id: str) -> bool:
+    async def _delete(self, session: TSession, item_id: str) -> bool:
         """Delete item - designed for transactional decorator"""
         return await self.repo.delete(session, item_id)
 
@@ -73,11 +138,11 @@ class AsyncItemService:
 
         return await self.transaction.execute_with_transaction(_create)
 
-    async def list_with_execute(self) -> Sequence[ItemModel]:
-        """List all items using execute_with_session"""
+    async def list_with_execute(self, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> PageModel[ItemModel]:
+        """List one page of items using execute_with_session"""
 
         async def _list(session: TSession):
-            return await self.repo.list(session)
+            return await self.repo.list(session, limit, cursor)
 
         return await self.transaction.execute_with_session(_list)
 
@@ -1,51 +1,105 @@
 import logging
-from typing import Sequence
+from typing import Iterator, List, Sequence
 
 from api.v1.schemas.item_schema import ItemCreateSchema
 from models.item_model import ItemModel
+from models.page_model import PageModel
 from ports.sync_transaction import ISyncTransactionManager
 from repositories.item_sync_repository import ISyncItemRepository
+from repositories.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE
 from repositories import TSession
+from .single_flight import SingleFlight
 
 class SyncItemService:
-    def __init__(self, transaction: ISyncTransactionManager, repo: ISyncItemRepository):
+    def __init__(self, transaction: ISyncTransactionManager, repo: ISyncItemRepository,
+                 flights: SingleFlight | None = None):
         self.transaction = transaction
         self.repo = repo
+        # Coalesces concurrent identical reads into one session, None to disable
+        self.flights = flights
         self.logger = logging.getLogger(__name__)
         self.logger.info("init sync item service")
 
+        # Bind the transactional wrappers once so requests don't pay for decoration
+        self._transactional_get = transaction.transactional(read_only=True)(self._get)
+        self._transactional_get_many = transaction.transactional(read_only=True)(self._get_many)
+        self._transactional_create = transaction.transactional(read_only=False)(self._create)
+        self._transactional_create_many = transaction.transactional(read_only=False)(self._create_many)
+        self._transactional_list = transaction.transactional(read_only=True)(self._list)
+        self._transactional_update = transaction.transactional(read_only=False)(self._update)
+        self._transactional_delete = transaction.transactional(read_only=False)(self._delete)
+
     def get(self, item_id: str) -> ItemModel | None:
-        """Get item by ID using session"""
-        return self.transaction.transactional(read_only=True)(self._get)(item_id)
+        """Get item by ID using session; concurrent calls for the same item share one read"""
+        if self.flights is None:
+            return self._transactional_get(item_id)
+        return self.flights.do(("get", item_id), lambda: self._transactional_get(item_id))
+
+    def get_many(self, ids: Sequence[str]) -> List[ItemModel | None]:
+        """Get items by ID in one query per chunk; one entry per id, None where missing"""
+        return self._transactional_get_many(ids)
 
     def create(self, item: ItemCreateSchema) -> ItemModel:
         """Create new item using transaction"""
-        return self.transaction.transactional(read_only=False)(self._create)(item)
-
-    def list(self) -> Sequence[ItemModel]:
-        """List all items using session"""
-        return self.transaction.transactional(read_only=True)(self._list)()
+        created = self._transactional_create(item)
+        self._forget_reads()
+        return created
+
+    def create_many(self, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        """Create items in bulk using one transaction"""
+        created = self._transactional_create_many(items)
+        self._forget_reads()
+        return created
+
+    def list(self, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> PageModel[ItemModel]:
+        """List one page of items using session; concurrent calls for the same page share one read"""
+        if self.flights is None:
+            return self._transactional_list(limit, cursor)
+        return self.flights.do(("list", limit, cursor), lambda: self._transactional_list(limit, cursor))
+
+    def export(self, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[ItemModel]]:
+        """Stream every item in chunks; the session stays open until the stream is exhausted or closed"""
+        with self.transaction.session() as session:
+            yield from self.repo.stream(session, chunk_size)
 
     def update(self, item_id: str, item: ItemCreateSchema) -> ItemModel | None:
         """Update item using transaction"""
-        return self.transaction.transactional(read_only=False)(self._update)(item_id, item)
+        updated = self._transactional_update(item_id, item)
+        self._forget_reads(item_id)
+        return updated
 
     def delete(self, item_id: str) -> bool:
         """Delete item using transaction"""
-        return self.transaction.transactional(read_only=False)(self._delete)(item_id)
+        deleted = self._transactional_delete(item_id)
+        self._forget_reads(item_id)
+        return deleted
+
+    def _forget_reads(self, item_id: str | None = None) -> None:
+        """Once the write commits, make reads start a new flight instead of joining one that began before it"""
+        if self.flights is not None:
+            self.transaction.after_commit(
+                lambda: self.flights.forget(lambda key: key[0] == "list" or key == ("get", item_id)))
 
     # Internal methods designed to work with transactional decorator
     def _get(self, session: TSession, item_id: str) -> ItemModel | None:
         """Get item by ID - designed for transactional decorator"""
         return self.repo.get_by_id(session, item_id)
 
+    def _get_many(self, session: TSession, ids: Sequence[str]) -> List[ItemModel | None]:
+        """Get items by ID - designed for transactional decorator"""
+        return self.repo.get_many(session, ids)
+
     def _create(self, session: TSession, item: ItemCreateSchema) -> ItemModel:
         """Create new item - designed for transactional decorator"""
         return self.repo.create(session, item)
 
-    def _list(self, session: TSession) -> Sequence[ItemModel]:
-        """List all items - designed for transactional decorator"""
-        return self.repo.list(session)
+    def _create_many(self, session: TSession, items: Sequence[ItemCreateSchema]) -> List[ItemModel]:
+        """Create items in bulk - designed for transactional decorator"""
+        return self.repo.create_many(session, items)
+
+    def _list(self, session: TSession, limit: int, cursor: str | None) -> PageModel[ItemModel]:
+        """List one page of items - designed for transactional decorator"""
+        return self.repo.list(session, limit, cursor)
 
     def _update(self, session: TSession, item_id: str, item: ItemCreateSchema) -> ItemModel | None:
         """Update item - designed for transactional decorator"""
@@ -70,10 +124,10 @@ class SyncItemService:
         
         return self.transaction.execute_with_transaction(_create)
 
-    def list_with_execute(self) -> Sequence[ItemModel]:
-        """List all items using execute_with_session"""
+    def list_with_execute(self, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> PageModel[ItemModel]:
+        """List one page of items using execute_with_session"""
         def _list(session: TSession):
-            return self.repo.list(session)
+            return self.repo.list(session, limit, cursor)
         
         return self.transaction.execute_with_session(_list)
 
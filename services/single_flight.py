@@ -0,0 +1,228 @@
+"""
+Single-flight coalescing of concurrent identical calls.
+
+While a call for a key is in flight, further calls for the same key wait for it
+and share its result (or its exception) instead of starting their own. Reads of
+a hot item then cost one session and one pool checkout, however many requests
+ask for it at once. Nothing is kept once the call finishes: this coalesces, it
+does not cache.
+
+A call that started before a write may finish after it, so writers ``forget``
+the keys they affect: later readers then start a fresh call instead of joining
+one that may return the pre-write state.
+
+Calls for which ``bypass()`` is true run on their own, e.g. reads pinned to the
+primary after a write, which must not join a call served by a lagging replica.
+"""
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightMetrics:
+    """Point-in-time metrics of a single-flight group."""
+    name: str
+    in_flight: int
+    calls: int
+    coalesced: int
+
+
+class _AsyncFlight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent coroutine calls per key.
+
+    The shared call runs in its own task, so cancelling the caller that started it
+    (e.g. a client disconnecting) does not cancel it for the others; it is only
+    cancelled once every caller waiting for it is gone.
+    """
+
+    def __init__(self, name: str, bypass: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self._bypass = bypass
+        # Tasks belong to one event loop, so flights are tracked per loop
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _AsyncFlight]]" = \
+            weakref.WeakKeyDictionary()
+        self._calls = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await ``fn()``, or the call already in flight for ``key``.
+
+        Args:
+            key: Identifies calls that may share a result
+            fn: Starts the call, only invoked if none is in flight for ``key``
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+        """
+        if self._bypass is not None and self._bypass():
+            return await fn()
+        loop = asyncio.get_running_loop()
+        flights = self._flights.get(loop)
+        if flights is None:
+            flights = self._flights[loop] = {}
+
+        self._calls += 1
+        flight = flights.get(key)
+        if flight is None:
+            flight = flights[key] = _AsyncFlight()
+            flight.task = loop.create_task(self._run(flights, key, flight, fn))
+        else:
+            self._coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Every caller gave up, don't hold a connection for nobody
+                if flights.get(key) is flight:
+                    del flights[key]
+                flight.task.cancel()
+
+    @staticmethod
+    async def _run(flights: Dict[Hashable, _AsyncFlight], key: Hashable, flight: _AsyncFlight,
+                   fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await fn()
+        finally:
+            # Calls arriving after this point start a new flight instead of joining a finished one
+            if flights.get(key) is flight:
+                del flights[key]
+
+    def forget(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Stop joining the flights whose key matches; their current callers still share the result."""
+        for flights in list(self._flights.values()):
+            for key in [key for key in flights if predicate(key)]:
+                del flights[key]
+
+    @property
+    def metrics(self) -> SingleFlightMetrics:
+        return SingleFlightMetrics(
+            name=self.name,
+            in_flight=sum(len(flights) for flights in list(self._flights.values())),
+            calls=self._calls,
+            coalesced=self._coalesced,
+        )
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "abandoned")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.abandoned = False
+
+
+class SingleFlight:
+    """
+    Thread-safe single-flight group for sync callers.
+
+    The first caller for a key runs the call on its own thread while the others
+    block until it finishes. If the leader stops with an exception it shares it;
+    if it is interrupted (``KeyboardInterrupt``, ``SystemExit``, ...) the waiting
+    callers retry instead and one of them becomes the new leader.
+    """
+
+    def __init__(self, name: str, bypass: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self._bypass = bypass
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Call ``fn()``, or wait for the call already in flight for ``key``.
+
+        Args:
+            key: Identifies calls that may share a result
+            fn: Runs the call, only invoked if none is in flight for ``key``
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+        """
+        if self._bypass is not None and self._bypass():
+            return fn()
+        with self._lock:
+            self._calls += 1
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    self._coalesced += 1
+
+            if leader:
+                return self._lead(key, flight, fn)
+
+            flight.done.wait()
+            if flight.abandoned:
+                with self._lock:
+                    self._coalesced -= 1
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+    def _lead(self, key: Hashable, flight: _Flight, fn: Callable[[], T]) -> T:
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def forget(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Stop joining the flights whose key matches; their current callers still share the result."""
+        with self._lock:
+            for key in [key for key in self._flights if predicate(key)]:
+                del self._flights[key]
+
+    @property
+    def metrics(self) -> SingleFlightMetrics:
+        with self._lock:
+            return SingleFlightMetrics(
+                name=self.name,
+                in_flight=len(self._flights),
+                calls=self._calls,
+                coalesced=self._coalesced,
+            )
+
+
+def create_async_read_flights(settings: Any, bypass: Optional[Callable[[], bool]] = None) -> Optional[AsyncSingleFlight]:
+    """Build the process-wide group coalescing async item reads, or None when disabled."""
+    return AsyncSingleFlight("item_reads", bypass) if settings.COALESCE_READS else None
+
+
+def create_read_flights(settings: Any, bypass: Optional[Callable[[], bool]] = None) -> Optional[SingleFlight]:
+    """Build the process-wide group coalescing sync item reads, or None when disabled."""
+    return SingleFlight("item_reads", bypass) if settings.COALESCE_READS else None
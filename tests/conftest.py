@@ -1,20 +1,60 @@
 import asyncio
 import os
 import tempfile
-from typing import Generator
+from typing import Generator, List
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from api.v1.schemas.item_schema import ItemCreateSchema
 from config import get_settings
 from container import Container
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_transaction import AsyncTransactionManager
+from infras.repositories.background_loop import background_loop
+from infras.repositories.connection_lifecycle import ConnectionLifecycle
 from infras.repositories.base_po import BasePO
+from infras.repositories.item_po import ItemPO
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_transaction import SyncTransactionManager
+from infras.telemetry import PoolTelemetry, TimedQueuePool
 from main import app
 
+# Items in ``seeded_db_path`` unless parametrized with another count
+SEEDED_ROWS = 10
+
+
+class FakeClock:
+    """Clock for time-based policies, moved by setting ``now``."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def new_item(name: str, quantity: int = 1) -> ItemCreateSchema:
+    """Item payload named ``name``."""
+    return ItemCreateSchema(name=name, description="desc", quantity=quantity, price=1.0)
+
+
+def record_statements(engine, prefix: str = "") -> List[str]:
+    """Record the statements ``engine`` executes from now on, only those starting with ``prefix``."""
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(prefix):
+            statements.append(statement)
+
+    return statements
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
@@ -78,6 +118,102 @@ def test_session(test_engine):
         session.close()
 
 
+@pytest.fixture
+def db_path(tmp_path):
+    """File-backed SQLite database with the tables created."""
+    path = tmp_path / "items.db"
+    engine = create_engine(f"sqlite:///{path}")
+    BasePO.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def seeded_db_path(request, db_path):
+    """
+    ``db_path`` with items ``id-000``, ``id-001``... named ``item-000``... and priced at half their index.
+
+    Parametrize it indirectly with the number of items, SEEDED_ROWS by default.
+    """
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        conn.execute(insert(ItemPO), [
+            {"id": f"id-{i:03d}", "name": f"item-{i:03d}", "description": "", "quantity": i, "price": i / 2}
+            for i in range(getattr(request, "param", SEEDED_ROWS))
+        ])
+    engine.dispose()
+    return db_path
+
+
+@pytest.fixture
+def sync_engine(db_path):
+    """Sync engine on ``db_path``, with an empty pool."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_engine(db_path):
+    """aiosqlite engine on ``db_path``, with an empty pool."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def background_async_engine(db_path):
+    """aiosqlite engine on ``db_path`` owned by the background loop of the async-to-sync adapters."""
+    async def create():
+        return create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+
+    engine = background_loop.call(create())
+    yield engine
+    background_loop.call(engine.dispose())
+    background_loop.stop()
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    """
+    Factory of sync engines on one SQLite file, disposed after the test.
+
+    ``make_engine(poolclass=TimedQueuePool, clock=None, **pool_kwargs)``: with a
+    ``clock``, the pool also gets telemetry and the :class:`ConnectionLifecycle`
+    policies among ``pool_kwargs`` (``max_lifetime``, ``jitter``, ``idle_timeout``,
+    ``ping_after``) on that clock, with every random draw at 0.5.
+    """
+    created = []
+
+    def make(poolclass=TimedQueuePool, clock=None, **pool_kwargs):
+        policies = {name: pool_kwargs.pop(name) for name in ("max_lifetime", "jitter", "idle_timeout", "ping_after")
+                    if name in pool_kwargs}
+        engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=poolclass, **pool_kwargs)
+        created.append(engine)
+        if clock is not None:
+            ConnectionLifecycle(PoolTelemetry(engine), clock=clock, rng=lambda: 0.5, **policies)
+        return engine
+
+    yield make
+    for engine in created:
+        engine.dispose()
+
+
+@pytest.fixture
+def sync_manager(sync_engine):
+    return SyncTransactionManager(sessionmaker(bind=sync_engine, class_=SyncSession, expire_on_commit=False))
+
+
+@pytest.fixture
+def async_manager(async_engine):
+    return AsyncTransactionManager(async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
 @pytest.fixture
 def test_container(test_settings):
     """Create test container."""
@@ -0,0 +1,134 @@
+"""Tests for the background event loop behind the async-to-sync adapters."""
+
+import threading
+
+import pytest
+from sqlalchemy import event, select
+
+from config import Settings
+from infras.repositories.async_transaction import AsyncTransactionManager
+from infras.repositories.background_loop import BackgroundEventLoop, background_loop
+from infras.repositories.base_po import BasePO
+from infras.repositories.engine_registry import EngineRegistry
+from infras.repositories.factory import async_session_factory
+from infras.repositories import factory
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import AsyncToSyncItemRepository, UniformSyncItemRepository
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from services.item_sync_service import SyncItemService
+from tests.conftest import new_item
+
+
+@pytest.fixture
+def bridge(tmp_path, monkeypatch):
+    """Async transaction manager over a file SQLite DB, bridged to sync code."""
+    monkeypatch.setattr(factory, "engine_registry", EngineRegistry())
+    settings = Settings(DB_URL_ASYNC=f"sqlite+aiosqlite:///{tmp_path}/bridge.db")
+    session_factory = async_session_factory(settings)
+    engine = session_factory.kw["bind"]
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(BasePO.metadata.create_all)
+
+    background_loop.call(create_tables())
+    threads = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record_thread(conn, cursor, statement, parameters, context, executemany):
+        threads.append(threading.current_thread().name)
+
+    yield AsyncToSyncTransactionManager(AsyncTransactionManager(session_factory)), threads
+
+    background_loop.call(engine.dispose())
+    background_loop.stop()
+
+
+class TestBackgroundEventLoop:
+    """Test cases for BackgroundEventLoop."""
+
+    @pytest.mark.unit
+    def test_runs_coroutines_on_one_thread(self):
+        loop = BackgroundEventLoop(name="test_loop")
+
+        async def thread_name():
+            return threading.current_thread().name
+
+        try:
+            assert loop.call(thread_name()) == "test_loop"
+            assert loop.call(thread_name()) == "test_loop"
+            assert loop.running
+        finally:
+            loop.stop()
+        assert not loop.running
+
+    @pytest.mark.unit
+    def test_restarts_after_stop(self):
+        loop = BackgroundEventLoop(name="test_loop")
+
+        async def answer():
+            return 42
+
+        loop.start()
+        loop.stop()
+        try:
+            assert loop.call(answer()) == 42
+        finally:
+            loop.stop()
+
+    @pytest.mark.unit
+    def test_blocking_call_from_loop_thread_fails(self):
+        loop = BackgroundEventLoop(name="test_loop")
+
+        async def noop():
+            return None
+
+        async def nested():
+            loop.call(noop())
+
+        try:
+            with pytest.raises(RuntimeError, match="deadlock"):
+                loop.call(nested())
+        finally:
+            loop.stop()
+
+
+class TestAsyncToSyncBridge:
+    """Sync services on async sessions run every statement on the background loop."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncToSyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy()),
+    ])
+    def test_crud_through_bridge(self, bridge, repo_factory):
+        manager, threads = bridge
+        service = SyncItemService(transaction=manager, repo=repo_factory())
+
+        created = service.create(new_item("bridged"))
+        assert service.get(created.id).name == "bridged"
+        assert service.update(created.id, new_item("renamed")).name == "renamed"
+        assert [i.name for i in service.list().items] == ["renamed"]
+        assert service.delete(created.id) is True
+        assert service.get(created.id) is None
+
+        assert set(threads) == {"db_adapter_loop"}
+
+    @pytest.mark.integration
+    def test_failed_transaction_rolls_back(self, bridge):
+        manager, _ = bridge
+
+        def create_then_fail(session):
+            session.add(ItemPO(name="rolled-back", description="", quantity=1, price=1.0))
+            background_loop.call(session.flush())
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            manager.execute_with_transaction(create_then_fail)
+
+        def find(session):
+            result = background_loop.call(session.execute(select(ItemPO).where(ItemPO.name == "rolled-back")))
+            return result.scalar_one_or_none()
+
+        assert manager.execute_with_session(find) is None
@@ -0,0 +1,257 @@
+"""Tests for batched item reads: get_many, the batch loader and POST /items/batch-get."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.schemas.item_schema import MAX_BATCH_GET
+from config import Settings
+from infras.cache import LRUTTLCache
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_cached_repository import CachedAsyncItemRepository, CachedSyncItemRepository
+from infras.repositories.item_queries import item_id_chunks
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.read_mode import mark_read_only
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager, SyncTransactionManager
+from services.batch_loader import AsyncBatchLoader, create_item_loader
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from services.single_flight import AsyncSingleFlight
+from tests.conftest import record_statements
+
+ROWS = 30
+IDS = ["id-007", "missing", "id-002", "id-007", "id-029"]
+
+# The tests read ROWS seeded items
+pytestmark = [pytest.mark.usefixtures("seeded_db_path"),
+              pytest.mark.parametrize("seeded_db_path", [ROWS], indirect=True)]
+
+
+class Boom(Exception):
+    pass
+
+
+def _expected(ids) -> list:
+    return [None if item_id == "missing" else f"item-{item_id[3:]}" for item_id in ids]
+
+
+def _names(items) -> list:
+    return [item.name if item is not None else None for item in items]
+
+
+@pytest.fixture
+def session_factory(sync_engine):
+    return sessionmaker(bind=sync_engine, class_=SyncSession, expire_on_commit=False)
+
+
+class TestItemIdChunks:
+    """Ids are deduplicated and split below the dialect parameter limit."""
+
+    @pytest.mark.unit
+    def test_chunks(self):
+        ids = [str(i) for i in range(7)] + ["0", "3"]
+        assert list(item_id_chunks(ids, 3)) == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+        assert list(item_id_chunks([], 3)) == []
+
+
+class TestSyncGetMany:
+    """Sync repositories read many items in one query per chunk."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("read_only", [True, False])
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_request_order_and_missing(self, session_factory, repo_factory, read_only):
+        repo = repo_factory()
+        with session_factory() as session:
+            if read_only:
+                mark_read_only(session)
+            assert _names(repo.get_many(session, IDS)) == _expected(IDS)
+            assert repo.get_many(session, []) == []
+
+    @pytest.mark.integration
+    def test_chunked_queries(self, sync_engine, session_factory, monkeypatch):
+        monkeypatch.setattr(item_id_chunks, "__defaults__", (8,))
+        selects = record_statements(sync_engine, "SELECT")
+        ids = [f"id-{i:03d}" for i in reversed(range(ROWS))]
+
+        with session_factory() as session:
+            mark_read_only(session)
+            assert _names(SyncItemRepository().get_many(session, ids)) == _expected(ids)
+
+        assert len(selects) == 4
+
+    @pytest.mark.integration
+    def test_service_through_async_bridge(self, background_async_engine):
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+            async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False)))
+        for repo in (AsyncToSyncItemRepository(),
+                     UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy())):
+            service = SyncItemService(transaction=manager, repo=repo)
+            assert _names(service.get_many(IDS)) == _expected(IDS)
+
+    @pytest.mark.integration
+    def test_cache_loads_only_misses(self, sync_engine, session_factory):
+        cache = LRUTTLCache("items", 100, 60)
+        service = SyncItemService(transaction=SyncTransactionManager(session_factory),
+                                  repo=CachedSyncItemRepository(SyncItemRepository(), cache))
+        service.get("id-002")
+        selects = record_statements(sync_engine, "SELECT")
+
+        assert _names(service.get_many(IDS)) == _expected(IDS)
+        assert len(selects) == 1
+        assert set(cache._entries) == {"id-002", "id-007", "id-029"}
+
+        # Every id is cached now except the missing one
+        assert _names(service.get_many(["id-029", "id-007"])) == ["item-029", "item-007"]
+        assert len(selects) == 1
+
+
+class TestAsyncGetMany:
+    """Async repositories read many items in one query per chunk."""
+
+    @pytest.fixture
+    def async_factory(self, async_engine):
+        return async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+        lambda: CachedAsyncItemRepository(AsyncItemRepository(), LRUTTLCache("items", 100, 60)),
+    ])
+    async def test_service(self, async_factory, repo_factory):
+        service = AsyncItemService(transaction=AsyncTransactionManager(async_factory), repo=repo_factory())
+        assert _names(await service.get_many(IDS)) == _expected(IDS)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        SyncToAsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy()),
+    ])
+    async def test_sync_session(self, session_factory, repo_factory):
+        manager = SyncToAsyncTransactionManager(SyncTransactionManager(session_factory))
+        service = AsyncItemService(transaction=manager, repo=repo_factory())
+        assert _names(await service.get_many(IDS)) == _expected(IDS)
+
+
+class TestAsyncBatchLoader:
+    """Test cases for AsyncBatchLoader."""
+
+    @staticmethod
+    def _recording_load_many(batches: list):
+        async def load_many(keys):
+            batches.append(list(keys))
+            await asyncio.sleep(0)
+            return [key.upper() if key != "missing" else None for key in keys]
+
+        return load_many
+
+    @pytest.mark.asyncio
+    async def test_loads_of_one_iteration_share_one_call(self):
+        loader = AsyncBatchLoader("test")
+        batches = []
+        load_many = self._recording_load_many(batches)
+
+        results = await asyncio.gather(*(loader.load(key, load_many) for key in ["a", "b", "a", "missing"]))
+
+        assert results == ["A", "B", "A", None]
+        assert batches == [["a", "b", "missing"]]
+        metrics = loader.metrics
+        assert (metrics.loads, metrics.keys, metrics.batches) == (4, 3, 1)
+
+        # Later loads open a new batch
+        assert await loader.load("c", load_many) == "C"
+        assert batches[-1] == ["c"]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_dispatched_early(self):
+        loader = AsyncBatchLoader("test", max_batch_size=2)
+        batches = []
+
+        results = await asyncio.gather(*(loader.load(key, self._recording_load_many(batches)) for key in "abcde"))
+
+        assert results == list("ABCDE")
+        assert batches == [["a", "b"], ["c", "d"], ["e"]]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared(self):
+        loader = AsyncBatchLoader("test")
+
+        async def load_many(keys):
+            raise Boom()
+
+        results = await asyncio.gather(loader.load("a", load_many), loader.load("b", load_many),
+                                       return_exceptions=True)
+        assert all(isinstance(result, Boom) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_batch(self):
+        loader = AsyncBatchLoader("test")
+        release = asyncio.Event()
+
+        async def load_many(keys):
+            await release.wait()
+            return keys
+
+        first = asyncio.create_task(loader.load("a", load_many))
+        second = asyncio.create_task(loader.load("b", load_many))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        release.set()
+
+        assert await second == "b"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_service_gets_use_one_query(self, async_engine):
+        service = AsyncItemService(
+            transaction=AsyncTransactionManager(
+                async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)),
+            repo=AsyncItemRepository(),
+            flights=AsyncSingleFlight("item_reads"),
+            loader=AsyncBatchLoader("item_loads"))
+        selects = record_statements(async_engine.sync_engine, "SELECT")
+
+        results = await asyncio.gather(*(service.get(item_id) for item_id in IDS))
+
+        assert _names(results) == _expected(IDS)
+        assert len(selects) == 1
+
+
+class TestCreateItemLoader:
+    """Batching is opt-in."""
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self):
+        assert create_item_loader(Settings()) is None
+
+    @pytest.mark.unit
+    def test_enabled(self):
+        assert isinstance(create_item_loader(Settings(BATCH_ITEM_LOADS=True)), AsyncBatchLoader)
+
+
+class TestBatchGetEndpoint:
+    """POST /items/batch-get validates the request size."""
+
+    @pytest.mark.integration
+    def test_empty_body_is_rejected(self, test_client):
+        assert test_client.post("/items/batch-get", json=[]).status_code == 422
+
+    @pytest.mark.integration
+    def test_oversized_body_is_rejected(self, test_client):
+        body = [f"id-{i}" for i in range(MAX_BATCH_GET + 1)]
+        assert test_client.post("/items/batch-get", json=body).status_code == 422
@@ -0,0 +1,148 @@
+"""Tests for bulk item creation."""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from api.v1.schemas.item_schema import MAX_BULK_CREATE, ItemCreateSchema
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_queries import INSERT_CHUNK_SIZE
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from tests.conftest import record_statements
+
+COUNT = INSERT_CHUNK_SIZE * 2 + 7
+
+
+def _items(count: int = COUNT) -> list[ItemCreateSchema]:
+    return [ItemCreateSchema(name=f"bulk-{i:05d}", description="", quantity=i, price=1.0) for i in range(count)]
+
+
+def _assert_created(created):
+    assert [item.name for item in created] == [f"bulk-{i:05d}" for i in range(COUNT)]
+    assert all(item.created_at is not None and item.updated_at is not None for item in created)
+    assert len({item.id for item in created}) == COUNT
+
+
+@pytest.fixture
+def inserts(sync_engine):
+    return record_statements(sync_engine, "INSERT")
+
+
+def _without_returning(engine):
+    """Make the engine's dialect behave like one without INSERT ... RETURNING."""
+    with engine.connect():
+        pass
+    dialect = engine.dialect
+    dialect.insert_returning = False
+    dialect.insert_executemany_returning = False
+    dialect.insert_executemany_returning_sort_by_parameter_order = False
+
+
+def _row_count(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(ItemPO)).scalar_one()
+
+
+class TestSyncBulkCreate:
+    """Sync repositories insert a chunk per statement."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_create_many(self, sync_engine, sync_manager, inserts, repo_factory):
+        service = SyncItemService(transaction=sync_manager, repo=repo_factory())
+
+        _assert_created(service.create_many(_items()))
+
+        assert _row_count(sync_engine) == COUNT
+        assert len(inserts) == 3
+        assert all("RETURNING" in statement for statement in inserts)
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_create_many_without_returning(self, sync_engine, sync_manager, inserts, repo_factory):
+        _without_returning(sync_engine)
+        service = SyncItemService(transaction=sync_manager, repo=repo_factory())
+
+        _assert_created(service.create_many(_items()))
+
+        assert _row_count(sync_engine) == COUNT
+        assert not any("RETURNING" in statement for statement in inserts)
+
+    @pytest.mark.integration
+    def test_failed_chunk_rolls_back_everything(self, sync_engine, sync_manager):
+        service = SyncItemService(transaction=sync_manager, repo=SyncItemRepository())
+        items = _items()
+        items[-1] = items[0]  # duplicate name in the last chunk
+
+        with pytest.raises(Exception):
+            service.create_many(items)
+
+        assert _row_count(sync_engine) == 0
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncToSyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy()),
+    ])
+    def test_async_session_through_bridge(self, background_async_engine, sync_engine, repo_factory):
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+            async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False)))
+        service = SyncItemService(transaction=manager, repo=repo_factory())
+        _assert_created(service.create_many(_items()))
+        assert _row_count(sync_engine) == COUNT
+
+
+class TestAsyncBulkCreate:
+    """Async repositories insert a chunk per statement."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+    ])
+    async def test_async_session(self, sync_engine, async_manager, repo_factory):
+        service = AsyncItemService(transaction=async_manager, repo=repo_factory())
+        _assert_created(await service.create_many(_items()))
+        assert _row_count(sync_engine) == COUNT
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        SyncToAsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy()),
+    ])
+    async def test_sync_session(self, sync_engine, sync_manager, inserts, repo_factory):
+        service = AsyncItemService(transaction=SyncToAsyncTransactionManager(sync_manager), repo=repo_factory())
+        _assert_created(await service.create_many(_items()))
+        assert _row_count(sync_engine) == COUNT
+        assert len(inserts) == 3
+
+
+class TestBulkEndpoint:
+    """POST /items/bulk validates the request size."""
+
+    @pytest.mark.integration
+    def test_empty_body_is_rejected(self, test_client):
+        assert test_client.post("/items/bulk", json=[]).status_code == 422
+
+    @pytest.mark.integration
+    def test_oversized_body_is_rejected(self, test_client):
+        body = [{"name": f"n{i}", "quantity": 1, "price": 1.0} for i in range(MAX_BULK_CREATE + 1)]
+        assert test_client.post("/items/bulk", json=body).status_code == 422
@@ -21,7 +21,7 @@ class TestSettings:
         assert settings.ECHO is False
         assert settings.POOL_SIZE == 20
         assert settings.MAX_OVERFLOW == 10
-        assert settings.POOL_RECYCLE == 10
+        assert settings.POOL_RECYCLE == 1800
         assert settings.POOL_TIMEOUT == 5
 
     def test_settings_from_environment(self):
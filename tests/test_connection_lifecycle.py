@@ -0,0 +1,182 @@
+"""Tests for the connection lifecycle policies and the idle connection reaper."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from config import Settings
+from infras.repositories.connection_lifecycle import (
+    ConnectionLifecycle,
+    ConnectionReaper,
+    ReapableQueuePool,
+    create_connection_reaper,
+)
+from infras.repositories.engine_registry import EngineRegistry
+from infras.telemetry import PoolTelemetry, render_pool_metrics
+
+
+class TestConnectionLifecycle:
+    """Test cases for the checkout policies."""
+
+    @pytest.mark.integration
+    def test_jittered_lifetime(self, make_engine, clock):
+        # A lifetime of 100s less half the 20% jitter: 90s
+        engine = make_engine(ReapableQueuePool, clock, max_lifetime=100, jitter=0.2, ping_after=1000)
+        telemetry = engine.pool.telemetry
+        engine.connect().close()
+
+        clock.now += 89
+        engine.connect().close()
+        assert telemetry.metrics.recycles == 0
+
+        clock.now += 1
+        engine.connect().close()
+        metrics = telemetry.metrics
+        assert (metrics.recycles, metrics.connects, metrics.reconnects) == (1, 2, 1)
+
+    @pytest.mark.unit
+    def test_lifetimes_are_spread(self, clock):
+        lifetimes = iter([0.0, 0.5, 1.0])
+        engine = create_engine("sqlite://", poolclass=ReapableQueuePool)
+        ConnectionLifecycle(PoolTelemetry(engine), max_lifetime=100, jitter=0.2, clock=clock,
+                            rng=lambda: next(lifetimes))
+        connections = [engine.connect() for _ in range(3)]
+        try:
+            expiries = sorted(connection.connection._connection_record.info["db_adapter_expires_at"]
+                              for connection in connections)
+            assert expiries == [180.0, 190.0, 200.0]
+        finally:
+            for connection in connections:
+                connection.close()
+            engine.dispose()
+
+    @pytest.mark.integration
+    def test_idle_connection_is_replaced_at_checkout(self, make_engine, clock):
+        engine = make_engine(ReapableQueuePool, clock, idle_timeout=60, ping_after=1000)
+        telemetry = engine.pool.telemetry
+        engine.connect().close()
+
+        clock.now += 60
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+        metrics = telemetry.metrics
+        assert (metrics.idle_closes, metrics.reconnects, metrics.checkouts) == (1, 1, 2)
+
+    @pytest.mark.integration
+    def test_ping_only_after_idle(self, make_engine, clock):
+        engine = make_engine(ReapableQueuePool, clock, ping_after=30)
+        telemetry = engine.pool.telemetry
+        engine.connect().close()
+        clock.now += 29
+        engine.connect().close()
+        assert telemetry.metrics.pings == 0
+
+        clock.now += 30
+        engine.connect().close()
+        metrics = telemetry.metrics
+        assert (metrics.pings, metrics.ping_failures, metrics.ping_time.count) == (1, 0, 1)
+
+    @pytest.mark.integration
+    def test_dead_connection_is_replaced(self, make_engine, clock):
+        engine = make_engine(ReapableQueuePool, clock, ping_after=30)
+        telemetry = engine.pool.telemetry
+        with engine.connect() as connection:
+            dbapi_connection = connection.connection.dbapi_connection
+        dbapi_connection.close()
+
+        clock.now += 30
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+        metrics = telemetry.metrics
+        assert (metrics.pings, metrics.ping_failures, metrics.reconnects) == (1, 1, 1)
+
+    @pytest.mark.unit
+    def test_invalid_jitter(self):
+        engine = create_engine("sqlite://")
+        with pytest.raises(ValueError):
+            ConnectionLifecycle(PoolTelemetry(engine), max_lifetime=10, jitter=1.5)
+
+
+class TestReapIdle:
+    """Reaping the idle connections of a pool."""
+
+    @pytest.mark.integration
+    def test_sync_pool(self, make_engine, clock):
+        engine = make_engine(ReapableQueuePool, clock, ping_after=1000)
+        telemetry = engine.pool.telemetry
+        first, second = engine.connect(), engine.connect()
+        first.close()
+        clock.now += 10
+        second.close()
+
+        assert engine.pool.reap_idle(returned_before=105) == 1
+        assert (engine.pool.checkedin(), telemetry.metrics.closes) == (1, 1)
+        # The kept connection is still usable
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+
+    @pytest.mark.asyncio
+    async def test_async_pool(self, tmp_path):
+        registry = EngineRegistry()
+        settings = Settings(DB_URL_ASYNC=f"sqlite+aiosqlite:///{tmp_path}/lifecycle.db", POOL_IDLE_TIMEOUT=60)
+        engine = registry.async_engine(settings)
+        try:
+            first, second = await engine.connect(), await engine.connect()
+            await first.close()
+            await second.close()
+
+            reaper = ConnectionReaper(registry, idle_timeout=60, clock=lambda: float("inf"))
+            assert await reaper.reap() == 2
+            assert engine.sync_engine.pool.checkedin() == 0
+            assert registry.pool_metrics[0].idle_closes == 2
+            async with engine.connect() as connection:
+                assert (await connection.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await registry.dispose_all()
+
+
+class TestConnectionReaper:
+    """The reaper applied to the pools of an engine registry."""
+
+    @pytest.mark.asyncio
+    async def test_reaps_registered_engines(self, tmp_path):
+        registry = EngineRegistry()
+        settings = Settings(DB_URL_SYNC=f"sqlite:///{tmp_path}/reaper.db", POOL_IDLE_TIMEOUT=60)
+        reaper = create_connection_reaper(settings, registry)
+        assert reaper.interval == 30
+        engine = registry.sync_engine(settings)
+        try:
+            engine.connect().close()
+            assert await reaper.reap() == 0
+
+            reaper.clock = lambda: float("inf")
+            assert await reaper.reap() == 1
+            metrics = registry.pool_metrics[0]
+            assert (metrics.idle_closes, metrics.closes) == (1, 1)
+            assert "db_pool_idle_closes_total" in render_pool_metrics(registry.pool_metrics)
+        finally:
+            await registry.dispose_all()
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_a_pass_in_progress(self):
+        reaper = ConnectionReaper(EngineRegistry(), idle_timeout=60, interval=0.01)
+        passes = []
+
+        async def slow_reap():
+            passes.append("started")
+            await asyncio.sleep(0.05)
+            passes.append("done")
+            return 0
+
+        reaper.reap = slow_reap
+        running = asyncio.ensure_future(reaper.run())
+        while not passes:
+            await asyncio.sleep(0.005)
+        await reaper.stop()
+        assert passes[-1] == "done"
+        assert running.done()
+
+    @pytest.mark.unit
+    def test_disabled_without_idle_timeout(self):
+        assert create_connection_reaper(Settings(), EngineRegistry()) is None
@@ -0,0 +1,169 @@
+"""Tests for the Core read path of read-only sessions."""
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.read_mode import is_read_only, mark_read_only
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager, SyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+
+ROWS = 12
+PAGE = 5
+
+# The tests read ROWS seeded items
+pytestmark = [pytest.mark.usefixtures("seeded_db_path"),
+              pytest.mark.parametrize("seeded_db_path", [ROWS], indirect=True)]
+
+
+@pytest.fixture
+def session_factory(sync_engine):
+    return sessionmaker(bind=sync_engine, class_=SyncSession, expire_on_commit=False)
+
+
+def _read_all(list_page) -> list:
+    """Walk every page with ``list_page(cursor)``."""
+    items, cursor = [], None
+    while True:
+        page = list_page(cursor)
+        items.extend(page.items)
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+async def _aread_all(list_page) -> list:
+    items, cursor = [], None
+    while True:
+        page = await list_page(cursor)
+        items.extend(page.items)
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+class TestReadMode:
+    """Read-only transactional calls mark their session."""
+
+    @pytest.mark.unit
+    def test_mark_read_only(self, session_factory):
+        with session_factory() as session:
+            assert not is_read_only(session)
+            mark_read_only(session)
+            assert is_read_only(session)
+
+    @pytest.mark.unit
+    def test_sessions_without_info_are_ignored(self):
+        session = object()
+        mark_read_only(session)
+        assert not is_read_only(session)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("read_only", [True, False])
+    def test_transactional_marks_read_only_sessions(self, session_factory, read_only):
+        manager = SyncTransactionManager(session_factory)
+
+        @manager.transactional(read_only=read_only)
+        def probe(session: SyncSession) -> bool:
+            return is_read_only(session)
+
+        assert probe() is read_only
+
+
+class TestSyncCoreReads:
+    """Sync repositories read plain rows from read-only sessions."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_same_items_without_identity_map(self, session_factory, repo_factory):
+        repo = repo_factory()
+        with session_factory() as session:
+            orm_items = _read_all(lambda cursor: repo.list(session, PAGE, cursor))
+            orm_item = repo.get_by_id(session, "id-003")
+
+        with session_factory() as session:
+            mark_read_only(session)
+            core_items = _read_all(lambda cursor: repo.list(session, PAGE, cursor))
+            assert repo.get_by_id(session, "id-003") == orm_item
+            assert repo.get_by_id(session, "missing") is None
+            assert len(session.identity_map) == 0
+
+        assert len(core_items) == ROWS
+        assert core_items == orm_items
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_service_reads(self, session_factory, repo_factory):
+        service = SyncItemService(transaction=SyncTransactionManager(session_factory), repo=repo_factory())
+        items = _read_all(lambda cursor: service.list(PAGE, cursor))
+        assert [item.name for item in items] == [f"item-{i:03d}" for i in range(ROWS)]
+        assert service.get("id-007").price == 3.5
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncToSyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy()),
+    ])
+    def test_async_session_through_bridge(self, background_async_engine, repo_factory):
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+            async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False)))
+        service = SyncItemService(transaction=manager, repo=repo_factory())
+        items = _read_all(lambda cursor: service.list(PAGE, cursor))
+        assert [item.id for item in items] == [f"id-{i:03d}" for i in range(ROWS)]
+        assert service.get("id-007").quantity == 7
+
+
+class TestAsyncCoreReads:
+    """Async repositories read plain rows from read-only sessions."""
+
+    @pytest.fixture
+    def async_factory(self, async_engine):
+        return async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+    ])
+    async def test_same_items_without_identity_map(self, async_factory, repo_factory):
+        repo = repo_factory()
+        async with async_factory() as session:
+            orm_items = await _aread_all(lambda cursor: repo.list(session, PAGE, cursor))
+
+        async with async_factory() as session:
+            mark_read_only(session)
+            core_items = await _aread_all(lambda cursor: repo.list(session, PAGE, cursor))
+            assert (await repo.get_by_id(session, "id-003")).name == "item-003"
+            assert len(session.identity_map) == 0
+
+        assert core_items == orm_items
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        SyncToAsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy()),
+    ])
+    async def test_sync_session(self, session_factory, repo_factory):
+        manager = SyncToAsyncTransactionManager(SyncTransactionManager(session_factory))
+        service = AsyncItemService(transaction=manager, repo=repo_factory())
+        items = await _aread_all(lambda cursor: service.list(PAGE, cursor))
+        assert [item.id for item in items] == [f"id-{i:03d}" for i in range(ROWS)]
+        assert (await service.get("id-007")).quantity == 7
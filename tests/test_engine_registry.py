@@ -0,0 +1,86 @@
+"""Tests for the process-wide engine registry."""
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import Settings
+from infras.repositories.engine_registry import EngineKey, EngineRegistry
+from infras.repositories import factory
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        DB_URL_SYNC=f"sqlite:///{tmp_path}/registry.db",
+        DB_URL_ASYNC=f"sqlite+aiosqlite:///{tmp_path}/registry.db",
+        POOL_SIZE=3,
+        MAX_OVERFLOW=1,
+    )
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = EngineRegistry()
+    monkeypatch.setattr(factory, "engine_registry", registry)
+    return registry
+
+
+class TestEngineRegistry:
+    """Test cases for EngineRegistry."""
+
+    @pytest.mark.unit
+    def test_same_settings_share_engine(self, registry, settings):
+        """Repeated lookups return the same engine instance."""
+        engine = registry.sync_engine(settings)
+
+        assert isinstance(engine, Engine)
+        assert registry.sync_engine(settings) is engine
+        assert registry.sync_engine(settings.model_copy()) is engine
+        assert len(registry.engines) == 1
+
+    @pytest.mark.unit
+    def test_sync_and_async_are_distinct(self, registry, settings):
+        """Sync and async engines are registered under different keys."""
+        sync_engine = registry.sync_engine(settings)
+        async_engine = registry.async_engine(settings)
+
+        assert isinstance(async_engine, AsyncEngine)
+        assert set(registry.engines) == {
+            EngineKey.from_settings(settings, is_async=False),
+            EngineKey.from_settings(settings, is_async=True),
+        }
+        assert registry.engines[EngineKey.from_settings(settings, is_async=False)] is sync_engine
+
+    @pytest.mark.unit
+    def test_pool_settings_are_part_of_the_key(self, registry, settings):
+        """Different pool settings get their own engine."""
+        engine = registry.sync_engine(settings)
+        other = registry.sync_engine(settings.model_copy(update={"POOL_SIZE": 7}))
+
+        assert other is not engine
+        assert other.pool.size() == 7
+
+    @pytest.mark.unit
+    def test_session_factories_reuse_engine(self, registry, settings):
+        """Every session factory resolution binds to the shared engine."""
+        first = factory.sync_session_factory(settings)
+        second = factory.sync_session_factory(settings)
+        async_first = factory.async_session_factory(settings)
+        async_second = factory.async_session_factory(settings)
+
+        assert first.kw["bind"] is second.kw["bind"]
+        assert async_first.kw["bind"] is async_second.kw["bind"]
+        assert len(registry.engines) == 2
+
+    @pytest.mark.asyncio
+    async def test_dispose_all_clears_registry(self, registry, settings):
+        """dispose_all disposes and forgets every engine."""
+        engine = registry.sync_engine(settings)
+        registry.async_engine(settings)
+
+        await registry.dispose_all()
+
+        assert registry.engines == {}
+        assert registry.sync_engine(settings) is not engine
+        await registry.dispose_all()
@@ -0,0 +1,162 @@
+"""Tests for the instrumented executor subsystem."""
+
+import threading
+
+import pytest
+from dependency_injector import providers
+from sqlalchemy import create_engine
+
+from config import Settings
+from infras.executors import ExecutorRejectedError, InstrumentedThreadPool, ThreadPoolManager
+
+
+class TestInstrumentedThreadPool:
+    """Test cases for InstrumentedThreadPool."""
+
+    @pytest.mark.unit
+    def test_metrics_track_tasks(self):
+        pool = InstrumentedThreadPool("test", max_workers=2)
+        try:
+            assert [pool.submit(pow, 2, i).result() for i in range(5)] == [1, 2, 4, 8, 16]
+            metrics = pool.metrics
+        finally:
+            pool.shutdown()
+
+        assert metrics.submitted == metrics.completed == 5
+        assert metrics.active == metrics.queued == metrics.rejected == 0
+        assert metrics.run_time_total >= metrics.run_time_max >= 0
+        assert metrics.wait_time_avg >= 0
+
+    @pytest.mark.unit
+    def test_full_queue_rejects_immediately(self):
+        pool = InstrumentedThreadPool("test", max_workers=1, max_queue=2)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        try:
+            running = pool.submit(block)
+            started.wait(5)
+            waiting = [pool.submit(block), pool.submit(block)]
+
+            assert pool.metrics.active == 1
+            assert pool.metrics.queued == 2
+            with pytest.raises(ExecutorRejectedError, match="test is saturated"):
+                pool.submit(block)
+            assert pool.metrics.rejected == 1
+        finally:
+            release.set()
+            for future in [running, *waiting]:
+                future.result()
+            pool.shutdown()
+
+        assert pool.metrics.completed == 3
+        assert pool.metrics.queued == 0
+
+    @pytest.mark.unit
+    def test_cancelled_tasks_free_their_queue_slot(self):
+        pool = InstrumentedThreadPool("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        try:
+            running = pool.submit(block)
+            started.wait(5)
+            assert pool.submit(block).cancel()
+            assert pool.metrics.queued == 0
+            waiting = pool.submit(block)
+        finally:
+            release.set()
+            running.result()
+            waiting.result()
+            pool.shutdown()
+        assert pool.metrics.completed == 2
+
+    @pytest.mark.unit
+    def test_errors_are_counted_as_completed(self):
+        pool = InstrumentedThreadPool("test", max_workers=1)
+        try:
+            with pytest.raises(ZeroDivisionError):
+                pool.submit(lambda: 1 / 0).result()
+        finally:
+            pool.shutdown()
+        assert pool.metrics.completed == 1
+        assert pool.metrics.active == 0
+
+
+class TestThreadPoolManager:
+    """Test cases for ThreadPoolManager."""
+
+    @pytest.mark.unit
+    def test_pools_sized_from_connection_budget(self):
+        manager = ThreadPoolManager()
+        manager.configure(Settings(POOL_SIZE=4, MAX_OVERFLOW=2, EXECUTOR_QUEUE_SIZE=7))
+        try:
+            pool = manager.get("sync_db")
+            assert manager.get("sync_db") is pool
+            assert pool.max_workers == 6
+            assert pool.max_queue == 7
+            assert manager.get("other", max_workers=2, max_queue=0).max_workers == 2
+            assert set(manager.metrics()) == {"sync_db", "other"}
+        finally:
+            manager.shutdown()
+
+    @pytest.mark.unit
+    def test_explicit_worker_setting_wins(self):
+        manager = ThreadPoolManager()
+        manager.configure(Settings(POOL_SIZE=4, MAX_OVERFLOW=2, EXECUTOR_MAX_WORKERS=3))
+        try:
+            assert manager.get().max_workers == 3
+        finally:
+            manager.shutdown()
+
+    @pytest.mark.unit
+    def test_one_pool_per_engine(self, tmp_path):
+        manager = ThreadPoolManager(max_workers=1, max_queue=0)
+        primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+        replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+        try:
+            pool = manager.for_engine(primary)
+            assert manager.for_engine(primary) is pool
+            assert manager.for_engine(replica) is not pool
+            assert pool.name == f"sync_db[sqlite:///{tmp_path}/primary.db]"
+        finally:
+            manager.shutdown()
+            primary.dispose()
+            replica.dispose()
+
+    @pytest.mark.unit
+    def test_shutdown_recreates_pools_lazily(self):
+        manager = ThreadPoolManager(max_workers=1, max_queue=0)
+        pool = manager.get()
+        manager.shutdown()
+
+        assert manager.metrics() == {}
+        try:
+            assert manager.get() is not pool
+        finally:
+            manager.shutdown()
+
+
+class TestExecutorRejectedResponse:
+    """A saturated executor is answered with a 503 the client can retry."""
+
+    @pytest.mark.integration
+    def test_rejection_is_service_unavailable(self, test_client, test_container, mock_async_service,
+                                              mock_sync_service):
+        rejected = ExecutorRejectedError("Executor sync_db is saturated")
+        mock_async_service.get.side_effect = mock_sync_service.get.side_effect = rejected
+        with test_container.async_item_service.override(providers.Object(mock_async_service)), \
+                test_container.sync_item_service.override(providers.Object(mock_sync_service)):
+            response = test_client.get("/items/some-id")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert response.json() == {"detail": "Service overloaded, retry later"}
@@ -0,0 +1,119 @@
+"""Tests for streaming item exports."""
+
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from api.v1.controllers import item_async_controller, item_sync_controller
+from api.v1.controllers.ndjson import encode_chunk
+from infras.executors.session_workers import SessionWorkerPool
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+
+ROWS = 25
+CHUNK_SIZE = 10
+
+# The tests read ROWS seeded items
+pytestmark = [pytest.mark.usefixtures("seeded_db_path"),
+              pytest.mark.parametrize("seeded_db_path", [ROWS], indirect=True)]
+
+
+def _assert_chunks(chunks):
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert sorted(item.id for chunk in chunks for item in chunk) == [f"id-{i:03d}" for i in range(ROWS)]
+
+
+class TestSyncExport:
+    """Sync services stream the table chunk by chunk."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_sync_session(self, sync_manager, repo_factory):
+        service = SyncItemService(transaction=sync_manager, repo=repo_factory())
+        _assert_chunks(list(service.export(CHUNK_SIZE)))
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncToSyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy()),
+    ])
+    def test_async_session_through_bridge(self, background_async_engine, repo_factory):
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+            async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False)))
+        service = SyncItemService(transaction=manager, repo=repo_factory())
+        _assert_chunks(list(service.export(CHUNK_SIZE)))
+
+    @pytest.mark.integration
+    def test_closing_early_releases_session(self, sync_manager):
+        service = SyncItemService(transaction=sync_manager, repo=SyncItemRepository())
+        engine = sync_manager.session_factory.kw["bind"]
+
+        chunks = service.export(CHUNK_SIZE)
+        assert len(next(chunks)) == CHUNK_SIZE
+        assert engine.pool.checkedout() == 1
+        chunks.close()
+        assert engine.pool.checkedout() == 0
+
+
+class TestAsyncExport:
+    """Async services stream the table chunk by chunk."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+    ])
+    async def test_async_session(self, async_manager, repo_factory):
+        service = AsyncItemService(transaction=async_manager, repo=repo_factory())
+        _assert_chunks([chunk async for chunk in service.export(CHUNK_SIZE)])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [0, 2])
+    @pytest.mark.parametrize("repo_factory", [
+        SyncToAsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy()),
+    ])
+    async def test_sync_session(self, sync_manager, repo_factory, workers):
+        session_workers = SessionWorkerPool(workers) if workers else None
+        try:
+            manager = SyncToAsyncTransactionManager(sync_manager, session_workers=session_workers)
+            service = AsyncItemService(transaction=manager, repo=repo_factory())
+            _assert_chunks([chunk async for chunk in service.export(CHUNK_SIZE)])
+        finally:
+            if session_workers is not None:
+                session_workers.shutdown()
+
+
+class TestNdjson:
+    """Test cases for NDJSON encoding."""
+
+    @pytest.mark.unit
+    def test_one_json_document_per_line(self, sync_manager):
+        service = SyncItemService(transaction=sync_manager, repo=SyncItemRepository())
+        body = b"".join(encode_chunk(chunk) for chunk in service.export(CHUNK_SIZE))
+
+        lines = body.decode().splitlines()
+        assert len(lines) == ROWS
+        first = json.loads(lines[0])
+        assert set(first) == {"id", "created_at", "updated_at", "name", "description", "quantity", "price"}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("controller", [item_async_controller, item_sync_controller])
+    def test_export_route_precedes_item_route(self, controller):
+        paths = [route.path for route in controller.router.routes]
+        assert paths.index("/items/export") < paths.index("/items/{item_id}")
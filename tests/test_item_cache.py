@@ -0,0 +1,329 @@
+"""Tests for the read-through item cache."""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from infras.cache import LRUTTLCache, run_after_commit
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_cached_repository import (
+    CachedAsyncItemRepository, CachedSyncItemRepository, ItemCache, with_item_cache,
+)
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from tests.conftest import new_item, record_statements
+
+
+class RolledBack(Exception):
+    pass
+
+
+class TestLRUTTLCache:
+    """Test cases for LRUTTLCache."""
+
+    @pytest.mark.unit
+    def test_hits_misses_and_lru_eviction(self):
+        cache = LRUTTLCache("test", max_size=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now the least recently used
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        metrics = cache.metrics
+        assert (metrics.hits, metrics.misses, metrics.evictions, metrics.size) == (3, 1, 1, 2)
+        assert metrics.hit_ratio == 0.75
+
+    @pytest.mark.unit
+    def test_entries_expire_after_ttl(self, clock):
+        cache = LRUTTLCache("test", max_size=10, ttl=5, clock=clock)
+        cache.put("a", 1)
+
+        clock.now = 104.9
+        assert cache.get("a") == 1
+        clock.now = 105.0
+        assert cache.get("a") is None
+        assert cache.metrics.expirations == 1
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_get_or_load_caches_values_but_not_none(self):
+        cache = LRUTTLCache("test", max_size=10, ttl=60)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return None if len(loads) == 1 else "value"
+
+        assert cache.get_or_load("a", load) is None
+        assert cache.get_or_load("a", load) == "value"
+        assert cache.get_or_load("a", load) == "value"
+        assert len(loads) == 2
+
+    @pytest.mark.unit
+    def test_invalidation_during_load_discards_result(self):
+        cache = LRUTTLCache("test", max_size=10, ttl=60)
+
+        def load():
+            cache.invalidate("a")  # a write commits while the old value is being read
+            return "old"
+
+        assert cache.get_or_load("a", load) == "old"
+        assert cache.get("a") is None
+        # Loads starting after the invalidation are stored again
+        assert cache.get_or_load("a", lambda: "new") == "new"
+        assert cache.get("a") == "new"
+
+    @pytest.mark.unit
+    def test_failed_load_is_not_cached(self):
+        cache = LRUTTLCache("test", max_size=10, ttl=60)
+
+        def load():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("a", load)
+        assert cache.get_or_load("a", lambda: "value") == "value"
+
+    @pytest.mark.asyncio
+    async def test_aget_or_load(self):
+        cache = LRUTTLCache("test", max_size=10, ttl=60)
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_load():
+            started.set()
+            await release.wait()
+            return "old"
+
+        task = asyncio.create_task(cache.aget_or_load("a", slow_load))
+        await started.wait()
+        cache.invalidate("a")
+        release.set()
+
+        assert await task == "old"
+        assert cache.get("a") is None
+
+    @pytest.mark.unit
+    def test_thread_safety(self):
+        cache = LRUTTLCache("test", max_size=50, ttl=60)
+
+        def worker(offset: int):
+            for i in range(2000):
+                key = (offset + i) % 100
+                cache.get_or_load(key, lambda: key)
+                if i % 7 == 0:
+                    cache.invalidate(key)
+
+        threads = [threading.Thread(target=worker, args=(n * 13,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) <= 50
+        assert all(cache.get(key) in (None, key) for key in range(100))
+
+
+class TestRunAfterCommit:
+    """Test cases for after-commit callbacks."""
+
+    @pytest.fixture
+    def session_factory(self, sync_engine):
+        return sessionmaker(bind=sync_engine, class_=SyncSession)
+
+    @pytest.mark.unit
+    def test_runs_after_commit_only(self, session_factory):
+        calls = []
+        with session_factory() as session:
+            with session.begin():
+                run_after_commit(session, lambda: calls.append("committed"))
+                assert calls == []
+            assert calls == ["committed"]
+
+            with session.begin():
+                run_after_commit(session, lambda: calls.append("again"))
+            assert calls == ["committed", "again"]
+
+    @pytest.mark.unit
+    def test_dropped_on_rollback(self, session_factory):
+        calls = []
+        with session_factory() as session:
+            with pytest.raises(RolledBack):
+                with session.begin():
+                    run_after_commit(session, lambda: calls.append("rolled back"))
+                    raise RolledBack()
+
+            with session.begin():
+                pass
+        assert calls == []
+
+    @pytest.mark.unit
+    def test_sessions_without_info_run_immediately(self):
+        calls = []
+        run_after_commit(object(), lambda: calls.append("now"))
+        assert calls == ["now"]
+
+
+def _sync_session_service(request, repo):
+    sync_engine = request.getfixturevalue("sync_engine")
+    return SyncItemService(transaction=request.getfixturevalue("sync_manager"), repo=repo), sync_engine
+
+
+def _async_session_bridge_service(request, repo):
+    engine = request.getfixturevalue("background_async_engine")
+    manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+        async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)))
+    return SyncItemService(transaction=manager, repo=repo), engine.sync_engine
+
+
+@pytest.fixture(params=[
+    (_sync_session_service, SyncItemRepository),
+    (_sync_session_service, lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy())),
+    (_async_session_bridge_service, AsyncToSyncItemRepository),
+    (_async_session_bridge_service, lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy())),
+], ids=["sync", "sync-uniform", "bridge", "bridge-uniform"])
+def cached_sync(request):
+    """A sync service reading through a cache, the cache, and the SELECTs of the service's engine."""
+    make_service, repo_factory = request.param
+    cache = ItemCache("items", max_size=10, ttl=60)
+    service, engine = make_service(request, CachedSyncItemRepository(repo_factory(), cache))
+    return service, cache, record_statements(engine, "SELECT")
+
+
+def _async_session_service(request, repo):
+    async_engine = request.getfixturevalue("async_engine")
+    return AsyncItemService(transaction=request.getfixturevalue("async_manager"), repo=repo), async_engine.sync_engine
+
+
+def _sync_session_bridge_service(request, repo):
+    manager = SyncToAsyncTransactionManager(request.getfixturevalue("sync_manager"))
+    return AsyncItemService(transaction=manager, repo=repo), request.getfixturevalue("sync_engine")
+
+
+@pytest.fixture(params=[
+    (_async_session_service, AsyncItemRepository),
+    (_async_session_service, lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy())),
+    (_sync_session_bridge_service, SyncToAsyncItemRepository),
+    (_sync_session_bridge_service, lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy())),
+], ids=["async", "async-uniform", "bridge", "bridge-uniform"])
+def cached_async(request):
+    """An async service reading through a cache, the cache, and the SELECTs of the service's engine."""
+    make_service, repo_factory = request.param
+    cache = ItemCache("items", max_size=10, ttl=60)
+    service, engine = make_service(request, CachedAsyncItemRepository(repo_factory(), cache))
+    return service, cache, record_statements(engine, "SELECT")
+
+
+class TestCachedSyncRepository:
+    """Sync services read through the cache and invalidate it on commit."""
+
+    @pytest.mark.integration
+    def test_repeated_get_is_served_from_the_cache(self, cached_sync):
+        service, cache, selects = cached_sync
+        created = service.create(new_item("before"))
+        selects.clear()
+        assert service.get(created.id).name == "before"
+        assert service.get(created.id).name == "before"
+        assert len(selects) == 1
+        assert cache.metrics.hits == 1
+
+    @pytest.mark.integration
+    def test_rolled_back_update_is_not_cached(self, cached_sync):
+        service = cached_sync[0]
+        created = service.create(new_item("before"))
+
+        def update_then_fail(session):
+            service.repo.update(session, created.id, new_item("rolled back"))
+            assert service.repo.get_by_id(session, created.id).name == "rolled back"
+            raise RolledBack()
+
+        with pytest.raises(RolledBack):
+            service.transaction.execute_with_transaction(update_then_fail)
+        assert service.get(created.id).name == "before"
+
+    @pytest.mark.integration
+    def test_commit_invalidates_reads_during_the_write(self, cached_sync):
+        service = cached_sync[0]
+        created = service.create(new_item("before"))
+
+        def update_then_read(session):
+            service.repo.update(session, created.id, new_item("after"))
+            # Another session still sees, and caches, the committed value
+            assert service.get(created.id).name == "before"
+
+        service.transaction.execute_with_transaction(update_then_read)
+        assert service.get(created.id).name == "after"
+
+    @pytest.mark.integration
+    def test_delete_invalidates(self, cached_sync):
+        service = cached_sync[0]
+        created = service.create(new_item("before"))
+        assert service.get(created.id) is not None
+        service.delete(created.id)
+        assert service.get(created.id) is None
+
+    @pytest.mark.unit
+    def test_without_cache_repository_is_unwrapped(self):
+        repo = SyncItemRepository()
+        assert with_item_cache(repo, None) is repo
+        assert isinstance(with_item_cache(repo, ItemCache("items", 1, 1)), CachedSyncItemRepository)
+        assert isinstance(with_item_cache(AsyncItemRepository(), ItemCache("items", 1, 1)), CachedAsyncItemRepository)
+
+
+class TestCachedAsyncRepository:
+    """Async services read through the cache and invalidate it on commit."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_get_is_served_from_the_cache(self, cached_async):
+        service, cache, selects = cached_async
+        created = await service.create(new_item("before"))
+        selects.clear()
+        assert (await service.get(created.id)).name == "before"
+        assert (await service.get(created.id)).name == "before"
+        assert len(selects) == 1
+        assert cache.metrics.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_update_is_not_cached(self, cached_async):
+        service = cached_async[0]
+        created = await service.create(new_item("before"))
+
+        async def update_then_fail(session):
+            await service.repo.update(session, created.id, new_item("rolled back"))
+            assert (await service.repo.get_by_id(session, created.id)).name == "rolled back"
+            raise RolledBack()
+
+        with pytest.raises(RolledBack):
+            await service.transaction.execute_with_transaction(update_then_fail)
+        assert (await service.get(created.id)).name == "before"
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates(self, cached_async):
+        service = cached_async[0]
+        created = await service.create(new_item("before"))
+        assert (await service.get(created.id)).name == "before"
+        await service.update(created.id, new_item("after"))
+        assert (await service.get(created.id)).name == "after"
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates(self, cached_async):
+        service = cached_async[0]
+        created = await service.create(new_item("before"))
+        assert await service.get(created.id) is not None
+        await service.delete(created.id)
+        assert await service.get(created.id) is None
@@ -0,0 +1,126 @@
+"""Tests for single-statement item updates and deletes."""
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_session_execution import AsyncExecutionStrategy, SyncToAsyncExecutionStrategy
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import (
+    AsyncItemRepository, SyncToAsyncItemRepository, UniformAsyncItemRepository,
+)
+from infras.repositories.item_sync_repository import (
+    AsyncToSyncItemRepository, SyncItemRepository, UniformSyncItemRepository,
+)
+from infras.repositories.sync_session_execution import AsyncToSyncExecutionStrategy, SyncExecutionStrategy
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from tests.conftest import new_item, record_statements
+
+
+def _without_update_returning(engine):
+    with engine.connect():
+        pass
+    engine.dialect.update_returning = False
+
+
+def _check_sync_service(service: SyncItemService, statements: list[str], update_round_trips: int = 1):
+    created = service.create(new_item("before"))
+
+    statements.clear()
+    updated = service.update(created.id, new_item("after", quantity=5))
+    assert len(statements) == update_round_trips
+    assert ("RETURNING" in statements[0]) == (update_round_trips == 1)
+    assert (updated.id, updated.name, updated.quantity) == (created.id, "after", 5)
+    assert updated.created_at == created.created_at
+
+    statements.clear()
+    assert service.update("missing", new_item("nothing")) is None
+    assert len(statements) == 1
+
+    statements.clear()
+    assert service.delete(created.id) is True
+    assert len(statements) == 1
+
+    statements.clear()
+    assert service.delete(created.id) is False
+    assert len(statements) == 1
+
+    assert service.get(created.id) is None
+
+
+async def _check_async_service(service: AsyncItemService, statements: list[str]):
+    created = await service.create(new_item("before"))
+
+    statements.clear()
+    updated = await service.update(created.id, new_item("after", quantity=5))
+    assert len(statements) == 1
+    assert (updated.id, updated.name, updated.quantity) == (created.id, "after", 5)
+
+    statements.clear()
+    assert await service.update("missing", new_item("nothing")) is None
+    assert len(statements) == 1
+
+    statements.clear()
+    assert await service.delete(created.id) is True
+    assert await service.delete(created.id) is False
+    assert len(statements) == 2
+
+    assert await service.get(created.id) is None
+
+
+SYNC_REPOS = [SyncItemRepository, lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy())]
+
+
+class TestSyncWrites:
+    """Each sync update or delete is a single round trip."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", SYNC_REPOS)
+    def test_sync_session(self, sync_engine, sync_manager, repo_factory):
+        statements = record_statements(sync_engine)
+        _check_sync_service(SyncItemService(transaction=sync_manager, repo=repo_factory()), statements)
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", SYNC_REPOS)
+    def test_without_returning(self, sync_engine, sync_manager, repo_factory):
+        """Updates fall back to UPDATE + SELECT; not-found stays at one statement."""
+        _without_update_returning(sync_engine)
+        statements = record_statements(sync_engine)
+        _check_sync_service(SyncItemService(transaction=sync_manager, repo=repo_factory()), statements,
+                            update_round_trips=2)
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncToSyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=AsyncToSyncExecutionStrategy()),
+    ])
+    def test_async_session_through_bridge(self, background_async_engine, repo_factory):
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+            async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False)))
+        statements = record_statements(background_async_engine.sync_engine)
+        _check_sync_service(SyncItemService(transaction=manager, repo=repo_factory()), statements)
+
+
+class TestAsyncWrites:
+    """Each async update or delete is a single round trip."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+    ])
+    async def test_async_session(self, async_engine, async_manager, repo_factory):
+        statements = record_statements(async_engine.sync_engine)
+        await _check_async_service(AsyncItemService(transaction=async_manager, repo=repo_factory()), statements)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        SyncToAsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=SyncToAsyncExecutionStrategy()),
+    ])
+    async def test_sync_session(self, sync_engine, sync_manager, repo_factory):
+        statements = record_statements(sync_engine)
+        service = AsyncItemService(transaction=SyncToAsyncTransactionManager(sync_manager), repo=repo_factory())
+        await _check_async_service(service, statements)
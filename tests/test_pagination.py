@@ -0,0 +1,162 @@
+"""Tests for keyset-paginated item listing."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.schemas.item_schema import ItemCreateSchema
+from infras.repositories.async_session_execution import AsyncExecutionStrategy
+from infras.repositories.item_async_repository import AsyncItemRepository, UniformAsyncItemRepository
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import SyncItemRepository, UniformSyncItemRepository
+from infras.repositories.sync_session_execution import SyncExecutionStrategy
+from repositories.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _seed_items(session, count: int = 25, per_timestamp: int = 5):
+    """Items sharing created_at in groups, so the id tie-breaker matters."""
+    session.add_all([
+        ItemPO(name=f"item-{i:03d}", description="", quantity=i, price=1.0,
+               created_at=BASE_TIME + timedelta(seconds=i // per_timestamp))
+        for i in range(count)
+    ])
+    session.commit()
+
+
+def _expected_order(session):
+    rows = session.query(ItemPO.created_at, ItemPO.id).order_by(ItemPO.created_at, ItemPO.id).all()
+    return [row.id for row in rows]
+
+
+@pytest.fixture
+def sync_session(sync_engine):
+    session = sessionmaker(bind=sync_engine, expire_on_commit=False)()
+    yield session
+    session.close()
+
+
+@pytest_asyncio.fixture
+async def async_session(async_engine):
+    session = async_sessionmaker(bind=async_engine, expire_on_commit=False)()
+    yield session
+    await session.close()
+
+
+class TestCursor:
+    """Test cases for cursor encoding."""
+
+    @pytest.mark.unit
+    def test_round_trip(self):
+        cursor = encode_cursor(BASE_TIME, "abc")
+        assert decode_cursor(cursor) == (BASE_TIME, "abc")
+        assert "=" not in cursor
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(BASE_TIME, "x")[:-3]])
+    def test_malformed_cursor(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+
+class TestSyncKeysetPagination:
+    """Sync repositories page through (created_at, id) without gaps or repeats."""
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("repo_factory", [
+        SyncItemRepository,
+        lambda: UniformSyncItemRepository(strategy=SyncExecutionStrategy()),
+    ])
+    def test_pages_cover_table_in_order(self, sync_session, repo_factory):
+        _seed_items(sync_session)
+        repo = repo_factory()
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = repo.list(sync_session, limit=7, cursor=cursor)
+            seen.extend(item.id for item in page.items)
+            pages += 1
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert pages == 4
+        assert seen == _expected_order(sync_session)
+
+    @pytest.mark.integration
+    def test_exact_multiple_has_no_empty_trailing_page(self, sync_session):
+        _seed_items(sync_session, count=10)
+        repo = SyncItemRepository()
+
+        first = repo.list(sync_session, limit=5)
+        second = repo.list(sync_session, limit=5, cursor=first.next_cursor)
+
+        assert len(second.items) == 5
+        assert second.next_cursor is None
+
+    @pytest.mark.integration
+    def test_server_default_timestamps(self, sync_session):
+        """Rows created within the same second by the database still page correctly."""
+        repo = SyncItemRepository()
+        for i in range(6):
+            repo.create(sync_session, ItemCreateSchema(name=f"default-{i}", description="", quantity=1, price=1.0))
+        sync_session.commit()
+
+        first = repo.list(sync_session, limit=3)
+        second = repo.list(sync_session, limit=3, cursor=first.next_cursor)
+
+        assert {i.id for i in first.items} | {i.id for i in second.items} == set(_expected_order(sync_session))
+
+    @pytest.mark.integration
+    def test_page_query_is_bounded(self, sync_session):
+        _seed_items(sync_session)
+        statements = []
+        event.listen(sync_session.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        SyncItemRepository().list(sync_session, limit=7)
+
+        assert "LIMIT" in statements[-1]
+        assert "ORDER BY items.created_at, items.id" in statements[-1]
+
+
+class TestAsyncKeysetPagination:
+    """Async repositories share the same page semantics."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("repo_factory", [
+        AsyncItemRepository,
+        lambda: UniformAsyncItemRepository(strategy=AsyncExecutionStrategy()),
+    ])
+    async def test_pages_cover_table_in_order(self, async_session, repo_factory):
+        await async_session.run_sync(_seed_items)
+        repo = repo_factory()
+
+        seen, cursor = [], None
+        while True:
+            page = await repo.list(async_session, limit=10, cursor=cursor)
+            seen.extend(item.id for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == await async_session.run_sync(_expected_order)
+
+
+class TestListEndpointPagination:
+    """GET /items/ exposes the cursor in the X-Next-Cursor header."""
+
+    @pytest.mark.integration
+    def test_invalid_cursor_is_rejected(self, test_client):
+        response = test_client.get("/items/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    @pytest.mark.integration
+    def test_limit_is_bounded(self, test_client):
+        assert test_client.get("/items/", params={"limit": 0}).status_code == 422
+        assert test_client.get("/items/", params={"limit": 100_000}).status_code == 422
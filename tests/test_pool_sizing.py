@@ -0,0 +1,276 @@
+"""Tests for adaptive pool sizing, including a simulation of its convergence."""
+
+import asyncio
+import logging
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import Settings
+from infras.repositories.engine_registry import EngineRegistry
+from infras.repositories.pool_sizing import (
+    PoolLoadSample,
+    PoolSizeController,
+    ResizableAsyncAdaptedQueuePool,
+    ResizableQueuePool,
+    create_pool_sizer,
+)
+from infras.telemetry import PoolTelemetry
+
+# Simulated checkout hold time in seconds
+SERVICE_TIME = 0.02
+GROW_WAIT = 0.005
+
+
+def _mean_wait(load: float, size: int) -> float | None:
+    """Mean checkout wait of an M/M/c queue (Erlang C) with ``load`` busy connections; None when saturated."""
+    if load >= size:
+        return None
+    term = total = 1.0
+    for k in range(1, size):
+        term *= load / k
+        total += term
+    queued = term * load / size * size / (size - load)
+    return queued / (total + queued) * SERVICE_TIME / (size - load)
+
+
+def _simulated_sample(size: int, load: float) -> PoolLoadSample:
+    wait = _mean_wait(load, size)
+    if wait is None:
+        # Saturated: every connection busy and checkouts time out
+        return PoolLoadSample(size, 1000, 5.0, float(size), 10)
+    return PoolLoadSample(size, int(load / SERVICE_TIME), wait, load, 0)
+
+
+def _simulate(controller: PoolSizeController, size: int, loads) -> list:
+    """Pool size after each interval of the synthetic load pattern."""
+    sizes = []
+    for load in loads:
+        decision = controller.decide(_simulated_sample(size, load))
+        if decision is not None:
+            size = decision.new_size
+        sizes.append(size)
+    return sizes
+
+
+def _controller(**kwargs) -> PoolSizeController:
+    options = dict(min_size=2, max_size=40, grow_wait=GROW_WAIT, shrink_utilization=0.5, shrink_delay=12)
+    options.update(kwargs)
+    return PoolSizeController("sim", **options)
+
+
+class TestResizablePools:
+    """Resizing running pools."""
+
+    @pytest.mark.integration
+    def test_sync_grow_and_shrink(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/sizing.db", poolclass=ResizableQueuePool,
+                               pool_size=1, max_overflow=0, pool_timeout=0)
+        telemetry = PoolTelemetry(engine)
+        try:
+            engine.connect().close()
+            engine.pool.resize(3)
+            held = [engine.connect() for _ in range(3)]
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+            engine.pool.resize(1)
+            for connection in held:
+                connection.close()
+            # Surplus connections are closed as they come back
+            assert (engine.pool.size(), engine.pool.checkedin(), telemetry.metrics.closes) == (1, 1, 2)
+            with engine.connect():
+                with pytest.raises(exc.TimeoutError):
+                    engine.connect()
+        finally:
+            engine.dispose()
+
+    @pytest.mark.integration
+    def test_size_survives_dispose(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/sizing.db", poolclass=ResizableQueuePool, pool_size=2)
+        engine.pool.resize(4)
+        engine.dispose()
+        assert engine.pool.size() == 4
+        engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_async_grow_and_shrink(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/sizing.db",
+                                     poolclass=ResizableAsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+        try:
+            async with engine.connect():
+                pass
+            engine.sync_engine.pool.resize(2)
+            first, second = await engine.connect(), await engine.connect()
+            engine.sync_engine.pool.resize(1)
+            await first.close()
+            await second.close()
+            assert engine.sync_engine.pool.checkedin() == 1
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_async_resize_from_another_thread(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/sizing.db",
+                                     poolclass=ResizableAsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+        try:
+            async with engine.connect():
+                pass
+            queue = engine.sync_engine.pool._pool._queue
+            resizer = threading.Thread(target=engine.sync_engine.pool.resize, args=(3,))
+            resizer.start()
+            resizer.join()
+            # Applied by the loop owning the queue, not by the resizing thread
+            assert queue.maxsize == 1
+            await asyncio.sleep(0)
+            assert queue.maxsize == 3
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.unit
+    def test_invalid_size(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/sizing.db", poolclass=ResizableQueuePool)
+        with pytest.raises(ValueError):
+            engine.pool.resize(0)
+
+
+class TestPoolSizeController:
+    """Test cases for the sizing decisions."""
+
+    @pytest.mark.unit
+    def test_grows_after_consecutive_waits(self):
+        controller = _controller()
+        waiting = PoolLoadSample(size=8, checkouts=100, wait=0.05, busy=8, timeouts=0)
+
+        assert controller.decide(waiting) is None
+        decision = controller.decide(waiting)
+        assert (decision.old_size, decision.new_size) == (8, 10)
+        # The streak starts over at the new size
+        assert controller.decide(waiting) is None
+
+    @pytest.mark.unit
+    def test_a_calm_interval_breaks_the_streak(self):
+        controller = _controller()
+        waiting = PoolLoadSample(size=8, checkouts=100, wait=0.05, busy=8, timeouts=0)
+        calm = PoolLoadSample(size=8, checkouts=100, wait=0.0, busy=6, timeouts=0)
+
+        for sample in (waiting, calm, waiting, calm):
+            assert controller.decide(sample) is None
+
+    @pytest.mark.unit
+    def test_shrinks_towards_the_utilization_target(self):
+        controller = _controller(shrink_after=3)
+        idle = PoolLoadSample(size=20, checkouts=10, wait=0.0, busy=1, timeouts=0)
+
+        assert [controller.decide(idle) for _ in range(2)] == [None, None]
+        # By at most a quarter at a time
+        assert controller.decide(idle).new_size == 15
+
+    @pytest.mark.unit
+    def test_no_shrink_right_after_growth(self):
+        controller = _controller(shrink_after=1, shrink_delay=5)
+        waiting = PoolLoadSample(size=8, checkouts=100, wait=0.05, busy=8, timeouts=0)
+        controller.decide(waiting)
+        assert controller.decide(waiting).new_size == 10
+
+        idle = PoolLoadSample(size=10, checkouts=10, wait=0.0, busy=1, timeouts=0)
+        assert [controller.decide(idle) for _ in range(4)] == [None] * 4
+        assert controller.decide(idle).new_size == 8
+
+    @pytest.mark.unit
+    def test_bounds(self):
+        controller = _controller(min_size=4, max_size=10)
+        assert controller.decide(PoolLoadSample(20, 0, 0.0, 0.0, 0)).new_size == 10
+        assert controller.decide(PoolLoadSample(2, 0, 0.0, 0.0, 0)).new_size == 4
+
+        saturated = PoolLoadSample(size=10, checkouts=100, wait=1.0, busy=10, timeouts=3)
+        assert [controller.decide(saturated) for _ in range(3)] == [None] * 3
+
+    @pytest.mark.unit
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            _controller(min_size=5, max_size=4)
+        with pytest.raises(ValueError):
+            _controller(shrink_utilization=0)
+
+
+class TestSimulation:
+    """The controller on a simulated M/M/c pool."""
+
+    @pytest.mark.unit
+    def test_converges_through_a_load_spike(self):
+        # 2 busy connections, a spike to 16, then back to 2
+        loads = [2.0] * 40 + [16.0] * 80 + [2.0] * 150
+        sizes = _simulate(_controller(), 5, loads)
+
+        # Low load settles at the utilization target, 2 / 0.5
+        assert sizes[39] == 4
+        # The spike is absorbed: the pool stops growing once checkouts no longer wait
+        peak = sizes[119]
+        before_peak = max(size for size in sizes[:120] if size < peak)
+        assert _mean_wait(16.0, peak) < GROW_WAIT <= _mean_wait(16.0, before_peak)
+        assert len(set(sizes[80:120])) == 1
+        # Then it gives the connections back, and stays there
+        assert sizes[-1] == 4
+        assert len(set(sizes[-60:])) == 1
+
+    @pytest.mark.unit
+    def test_noisy_load_does_not_flap(self):
+        # Load jittering around the level where the pool would start to grow
+        loads = [15.0, 17.0, 16.0, 17.5, 14.5] * 60
+        controller = _controller()
+        sizes = _simulate(controller, 20, loads)
+
+        changes = sum(1 for before, after in zip(sizes, sizes[1:]) if before != after)
+        assert changes <= 3
+        assert len(set(sizes[-100:])) == 1
+        assert max(_mean_wait(load, sizes[-1]) for load in loads) < GROW_WAIT
+
+
+class TestAdaptivePoolSizer:
+    """The sizer applied to the pools of an engine registry."""
+
+    @pytest.fixture
+    def registry(self):
+        return EngineRegistry()
+
+    @pytest.mark.asyncio
+    async def test_timeouts_grow_the_pool(self, registry, tmp_path, caplog, clock):
+        settings = Settings(DB_URL_SYNC=f"sqlite:///{tmp_path}/sizer.db", POOL_SIZE=1, MAX_OVERFLOW=0,
+                            POOL_TIMEOUT=0, POOL_AUTOSIZE=True, POOL_SIZE_MAX=4)
+        sizer = create_pool_sizer(settings, registry)
+        sizer.clock = clock
+        engine = registry.sync_engine(settings)
+        try:
+            sizer.tick()
+            with engine.connect():
+                for _ in range(2):
+                    with pytest.raises(exc.TimeoutError):
+                        engine.connect()
+                    clock.now += 5
+                    with caplog.at_level(logging.INFO, logger="infras.repositories.pool_sizing"):
+                        decisions = sizer.tick()
+
+                assert [(decision.old_size, decision.new_size) for decision in decisions] == [(1, 2)]
+                assert engine.pool.size() == 2
+                assert sizer.decisions == decisions
+                assert "resized from 1 to 2" in caplog.text
+                # The grown pool has room for a second connection
+                engine.connect().close()
+        finally:
+            await registry.dispose_all()
+        # Disposed engines are forgotten
+        assert sizer.tick() == []
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self, registry):
+        assert create_pool_sizer(Settings(), registry) is None
+
+    @pytest.mark.unit
+    def test_start_and_stop(self, registry):
+        sizer = create_pool_sizer(Settings(POOL_AUTOSIZE=True, POOL_AUTOSIZE_INTERVAL=0.01), registry)
+        sizer.start()
+        sizer.stop()
+        sizer.stop()
@@ -0,0 +1,165 @@
+"""Tests for the connection pool telemetry and its Prometheus exposition."""
+
+import pytest
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import Settings
+from infras.repositories.engine_registry import EngineRegistry
+from infras.telemetry import (
+    CONTENT_TYPE,
+    Histogram,
+    PoolTelemetry,
+    TimedAsyncAdaptedQueuePool,
+    render_pool_metrics,
+)
+
+
+class TestHistogram:
+    """Test cases for Histogram."""
+
+    @pytest.mark.unit
+    def test_buckets_are_upper_bounds(self):
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot.counts == (2, 1, 1)
+        assert snapshot.cumulative_counts == (2, 3, 4)
+        assert (snapshot.sum, snapshot.count, snapshot.mean) == (6.0, 4, 1.5)
+
+    @pytest.mark.unit
+    def test_invalid_buckets(self):
+        with pytest.raises(ValueError):
+            Histogram(())
+        with pytest.raises(ValueError):
+            Histogram((2.0, 1.0))
+
+
+class TestPoolTelemetry:
+    """Test cases for PoolTelemetry on sync and async engines."""
+
+    @pytest.mark.integration
+    def test_checkouts_and_hold_time(self, make_engine, clock):
+        engine = make_engine(pool_size=2)
+        telemetry = PoolTelemetry(engine, clock=clock)
+
+        with engine.connect() as conn:
+            conn.execute(select(1))
+            clock.now += 0.3
+            assert telemetry.metrics.checked_out == 1
+        with engine.connect():
+            pass
+
+        metrics = telemetry.metrics
+        assert (metrics.checkouts, metrics.connects, metrics.checked_out, metrics.size) == (2, 1, 0, 2)
+        assert metrics.checkout_wait.count == 2
+        assert metrics.hold_time.count == 2
+        assert metrics.hold_time.sum == pytest.approx(0.3)
+
+    @pytest.mark.integration
+    def test_overflow_and_timeouts(self, make_engine):
+        engine = make_engine(pool_size=1, max_overflow=1, pool_timeout=0.01)
+        telemetry = PoolTelemetry(engine)
+
+        first, second = engine.connect(), engine.connect()
+        try:
+            assert telemetry.metrics.overflow == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        finally:
+            first.close()
+            second.close()
+
+        metrics = telemetry.metrics
+        assert (metrics.overflow_checkouts, metrics.overflow_peak, metrics.timeouts) == (1, 1, 1)
+        # The overflow connection is closed when it comes back
+        assert (metrics.overflow, metrics.closes) == (0, 1)
+
+    @pytest.mark.integration
+    def test_invalidations(self, make_engine):
+        engine = make_engine()
+        telemetry = PoolTelemetry(engine)
+
+        with engine.connect() as conn:
+            conn.invalidate()
+        assert telemetry.metrics.invalidations == 1
+
+    @pytest.mark.integration
+    def test_survives_dispose(self, make_engine):
+        engine = make_engine()
+        telemetry = PoolTelemetry(engine)
+        with engine.connect():
+            pass
+
+        engine.dispose()
+        with engine.connect():
+            pass
+        metrics = telemetry.metrics
+        assert (metrics.checkouts, metrics.connects, metrics.checkout_wait.count) == (2, 2, 2)
+
+    @pytest.mark.asyncio
+    async def test_async_engine(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/telemetry.db",
+                                     poolclass=TimedAsyncAdaptedQueuePool)
+        try:
+            telemetry = PoolTelemetry(engine)
+            async with engine.connect() as conn:
+                await conn.execute(select(1))
+            metrics = telemetry.metrics
+        finally:
+            await engine.dispose()
+        assert metrics.is_async
+        assert (metrics.checkouts, metrics.connects, metrics.checkout_wait.count, metrics.hold_time.count) == \
+            (1, 1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_registry_attaches_to_every_engine(self, tmp_path):
+        registry = EngineRegistry()
+        settings = Settings(DB_URL_SYNC=f"sqlite:///{tmp_path}/registry.db",
+                            DB_URL_ASYNC=f"sqlite+aiosqlite:///{tmp_path}/registry.db")
+        try:
+            with registry.sync_engine(settings).connect():
+                pass
+            async with registry.async_engine(settings).connect():
+                pass
+            metrics = registry.pool_metrics
+        finally:
+            await registry.dispose_all()
+
+        assert sorted((pool.is_async, pool.checkouts) for pool in metrics) == [(False, 1), (True, 1)]
+        assert registry.pool_metrics == []
+
+
+class TestPrometheus:
+    """Test cases for the Prometheus text exposition."""
+
+    @pytest.mark.integration
+    def test_render(self, make_engine):
+        engine = make_engine()
+        telemetry = PoolTelemetry(engine)
+        with engine.connect():
+            pass
+
+        text = render_pool_metrics([telemetry.metrics])
+        labels = f'engine="sync",url="{telemetry.url}"'
+        assert "# TYPE db_pool_checkouts_total counter" in text
+        assert f"db_pool_checkouts_total{{{labels}}} 1" in text
+        assert "# TYPE db_pool_hold_seconds histogram" in text
+        assert f'db_pool_hold_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+        assert f"db_pool_hold_seconds_count{{{labels}}} 1" in text
+        assert text.endswith("\n")
+
+    @pytest.mark.unit
+    def test_label_values_are_escaped(self, make_engine):
+        telemetry = PoolTelemetry(make_engine())
+        telemetry.url = 'a"b\\c'
+        assert 'url="a\\"b\\\\c"' in render_pool_metrics([telemetry.metrics])
+
+    @pytest.mark.integration
+    def test_metrics_endpoint(self, test_client):
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert "db_pool_checkout_wait_seconds_bucket" in response.text
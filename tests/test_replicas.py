@@ -0,0 +1,272 @@
+"""Tests for read-replica routing of read-only transactions."""
+
+import asyncio
+import contextvars
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from infras.cache import LRUTTLCache
+from infras.executors.session_workers import SessionWorkerPool
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.background_loop import background_loop
+from infras.repositories.base_po import BasePO
+from infras.repositories.item_async_repository import AsyncItemRepository, SyncToAsyncItemRepository
+from infras.repositories.item_cached_repository import CachedSyncItemRepository
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import AsyncToSyncItemRepository, SyncItemRepository
+from infras.repositories.replicas import LEAST_OUTSTANDING, ReplicaSet, pinned_to_primary
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager, SyncTransactionManager
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from services.single_flight import SingleFlight
+from tests.conftest import new_item
+
+ITEM_ID = "item-1"
+
+
+def _database(path, name: str) -> str:
+    """Create a database file whose only item is named after it."""
+    engine = create_engine(f"sqlite:///{path}")
+    BasePO.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ItemPO), [{"id": ITEM_ID, "name": name, "description": "", "quantity": 1, "price": 1.0}])
+    engine.dispose()
+    return str(path)
+
+
+@pytest.fixture
+def primary_path(tmp_path):
+    return _database(tmp_path / "primary.db", "primary")
+
+
+@pytest.fixture
+def replica_path(tmp_path):
+    return _database(tmp_path / "replica.db", "replica")
+
+
+@pytest.fixture
+def engines():
+    created = []
+
+    def make(path):
+        engine = create_engine(f"sqlite:///{path}")
+        created.append(engine)
+        return sessionmaker(bind=engine, class_=SyncSession, expire_on_commit=False)
+
+    yield make
+    for engine in created:
+        engine.dispose()
+
+
+def _in_fresh_context(fn):
+    """Run ``fn`` in a context no write has pinned to the primary yet."""
+    return contextvars.Context().run(fn)
+
+
+def _in_fresh_task(coro) -> asyncio.Task:
+    """Run ``coro`` in a task of its own, like a request no write has pinned yet."""
+    return contextvars.Context().run(asyncio.ensure_future, coro)
+
+
+class TestReplicaSet:
+    """Test cases for replica selection."""
+
+    @pytest.mark.unit
+    def test_round_robin(self):
+        replicas = ReplicaSet("test", ["a", "b", "c"])
+        picks = []
+        for _ in range(6):
+            replica = replicas.acquire()
+            picks.append(replica)
+            replicas.release(replica)
+        assert picks == ["a", "b", "c", "a", "b", "c"]
+
+    @pytest.mark.unit
+    def test_least_outstanding(self):
+        replicas = ReplicaSet("test", ["a", "b"], selection=LEAST_OUTSTANDING)
+        first = replicas.acquire()
+        second = replicas.acquire()
+        assert {first, second} == {"a", "b"}
+
+        replicas.release(first)
+        assert replicas.acquire() == first
+        assert replicas.metrics.outstanding == 2
+
+    @pytest.mark.unit
+    def test_failed_replica_backs_off(self, clock):
+        replicas = ReplicaSet("test", ["a", "b"], retry_after=5, clock=clock)
+        replicas.mark_failed("a", RuntimeError("down"))
+
+        assert {replicas.acquire() for _ in range(4)} == {"b"}
+        replicas.mark_failed("b", RuntimeError("down"))
+        assert replicas.acquire() is None
+        assert replicas.metrics.healthy == 0
+
+        clock.now += 5
+        assert replicas.acquire() in ("a", "b")
+        metrics = replicas.metrics
+        assert (metrics.healthy, metrics.failures, metrics.fallbacks) == (2, 2, 3)
+
+    @pytest.mark.unit
+    def test_write_pins_the_context(self):
+        replicas = ReplicaSet("test", ["a"], read_your_writes=0.05)
+
+        def write_then_read():
+            replicas.note_write()
+            pinned = replicas.acquire()
+            time.sleep(0.06)
+            return pinned, replicas.acquire()
+
+        assert _in_fresh_context(write_then_read) == (None, "a")
+        # Other contexts were never pinned
+        assert _in_fresh_context(pinned_to_primary) is False
+        assert replicas.metrics.pinned == 1
+
+    @pytest.mark.unit
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            ReplicaSet("test", [])
+        with pytest.raises(ValueError):
+            ReplicaSet("test", ["a"], selection="random")
+
+    @pytest.mark.unit
+    def test_settings(self, monkeypatch):
+        monkeypatch.setenv("DB_REPLICA_URLS_SYNC", '["sqlite:///a.db", "sqlite:///b.db"]')
+        monkeypatch.setenv("REPLICA_SELECTION", "least_outstanding")
+        settings = Settings()
+        assert settings.DB_REPLICA_URLS_SYNC == ["sqlite:///a.db", "sqlite:///b.db"]
+        assert settings.DB_REPLICA_URLS_ASYNC == []
+        assert settings.REPLICA_SELECTION == LEAST_OUTSTANDING
+
+
+class TestSyncRouting:
+    """Sync managers send read-only transactions to the replicas."""
+
+    @pytest.mark.integration
+    def test_reads_go_to_the_replica(self, primary_path, replica_path, engines):
+        manager = SyncTransactionManager(engines(primary_path), ReplicaSet("test", [engines(replica_path)]))
+        service = SyncItemService(transaction=manager, repo=SyncItemRepository())
+
+        assert _in_fresh_context(lambda: service.get(ITEM_ID).name) == "replica"
+        assert _in_fresh_context(lambda: [item.name for item in service.list().items]) == ["replica"]
+        # Non read-only work stays on the primary
+        with manager.session() as session:
+            assert SyncItemRepository().get_by_id(session, ITEM_ID).name == "primary"
+
+    @pytest.mark.integration
+    def test_read_your_writes(self, primary_path, replica_path, engines):
+        replicas = ReplicaSet("test", [engines(replica_path)], read_your_writes=0.1)
+        service = SyncItemService(transaction=SyncTransactionManager(engines(primary_path), replicas),
+                                  repo=CachedSyncItemRepository(SyncItemRepository(), LRUTTLCache("items", 10, 60)),
+                                  flights=SingleFlight("item_reads", bypass=pinned_to_primary))
+
+        def request():
+            before = service.get(ITEM_ID).name
+            service.update(ITEM_ID, new_item("updated"))
+            after = service.get(ITEM_ID).name
+            time.sleep(0.11)
+            return before, after, service.get(ITEM_ID).name
+
+        # The test replica never receives the write, so it shows again once the window is over
+        assert _in_fresh_context(request) == ("replica", "updated", "replica")
+
+    @pytest.mark.integration
+    def test_failed_replica_falls_back_to_the_primary(self, primary_path, tmp_path, engines):
+        # A replica that cannot be opened fails with OperationalError
+        broken = engines(tmp_path / "missing" / "replica.db")
+        replicas = ReplicaSet("test", [broken], retry_after=60)
+        service = SyncItemService(transaction=SyncTransactionManager(engines(primary_path), replicas),
+                                  repo=SyncItemRepository())
+
+        assert _in_fresh_context(lambda: service.get(ITEM_ID).name) == "primary"
+        assert _in_fresh_context(lambda: service.get(ITEM_ID).name) == "primary"
+        metrics = replicas.metrics
+        assert (metrics.failures, metrics.fallbacks, metrics.healthy, metrics.outstanding) == (1, 2, 0, 0)
+
+    @pytest.mark.integration
+    def test_statement_errors_are_not_retried(self, primary_path, replica_path, engines):
+        manager = SyncTransactionManager(engines(primary_path), ReplicaSet("test", [engines(replica_path)]))
+
+        @manager.transactional(read_only=True)
+        def fail(session: SyncSession):
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError):
+            _in_fresh_context(fail)
+        assert manager.replicas.metrics.failures == 0
+
+    @pytest.mark.integration
+    def test_async_session_through_bridge(self, primary_path, replica_path):
+        async def async_engines():
+            return (create_async_engine(f"sqlite+aiosqlite:///{primary_path}"),
+                    create_async_engine(f"sqlite+aiosqlite:///{replica_path}"))
+
+        primary, replica = background_loop.call(async_engines())
+        try:
+            replicas = ReplicaSet("test", [async_sessionmaker(bind=replica, class_=AsyncSession,
+                                                              expire_on_commit=False)])
+            manager = AsyncToSyncTransactionManager(AsyncTransactionManager(
+                async_sessionmaker(bind=primary, class_=AsyncSession, expire_on_commit=False), replicas))
+            service = SyncItemService(transaction=manager, repo=AsyncToSyncItemRepository())
+
+            assert _in_fresh_context(lambda: service.get(ITEM_ID).name) == "replica"
+            assert _in_fresh_context(lambda: (service.update(ITEM_ID, new_item("updated")),
+                                              service.get(ITEM_ID).name)[1]) == "updated"
+        finally:
+            background_loop.call(primary.dispose())
+            background_loop.call(replica.dispose())
+            background_loop.stop()
+
+
+class TestAsyncRouting:
+    """Async managers send read-only transactions to the replicas."""
+
+    @pytest_asyncio.fixture
+    async def async_factories(self, primary_path, replica_path):
+        primary = create_async_engine(f"sqlite+aiosqlite:///{primary_path}")
+        replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+        yield tuple(async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+                    for engine in (primary, replica))
+        await primary.dispose()
+        await replica.dispose()
+
+    @pytest.mark.asyncio
+    async def test_reads_and_read_your_writes(self, async_factories):
+        primary, replica = async_factories
+        manager = AsyncTransactionManager(primary, ReplicaSet("test", [replica]))
+        service = AsyncItemService(transaction=manager, repo=AsyncItemRepository())
+
+        async def request():
+            before = (await service.get(ITEM_ID)).name
+            await service.update(ITEM_ID, new_item("updated"))
+            return before, (await service.get(ITEM_ID)).name
+
+        assert await _in_fresh_task(request()) == ("replica", "updated")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [0, 2])
+    async def test_sync_session(self, primary_path, replica_path, engines, workers):
+        pool = SessionWorkerPool(workers) if workers else None
+        try:
+            manager = SyncToAsyncTransactionManager(
+                SyncTransactionManager(engines(primary_path), ReplicaSet("test", [engines(replica_path)])),
+                session_workers=pool)
+            service = AsyncItemService(transaction=manager, repo=SyncToAsyncItemRepository())
+
+            async def request():
+                before = (await service.get(ITEM_ID)).name
+                await service.update(ITEM_ID, new_item("updated"))
+                return before, (await service.get(ITEM_ID)).name
+
+            assert await _in_fresh_task(request()) == ("replica", "updated")
+        finally:
+            if pool is not None:
+                pool.shutdown()
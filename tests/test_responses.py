@@ -0,0 +1,51 @@
+"""Tests for the direct JSON responses of the item controllers."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from api.v1.controllers.responses import item_response, items_response
+from api.v1.schemas.item_schema import ItemSchema
+from models.item_model import ItemModel
+
+
+def _entity(i: int = 0) -> ItemModel:
+    return ItemModel(id=f"id-{i}", name=f"item-{i}", description="desc", quantity=i, price=1.5,
+                     created_at=datetime(2024, 1, 1, 12, 0, i), updated_at=datetime(2024, 1, 2, 12, 0, i))
+
+
+def _via_schema(entity: ItemModel) -> dict:
+    """The body the controllers produced through ItemSchema and response_model."""
+    return json.loads(ItemSchema.model_validate(entity.model_dump()).model_dump_json())
+
+
+class TestItemResponses:
+    """Direct serialization produces the same bodies as the ItemSchema path."""
+
+    @pytest.mark.unit
+    def test_model_matches_schema_fields(self):
+        # Item responses and NDJSON exports serialize ItemModel as-is instead of copying
+        # every row into an ItemSchema: that holds only while both carry the same fields
+        assert list(ItemModel.model_fields) == list(ItemSchema.model_fields)
+
+    @pytest.mark.unit
+    def test_item_response(self):
+        entity = _entity()
+        response = item_response(entity, status_code=201)
+
+        assert response.status_code == 201
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == _via_schema(entity)
+
+    @pytest.mark.unit
+    def test_items_response(self):
+        entities = [_entity(i) for i in range(3)]
+        response = items_response(entities, headers={"X-Next-Cursor": "abc"})
+
+        assert json.loads(response.body) == [_via_schema(e) for e in entities]
+        assert response.headers["X-Next-Cursor"] == "abc"
+
+    @pytest.mark.unit
+    def test_empty_list(self):
+        assert items_response([]).body == b"[]"
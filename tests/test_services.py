@@ -1,5 +1,7 @@
 """Tests for service layer."""
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
 from api.v1.schemas.item_schema import ItemCreateSchema
@@ -313,3 +315,32 @@ class TestSyncItemService:
         result = service.delete("1")
         assert result is True
         mock_sync_service.delete.assert_called_once_with("1")
+
+
+class TestServiceTransactionalBinding:
+    """Transactional wrappers are bound when the service is built."""
+
+    @pytest.mark.unit
+    def test_sync_service_binds_once(self):
+        transaction = MagicMock()
+        service = SyncItemService(transaction=transaction, repo=MagicMock())
+        assert transaction.transactional.call_count == 7
+
+        service.get("1")
+        service.list()
+        service.delete("1")
+
+        assert transaction.transactional.call_count == 7
+
+    @pytest.mark.asyncio
+    async def test_async_service_binds_once(self):
+        transaction = MagicMock()
+        transaction.transactional.return_value = lambda func: AsyncMock(return_value=None)
+        service = AsyncItemService(transaction=transaction, repo=AsyncMock())
+        assert transaction.transactional.call_count == 7
+
+        await service.get("1")
+        await service.list()
+        await service.delete("1")
+
+        assert transaction.transactional.call_count == 7
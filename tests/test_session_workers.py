@@ -0,0 +1,88 @@
+"""Tests for pinned session workers in SyncToAsyncTransactionManager."""
+
+import asyncio
+import threading
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+
+from infras.executors.session_workers import SessionWorkerPool, pinned_session_worker
+from infras.repositories.async_transaction import SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import SyncToAsyncItemRepository
+from infras.repositories.item_po import ItemPO
+from services.item_async_service import AsyncItemService
+from tests.conftest import new_item
+
+
+@pytest.fixture
+def statement_threads(sync_engine):
+    threads = []
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def record_thread(conn, cursor, statement, parameters, context, executemany):
+        threads.append(threading.current_thread().name)
+
+    return threads
+
+
+@pytest_asyncio.fixture
+async def manager(sync_manager):
+    workers = SessionWorkerPool(2)
+    yield SyncToAsyncTransactionManager(sync_manager, session_workers=workers)
+    workers.shutdown()
+
+
+class TestSessionWorkers:
+    """Test cases for the session worker execution mode."""
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_stays_on_one_worker(self, manager, statement_threads):
+        service = AsyncItemService(transaction=manager, repo=SyncToAsyncItemRepository())
+
+        created = await service.create(new_item("pinned"))
+        assert statement_threads
+        assert len(set(statement_threads)) == 1
+        assert statement_threads[0].startswith("db_adapter_session")
+
+        statement_threads.clear()
+        fetched = await service.get(created.id)
+        assert fetched.name == "pinned"
+        assert len(set(statement_threads)) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_units_use_several_workers(self, manager, statement_threads):
+        service = AsyncItemService(transaction=manager, repo=SyncToAsyncItemRepository())
+        created = await service.create(new_item("shared"))
+        statement_threads.clear()
+
+        results = await asyncio.gather(*(service.get(created.id) for _ in range(20)))
+
+        assert all(r.id == created.id for r in results)
+        assert len(set(statement_threads)) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_unit_rolls_back(self, manager):
+        async def create_then_fail(session):
+            session.add(ItemPO(name="rolled-back", description="", quantity=1, price=1.0))
+            session.flush()
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await manager.execute_with_transaction(create_then_fail)
+
+        async def find(session):
+            return session.execute(select(ItemPO).where(ItemPO.name == "rolled-back")).scalar_one_or_none()
+
+        assert await manager.execute_with_session(find) is None
+
+    @pytest.mark.asyncio
+    async def test_transaction_context_pins_session(self, manager):
+        repo = SyncToAsyncItemRepository()
+
+        async with manager.transaction() as session:
+            assert pinned_session_worker(session) is not None
+            created = await repo.create(session, new_item("context"))
+
+        async with manager.session() as session:
+            assert (await repo.get_by_id(session, created.id)).name == "context"
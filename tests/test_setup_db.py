@@ -0,0 +1,51 @@
+"""Tests for the database setup script."""
+
+from sqlalchemy import create_engine, select
+
+from infras.repositories.base_po import BasePO
+from scripts.setup_db import (
+    ITEMS_TABLE, SAMPLE_ITEMS, SEED_COLUMNS, ItemGenerator, add_sample_items, build_parser, seed_items,
+)
+
+SEEDED = 250
+
+
+def _seed(path, seed: int) -> list:
+    """Seed a new SQLite file at ``path`` with the default distributions, returns its rows."""
+    args = build_parser().parse_args(["--items", str(SEEDED), "--seed", str(seed)])
+    generator = ItemGenerator(args.seed, args.name_length, args.description_length, args.quantity, args.price)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        BasePO.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            seed_items(conn, generator, args.items, chunk_size=40, commit_every=100)
+            columns = [ITEMS_TABLE.c[name] for name in SEED_COLUMNS]
+            return [tuple(row) for row in conn.execute(select(*columns).order_by(ITEMS_TABLE.c.id))]
+    finally:
+        engine.dispose()
+
+
+class TestSeedItems:
+    """Generated items written by ``--items``."""
+
+    def test_same_seed_writes_same_rows(self, tmp_path):
+        first = _seed(tmp_path / "first.db", seed=7)
+        assert len(first) == SEEDED
+        assert first == _seed(tmp_path / "second.db", seed=7)
+
+    def test_other_seed_writes_other_rows(self, tmp_path):
+        first = {row[0] for row in _seed(tmp_path / "first.db", seed=7)}
+        assert first.isdisjoint(row[0] for row in _seed(tmp_path / "second.db", seed=8))
+
+
+class TestSampleItems:
+    """Sample items written without ``--items``."""
+
+    def test_writes_the_samples_once(self, sync_engine):
+        with sync_engine.connect() as conn:
+            assert add_sample_items(conn) == len(SAMPLE_ITEMS)
+            assert add_sample_items(conn) == 0
+            rows = conn.execute(select(ITEMS_TABLE.c.name, ITEMS_TABLE.c.description, ITEMS_TABLE.c.quantity,
+                                       ITEMS_TABLE.c.price).order_by(ITEMS_TABLE.c.name)).all()
+        expected = sorted((item.name, item.description, item.quantity, item.price) for item in SAMPLE_ITEMS)
+        assert [tuple(row) for row in rows] == expected
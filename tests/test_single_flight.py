@@ -0,0 +1,327 @@
+"""Tests for single-flight coalescing of concurrent reads."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from config import Settings
+from infras.repositories.item_async_repository import AsyncItemRepository
+from infras.repositories.item_sync_repository import SyncItemRepository
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from services.single_flight import (
+    AsyncSingleFlight, SingleFlight, create_async_read_flights, create_read_flights,
+)
+from tests.conftest import new_item, record_statements
+
+CALLERS = 20
+
+
+class Boom(Exception):
+    pass
+
+
+class TestAsyncSingleFlight:
+    """Test cases for AsyncSingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_call(self):
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flights.do("a", load) for _ in range(CALLERS)))
+
+        assert results == ["value"] * CALLERS
+        assert len(calls) == 1
+        metrics = flights.metrics
+        assert (metrics.calls, metrics.coalesced, metrics.in_flight) == (CALLERS, CALLERS - 1, 0)
+
+        # Finished flights are not reused
+        assert await flights.do("a", load) == "value"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_keys_do_not_share(self):
+        flights = AsyncSingleFlight("test")
+
+        async def load(value):
+            await asyncio.sleep(0)
+            return value
+
+        assert await asyncio.gather(flights.do("a", lambda: load(1)), flights.do("b", lambda: load(2))) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flights = AsyncSingleFlight("test")
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "value"
+
+        leader = asyncio.create_task(flights.do("a", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("a", load))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == "value"
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_call_is_cancelled_when_every_caller_leaves(self):
+        flights = AsyncSingleFlight("test")
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def load():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.do("a", load)) for _ in range(3)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flights.metrics.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_then_retried(self):
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            if len(calls) == 1:
+                raise Boom()
+            return "value"
+
+        results = await asyncio.gather(*(flights.do("a", load) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, Boom) for result in results)
+        assert await flights.do("a", load) == "value"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_forget_starts_a_new_call(self):
+        flights = AsyncSingleFlight("test")
+        release = asyncio.Event()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await release.wait()
+            return len(calls)
+
+        first = asyncio.create_task(flights.do("a", load))
+        await asyncio.sleep(0.01)
+        flights.forget(lambda key: key == "a")
+        second = asyncio.create_task(flights.do("a", load))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert len(calls) == 2
+        assert (await first, await second) == (2, 2)
+
+
+class TestSingleFlight:
+    """Test cases for the thread-safe SingleFlight."""
+
+    @staticmethod
+    def _run_threads(target, count: int = CALLERS) -> list:
+        results = [None] * count
+
+        def run(index):
+            try:
+                results[index] = target()
+            except BaseException as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @pytest.mark.unit
+    def test_concurrent_calls_share_one_call(self):
+        flights = SingleFlight("test")
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = self._run_threads(lambda: flights.do("a", load))
+
+        assert results == ["value"] * CALLERS
+        assert len(calls) < CALLERS
+        metrics = flights.metrics
+        assert metrics.calls == CALLERS
+        assert metrics.coalesced == CALLERS - len(calls)
+        assert metrics.in_flight == 0
+
+    @pytest.mark.unit
+    def test_failure_is_shared(self):
+        flights = SingleFlight("test")
+        started, release = threading.Event(), threading.Event()
+
+        def load():
+            started.set()
+            release.wait(1)
+            raise Boom()
+
+        leader = threading.Thread(target=lambda: pytest.raises(Boom, flights.do, "a", load))
+        leader.start()
+        started.wait(1)
+        follower_error = []
+        follower = threading.Thread(target=lambda: follower_error.append(pytest.raises(Boom, flights.do, "a", load)))
+        follower.start()
+        while flights.metrics.coalesced < 1:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert follower_error
+        assert flights.metrics.in_flight == 0
+
+    @pytest.mark.unit
+    def test_interrupted_leader_hands_over(self):
+        flights = SingleFlight("test")
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def load():
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                started.set()
+                release.wait(1)
+                raise KeyboardInterrupt()
+            return "value"
+
+        leader_result = []
+        leader = threading.Thread(target=lambda: leader_result.append(
+            pytest.raises(KeyboardInterrupt, flights.do, "a", load)))
+        leader.start()
+        started.wait(1)
+        follower_result = []
+        follower = threading.Thread(target=lambda: follower_result.append(flights.do("a", load)), name="follower")
+        follower.start()
+        while flights.metrics.coalesced < 1:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert leader_result and follower_result == ["value"]
+        assert calls[1] == "follower"
+
+
+class GatedAsyncItemRepository(AsyncItemRepository):
+    """Holds reads until released, so concurrent calls overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.reads = 0
+
+    async def get_by_id(self, session, item_id):
+        self.reads += 1
+        await self.release.wait()
+        return await super().get_by_id(session, item_id)
+
+    async def list(self, session, limit=100, cursor=None):
+        self.reads += 1
+        await self.release.wait()
+        return await super().list(session, limit, cursor)
+
+
+class TestServiceCoalescing:
+    """Item services coalesce concurrent identical reads."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_use_one_session(self, async_engine, async_manager):
+        repo = GatedAsyncItemRepository()
+        service = AsyncItemService(transaction=async_manager, repo=repo, flights=AsyncSingleFlight("item_reads"))
+        repo.release.set()
+        created = await service.create(new_item("hot"))
+        repo.release.clear()
+
+        checkouts = []
+        event.listen(async_engine.sync_engine.pool, "checkout", lambda *args: checkouts.append(1))
+
+        gets = [asyncio.create_task(service.get(created.id)) for _ in range(CALLERS)]
+        lists = [asyncio.create_task(service.list(10)) for _ in range(CALLERS)]
+        await asyncio.sleep(0.05)
+        repo.release.set()
+
+        assert {item.name for item in await asyncio.gather(*gets)} == {"hot"}
+        assert all(len(page.items) == 1 for page in await asyncio.gather(*lists))
+        assert repo.reads == 2
+        assert len(checkouts) == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_after_a_write_do_not_join_older_reads(self, async_manager):
+        repo = GatedAsyncItemRepository()
+        service = AsyncItemService(transaction=async_manager, repo=repo, flights=AsyncSingleFlight("item_reads"))
+        repo.release.set()
+        created = await service.create(new_item("before"))
+        repo.release.clear()
+
+        repo.reads = 0
+        earlier = asyncio.create_task(service.get(created.id))
+        await asyncio.sleep(0.01)
+        await service.update(created.id, new_item("after"))
+        later = asyncio.create_task(service.get(created.id))
+        await asyncio.sleep(0.01)
+        repo.release.set()
+
+        assert (await later).name == "after"
+        await earlier
+        assert repo.reads == 2
+
+    @pytest.mark.integration
+    def test_sync_concurrent_reads_share_one_query(self, sync_engine, sync_manager):
+        service = SyncItemService(transaction=sync_manager, repo=SyncItemRepository(),
+                                  flights=SingleFlight("item_reads"))
+        created = service.create(new_item("hot"))
+        selects = record_statements(sync_engine, "SELECT")
+
+        results = TestSingleFlight._run_threads(lambda: service.get(created.id))
+
+        assert {item.name for item in results} == {"hot"}
+        assert 1 <= len(selects) <= CALLERS
+        assert service.flights.metrics.coalesced == CALLERS - len(selects)
+
+
+class TestCreateReadFlights:
+    """Coalescing is opt-in."""
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self):
+        assert create_read_flights(Settings()) is None
+        assert create_async_read_flights(Settings()) is None
+
+    @pytest.mark.unit
+    def test_enabled(self):
+        settings = Settings(COALESCE_READS=True)
+        assert isinstance(create_read_flights(settings), SingleFlight)
+        assert isinstance(create_async_read_flights(settings), AsyncSingleFlight)
@@ -0,0 +1,149 @@
+"""Tests for transactional session injection."""
+
+import pytest
+
+from infras.repositories.base_transaction import BaseTransactionManager
+from infras.repositories.sync_session import SyncSession
+
+
+class FakeSession:
+    pass
+
+
+class RecordingTransactionManager(BaseTransactionManager):
+    """Transaction manager that hands a fake session to the operation."""
+
+    def __init__(self):
+        super().__init__(SyncSession)
+        self.session = FakeSession()
+        self.calls = []
+
+    def execute_with_session(self, operation):
+        self.calls.append("session")
+        return operation(self.session)
+
+    def execute_with_transaction(self, operation, savepoint=False):
+        self.calls.append("transaction")
+        return operation(self.session)
+
+
+class AsyncRecordingTransactionManager(RecordingTransactionManager):
+    async def execute_with_session(self, operation):
+        self.calls.append("session")
+        return await operation(self.session)
+
+    async def execute_with_transaction(self, operation, savepoint=False):
+        self.calls.append("transaction")
+        return await operation(self.session)
+
+
+class TestSessionInjection:
+    """Test cases for the compiled session call plan."""
+
+    @pytest.mark.unit
+    def test_session_first(self):
+        manager = RecordingTransactionManager()
+
+        def get(session: SyncSession, item_id: str, flag: bool = False):
+            return session, item_id, flag
+
+        wrapped = manager._create_transactional_decorator(read_only=True)(get)
+
+        assert wrapped("a") == (manager.session, "a", False)
+        assert wrapped("a", flag=True) == (manager.session, "a", True)
+        assert wrapped(item_id="b") == (manager.session, "b", False)
+        assert manager.calls == ["session"] * 3
+
+    @pytest.mark.unit
+    def test_session_in_the_middle(self):
+        manager = RecordingTransactionManager()
+
+        def update(item_id: str, session: SyncSession, data: dict):
+            return item_id, session, data
+
+        wrapped = manager._create_transactional_decorator(read_only=False)(update)
+
+        assert wrapped("a", {"x": 1}) == ("a", manager.session, {"x": 1})
+        assert wrapped("a", data={}) == ("a", manager.session, {})
+        assert wrapped(item_id="a", data={}) == ("a", manager.session, {})
+        assert manager.calls == ["transaction"] * 3
+
+    @pytest.mark.unit
+    def test_keyword_only_session(self):
+        manager = RecordingTransactionManager()
+
+        def get(item_id: str, *, session: SyncSession):
+            return item_id, session
+
+        wrapped = manager._create_transactional_decorator(read_only=True)(get)
+
+        assert wrapped("a") == ("a", manager.session)
+
+    @pytest.mark.unit
+    def test_bound_method(self):
+        manager = RecordingTransactionManager()
+
+        class Service:
+            def get(self, session: SyncSession, item_id: str):
+                return self, session, item_id
+
+        service = Service()
+        wrapped = manager._create_transactional_decorator(read_only=True)(service.get)
+
+        assert wrapped("a") == (service, manager.session, "a")
+
+    @pytest.mark.unit
+    def test_missing_session_parameter_fails_at_decoration(self):
+        manager = RecordingTransactionManager()
+
+        def get(item_id: str):
+            return item_id
+
+        with pytest.raises(TypeError, match="does not accept a SyncSession parameter"):
+            manager._create_transactional_decorator(read_only=True)(get)
+
+    @pytest.mark.asyncio
+    async def test_async_wrapper(self):
+        manager = AsyncRecordingTransactionManager()
+
+        async def update(item_id: str, session: SyncSession, data: dict):
+            return item_id, session, data
+
+        wrapped = manager._create_transactional_decorator(read_only=False, is_async=True)(update)
+
+        assert await wrapped("a", {"x": 1}) == ("a", manager.session, {"x": 1})
+        assert manager.calls == ["transaction"]
+
+    @pytest.mark.unit
+    def test_signature_resolved_once_per_function(self, monkeypatch):
+        from infras.repositories import base_transaction
+
+        calls = []
+        signature = base_transaction.inspect.signature
+
+        def counting_signature(func):
+            calls.append(func)
+            return signature(func)
+
+        monkeypatch.setattr(base_transaction.inspect, "signature", counting_signature)
+
+        class Service:
+            def get(self, session: SyncSession, item_id: str):
+                return self, session, item_id
+
+        for _ in range(3):
+            service = Service()
+            manager = RecordingTransactionManager()
+            wrapped = manager._create_transactional_decorator(read_only=True)(service.get)
+            assert wrapped("a") == (service, manager.session, "a")
+
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    def test_decorator_is_reused(self):
+        manager = RecordingTransactionManager()
+
+        assert manager._create_transactional_decorator(read_only=True) is \
+            manager._create_transactional_decorator(read_only=True)
+        assert manager._create_transactional_decorator(read_only=True) is not \
+            manager._create_transactional_decorator(read_only=False)
@@ -0,0 +1,279 @@
+"""Tests for the request-scoped unit of work shared by the transaction managers."""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from infras.executors.session_workers import SessionWorkerPool
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.async_transaction import AsyncTransactionManager, SyncToAsyncTransactionManager
+from infras.repositories.item_async_repository import AsyncItemRepository, SyncToAsyncItemRepository
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import AsyncToSyncItemRepository, SyncItemRepository
+from infras.repositories.read_mode import is_read_only
+from infras.repositories.replicas import ReplicaSet, pinned_to_primary
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.sync_transaction import AsyncToSyncTransactionManager
+from infras.repositories.unit_of_work import (
+    UnitOfWorkMiddleware,
+    current_unit_of_work,
+    reads_are_private,
+    unit_of_work,
+)
+from services.item_async_service import AsyncItemService
+from services.item_sync_service import SyncItemService
+from services.single_flight import AsyncSingleFlight
+from tests.conftest import new_item
+
+
+def _count_checkouts(engine):
+    checkouts = []
+
+    @event.listens_for(engine, "checkout")
+    def record(dbapi_connection, connection_record, connection_proxy):
+        checkouts.append(connection_record)
+
+    return checkouts
+
+
+@pytest.fixture
+def async_service(async_engine):
+    factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    return AsyncItemService(transaction=AsyncTransactionManager(factory), repo=AsyncItemRepository())
+
+
+async def _count_items(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(ItemPO))).scalar()
+
+
+class TestAsyncUnitOfWork:
+    """Async transaction manager calls joining a unit of work."""
+
+    @pytest.mark.asyncio
+    async def test_calls_share_one_session(self, async_service, async_engine):
+        checkouts = _count_checkouts(async_engine.sync_engine)
+        async with unit_of_work():
+            created = await async_service.create(new_item("shared"))
+            assert (await async_service.get(created.id)).name == "shared"
+            await async_service.update(created.id, new_item("renamed"))
+            assert reads_are_private()
+
+        assert len(checkouts) == 1
+        assert current_unit_of_work() is None
+        assert (await async_service.get(created.id)).name == "renamed"
+
+    @pytest.mark.asyncio
+    async def test_rolls_back_when_the_scope_fails(self, async_service, async_engine):
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await async_service.create(new_item("lost"))
+                raise RuntimeError("handler failed")
+        assert await _count_items(async_engine) == 0
+
+    @pytest.mark.asyncio
+    async def test_savepoint_rolls_back_alone(self, async_service, async_engine):
+        manager = async_service.transaction
+
+        async def create(session: AsyncSession, name: str):
+            return await async_service.repo.create(session, new_item(name))
+
+        create_in_savepoint = manager.transactional(savepoint=True)(create)
+        async with unit_of_work():
+            await async_service.create(new_item("kept"))
+            with pytest.raises(IntegrityError):
+                await create_in_savepoint("kept")
+            await create_in_savepoint("also kept")
+
+        async with async_engine.connect() as conn:
+            names = (await conn.execute(select(ItemPO.name).order_by(ItemPO.name))).scalars().all()
+        assert names == ["also kept", "kept"]
+
+    @pytest.mark.asyncio
+    async def test_reads_leave_the_read_only_path_after_a_write(self, async_service):
+        manager = async_service.transaction
+
+        async def read_mode(session: AsyncSession):
+            return is_read_only(session)
+
+        read = manager.transactional(read_only=True)(read_mode)
+        async with unit_of_work():
+            assert await read() is True
+            await async_service.create(new_item("written"))
+            assert await read() is False
+
+
+    @pytest.mark.asyncio
+    async def test_shared_reads_are_forgotten_at_commit(self, async_engine):
+        factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        repo = HeldAsyncItemRepository()
+        service = AsyncItemService(transaction=AsyncTransactionManager(factory), repo=repo,
+                                   flights=AsyncSingleFlight("item_reads"))
+        created = await service.create(new_item("before"))
+        written, commit = asyncio.Event(), asyncio.Event()
+
+        async def write():
+            async with unit_of_work():
+                await service.update(created.id, new_item("after"))
+                written.set()
+                await commit.wait()
+
+        writer = asyncio.create_task(write())
+        await written.wait()
+        # Reads the committed row, then stays in flight across the commit
+        repo.hold.clear()
+        between = asyncio.create_task(service.get(created.id))
+        while repo.reads == 0:
+            await asyncio.sleep(0.001)
+        commit.set()
+        await writer
+
+        repo.hold.set()
+        assert (await service.get(created.id)).name == "after"
+        assert (await between).name == "before"
+
+    @pytest.mark.asyncio
+    async def test_reads_are_pinned_to_the_primary_at_commit(self, async_engine):
+        factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        manager = AsyncTransactionManager(factory, ReplicaSet("test", [factory], read_your_writes=60))
+        service = AsyncItemService(transaction=manager, repo=AsyncItemRepository())
+
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await service.create(new_item("lost"))
+                raise RuntimeError("handler failed")
+        assert not pinned_to_primary()
+
+        async with unit_of_work():
+            await service.create(new_item("kept"))
+            assert not pinned_to_primary()
+        assert pinned_to_primary()
+
+
+class HeldAsyncItemRepository(AsyncItemRepository):
+    """Holds its reads after running them until ``hold`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.hold = asyncio.Event()
+        self.hold.set()
+        self.reads = 0
+
+    async def get_by_id(self, session, item_id):
+        item = await super().get_by_id(session, item_id)
+        self.reads += 1
+        await self.hold.wait()
+        return item
+
+
+class TestSyncUnitOfWork:
+    """Sync transaction managers joining a unit of work."""
+
+    @pytest.mark.asyncio
+    async def test_sync_manager(self, sync_engine, sync_manager):
+        service = SyncItemService(transaction=sync_manager, repo=SyncItemRepository())
+        checkouts = _count_checkouts(sync_engine)
+
+        def handler():
+            created = service.create(new_item("sync"))
+            return service.get(created.id)
+
+        async with unit_of_work():
+            # Sync routes run in a worker thread, with the request's context
+            found = await asyncio.to_thread(handler)
+        assert found.name == "sync"
+        assert len(checkouts) == 1
+        assert service.get(found.id) is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [0, 2])
+    async def test_sync_to_async_manager(self, sync_engine, sync_manager, workers):
+        session_workers = SessionWorkerPool(workers) if workers else None
+        manager = SyncToAsyncTransactionManager(sync_manager, session_workers=session_workers)
+        service = AsyncItemService(transaction=manager, repo=SyncToAsyncItemRepository())
+        checkouts = _count_checkouts(sync_engine)
+
+        async def create(session: SyncSession, name: str):
+            return await service.repo.create(session, new_item(name))
+
+        create_in_savepoint = manager.transactional(savepoint=True)(create)
+        try:
+            async with unit_of_work():
+                created = await service.create(new_item("bridged"))
+                with pytest.raises(IntegrityError):
+                    await create_in_savepoint("bridged")
+                assert (await service.get(created.id)).name == "bridged"
+            assert len(checkouts) == 1
+            assert (await service.get(created.id)).name == "bridged"
+        finally:
+            if session_workers is not None:
+                session_workers.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_async_to_sync_manager(self, background_async_engine):
+        factory = async_sessionmaker(bind=background_async_engine, class_=AsyncSession, expire_on_commit=False,
+                                     autoflush=False)
+        manager = AsyncToSyncTransactionManager(AsyncTransactionManager(factory))
+        service = SyncItemService(transaction=manager, repo=AsyncToSyncItemRepository())
+        checkouts = _count_checkouts(background_async_engine.sync_engine)
+
+        def handler():
+            created = service.create(new_item("bridged"))
+            return service.get(created.id)
+
+        async with unit_of_work():
+            found = await asyncio.to_thread(handler)
+        assert found.name == "bridged"
+        assert len(checkouts) == 1
+        assert await asyncio.to_thread(service.get, found.id) is not None
+
+
+class TestUnitOfWorkMiddleware:
+    """One unit of work per HTTP request."""
+
+    @pytest_asyncio.fixture
+    async def client(self, async_service):
+        app = FastAPI()
+        app.add_middleware(UnitOfWorkMiddleware)
+
+        @app.post("/items/{name}")
+        async def create(name: str, reject: bool = False):
+            created = await async_service.create(new_item(name))
+            if reject:
+                raise HTTPException(status_code=409, detail="rejected")
+            return {"id": created.id}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_commits_before_the_response(self, client, async_service):
+        response = await client.post("/items/committed")
+        assert response.status_code == 200
+        assert await async_service.get(response.json()["id"]) is not None
+
+    @pytest.mark.asyncio
+    async def test_rolls_back_error_responses(self, client, async_engine):
+        response = await client.post("/items/rejected", params={"reject": True})
+        assert response.status_code == 409
+        assert await _count_items(async_engine) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_is_a_server_error(self, client, async_engine, monkeypatch):
+        assert (await client.post("/items/taken")).status_code == 200
+
+        async def fail(session):
+            raise RuntimeError("commit failed")
+
+        monkeypatch.setattr(AsyncSession, "commit", fail)
+        response = await client.post("/items/other")
+        assert response.status_code == 500
+        assert response.text == "Internal Server Error"
+        assert await _count_items(async_engine) == 1
@@ -0,0 +1,173 @@
+"""Tests for the engine warm-up run before the application reports ready."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.orm import sessionmaker
+
+import main
+from infras.repositories.async_session import AsyncSession
+from infras.repositories.item_async_repository import AsyncItemRepository
+from infras.repositories.item_po import ItemPO
+from infras.repositories.item_sync_repository import SyncItemRepository
+from infras.repositories.read_mode import mark_read_only
+from infras.repositories.sync_session import SyncSession
+from infras.repositories.warmup import WarmupReport, retry_warm_up, warm_up_async_engine, warm_up_sync_engine
+from tests.conftest import new_item
+
+
+def _record_cache_misses(engine) -> list:
+    """Statements executed without a compiled cache hit."""
+    misses = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(("SELECT", "INSERT", "UPDATE", "DELETE")) \
+                and context.cache_hit != CACHE_HIT:
+            misses.append(statement)
+
+    return misses
+
+
+def _row_count(engine) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(ItemPO))
+
+
+class TestSyncWarmup:
+    """Test cases for warm_up_sync_engine."""
+
+    @pytest.mark.integration
+    def test_fills_the_pool(self, sync_engine):
+        pool_size = sync_engine.pool.size()
+        report = warm_up_sync_engine(sync_engine, connections=pool_size * 2)
+
+        assert report.ok
+        assert report.connections == pool_size
+        assert sync_engine.pool.checkedin() == pool_size
+        assert report.statements > pool_size
+
+    @pytest.mark.integration
+    def test_repository_statements_are_compiled(self, sync_engine):
+        warm_up_sync_engine(sync_engine, connections=1, writes=True)
+        assert _row_count(sync_engine) == 0
+
+        misses = _record_cache_misses(sync_engine)
+        repo = SyncItemRepository()
+        factory = sessionmaker(bind=sync_engine, class_=SyncSession, expire_on_commit=False)
+        with factory.begin() as session:
+            created = repo.create(session, new_item("a"))
+            repo.create_many(session, [new_item("b")])
+            repo.update(session, created.id, new_item("c"))
+        for read_only in (False, True):
+            with factory() as session:
+                if read_only:
+                    mark_read_only(session)
+                page = repo.list(session, 1)
+                repo.list(session, 1, page.next_cursor)
+                repo.get_by_id(session, created.id)
+                repo.get_many(session, [created.id, "missing"])
+        with factory.begin() as session:
+            repo.delete(session, created.id)
+
+        assert misses == []
+
+    @pytest.mark.integration
+    def test_writes_are_opt_in(self, sync_engine):
+        statements = []
+        event.listen(sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(
+            statement))
+
+        assert warm_up_sync_engine(sync_engine, connections=1).ok
+        assert statements and all(statement.startswith("SELECT") for statement in statements)
+
+    @pytest.mark.integration
+    def test_failure_is_reported(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/missing/warmup.db")
+        try:
+            report = warm_up_sync_engine(engine, connections=2)
+        finally:
+            engine.dispose()
+        assert not report.ok
+        assert report.connections == 0
+
+
+class TestAsyncWarmup:
+    """Test cases for warm_up_async_engine."""
+
+    @pytest.mark.asyncio
+    async def test_fills_the_pool_and_compiles(self, sync_engine, async_engine):
+        pool_size = async_engine.pool.size()
+        report = await warm_up_async_engine(async_engine, connections=pool_size * 2, writes=True)
+        assert report.ok
+        assert report.connections == async_engine.pool.checkedin() == pool_size
+        assert _row_count(sync_engine) == 0
+
+        misses = _record_cache_misses(async_engine.sync_engine)
+        repo = AsyncItemRepository()
+        async with AsyncSession(bind=async_engine) as session:
+            async with session.begin():
+                created = await repo.create(session, new_item("a"))
+                await repo.update(session, created.id, new_item("b"))
+            mark_read_only(session)
+            await repo.get_by_id(session, created.id)
+            await repo.list(session, 1)
+        assert misses == []
+
+
+def _report(error: str | None = None) -> WarmupReport:
+    return WarmupReport(url="sqlite://", connections=0, statements=0, seconds=0.0, error=error)
+
+
+class TestRetryWarmup:
+    """A warm-up failing on the primary is retried until it succeeds."""
+
+    @pytest.mark.asyncio
+    async def test_retries_with_back_off(self, monkeypatch):
+        outcomes = [[_report("booting")], [_report("booting"), _report()], [_report(), _report("down")]]
+        attempts, delays = [], []
+
+        async def warm_up():
+            return outcomes.pop(0)
+
+        async def sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        reports = await retry_warm_up(warm_up, attempts.append, delay=1, max_delay=3)
+
+        assert reports[0].ok and not reports[1].ok
+        assert len(attempts) == 3
+        assert delays == [1, 2, 3]
+
+
+class TestReadiness:
+    """GET /ready reports the warm-up."""
+
+    @pytest.mark.integration
+    def test_ready_after_startup(self, test_client):
+        response = test_client.get("/ready")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ready"
+        assert body["warmup"] and body["warmup"][0]["error"] is None
+
+    @pytest.mark.integration
+    def test_ready_once_a_retry_succeeds(self, monkeypatch):
+        outcomes = [[_report("database is starting")], [_report()]]
+
+        async def warm_up(bridge_loop):
+            return outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+
+        monkeypatch.setattr(main, "_warm_up", warm_up)
+        monkeypatch.setattr(main.settings, "WARMUP_RETRY_DELAY", 0.01)
+        with TestClient(main.app) as client:
+            assert client.get("/ready").status_code == 503
+            deadline = time.monotonic() + 5
+            while client.get("/ready").status_code != 200:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)